@@ -7,6 +7,7 @@ from oemof.thermal_building_model.helpers.path_helper import get_project_root
 from oemof.thermal_building_model.helpers import calculate_gain_by_sun
 from oemof.thermal_building_model.tabula.tabula_reader import Building
 from oemof.thermal_building_model.m_5RC import M5RC
+from oemof.thermal_building_model.m_5RC import load_reduced_results
 
 import oemof.solph as solph
 from oemof.solph import views
@@ -63,7 +64,7 @@ def main():
             "12_BW_Mannheim_TRY2035.csv",
         ),
     )
-    solar_gains = building_example.calc_solar_gaings_through_windows(
+    solar_gains = building_example.calc_solar_gains_array(
         object_location_of_building=location
     )
     t_outside = location.weather_data["drybulb_C"].to_list()
@@ -155,6 +156,9 @@ def main():
     # if tee_switch is true solver messages will be displayed
     logging.info("Solve the optimization problem")
     model.solve(solver=solver, solve_kwargs={"tee": solver_verbose})
+    # sets t_air of buildings with reduced_formulation=True, which is needed
+    # before the results are processed
+    load_reduced_results(model)
 
     logging.info("Store the energy system with the results.")
 
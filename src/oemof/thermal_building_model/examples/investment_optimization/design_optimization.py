@@ -14,6 +14,7 @@ from oemof.solph import views
 from oemof.tools import logger
 from oemof.tools import economics
 from oemof.thermal_building_model.m_5RC import M5RC
+from oemof.thermal_building_model.m_5RC import load_reduced_results
 from plot_results import plot_stacked_bars
 
 """
@@ -63,7 +64,7 @@ def main(refurbishment_status, cost_refurbishment):
             "12_BW_Mannheim_TRY2035.csv",
         ),
     )
-    solar_gains = building_example.calc_solar_gaings_through_windows(
+    solar_gains = building_example.calc_solar_gains_array(
         object_location_of_building=location
     )
 
@@ -339,6 +340,9 @@ def main(refurbishment_status, cost_refurbishment):
     # if tee_switch is true solver messages will be displayed
     logging.info("Solve the optimization problem")
     model.solve(solver=solver, solve_kwargs={"tee": True})
+    # sets t_air of buildings with reduced_formulation=True, which is needed
+    # before the results are processed
+    load_reduced_results(model)
 
     logging.info("Store the energy system with the results.")
 
@@ -0,0 +1,264 @@
+"""Aggregation of building fleets
+
+Buildings with similar thermal time constants react similar to heating and
+cooling. The buildings of a fleet are clustered by their time constant and
+each cluster is merged into one equivalent 5RC building with the summed
+conductances, capacities and gains, which is modelled by M5RC as usual.
+calc_aggregation_error compares the heat demand of the equivalent buildings
+with the individual buildings.
+
+SPDX-License-Identifier: MIT
+
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from oemof.thermal_building_model.m_5RC_fleet import M5RCFleet
+from oemof.thermal_building_model.tabula.tabula_batch import (
+    BuildingConfigBatch,
+    building_config_fields,
+)
+
+# parameters of BuildingConfig5RC which are summed up, the others are
+# averaged weighted by the floor area
+extensive_parameters = (
+    "total_internal_area",
+    "h_ve",
+    "h_tr_w",
+    "h_tr_em",
+    "h_tr_is",
+    "mass_area",
+    "h_tr_ms",
+    "c_m",
+    "floor_area",
+)
+
+AggregatedBuildings = namedtuple(
+    "AggregatedBuildings",
+    ["configs", "labels", "t_outside", "solar_gains", "internal_gains"],
+)
+AggregatedBuildings.__doc__ = """
+Equivalent buildings of the clusters of a fleet
+
+configs is a BuildingConfigBatch with one building per cluster, labels the
+cluster of every building of the fleet and t_outside, solar_gains and
+internal_gains are (number of clusters x T) arrays.
+"""
+
+
+def _as_batch(building_configs):
+    if isinstance(building_configs, BuildingConfigBatch):
+        return building_configs
+    return BuildingConfigBatch.from_building_configs(building_configs)
+
+
+def _profiles(values, number_of_buildings):
+    values = np.asarray(values, dtype=float)
+    return np.broadcast_to(values, (number_of_buildings, values.shape[-1]))
+
+
+def calc_time_constants(building_configs):
+    """
+    Time constants in hours of the mass node, c_m / (h_tr_em + h_tr_3), of
+    a BuildingConfigBatch or list of BuildingConfig5RC.
+    """
+    configs = _as_batch(building_configs)
+    h_tr_1 = 1.0 / (1.0 / configs.h_ve + 1.0 / configs.h_tr_is)
+    h_tr_2 = h_tr_1 + configs.h_tr_w
+    h_tr_3 = 1.0 / (1.0 / h_tr_2 + 1.0 / configs.h_tr_ms)
+    return configs.c_m / (configs.h_tr_em + h_tr_3) / 3600
+
+
+def cluster_buildings(
+    building_configs, number_of_clusters: int, iterations: int = 50
+):
+    """
+    Cluster of every building by the logarithm of its time constant (1-d
+    k-means starting at the quantiles). The clusters are numbered by
+    increasing time constant.
+    """
+    log_tau = np.log(calc_time_constants(building_configs))
+    number_of_clusters = min(number_of_clusters, len(np.unique(log_tau)))
+    centers = np.quantile(
+        log_tau, (np.arange(number_of_clusters) + 0.5) / number_of_clusters
+    )
+    for _ in range(iterations):
+        labels = np.abs(log_tau[:, np.newaxis] - centers).argmin(axis=1)
+        new_centers = np.array(
+            [
+                log_tau[labels == k].mean() if np.any(labels == k) else centers[k]
+                for k in range(number_of_clusters)
+            ]
+        )
+        if np.array_equal(new_centers, centers):
+            break
+        centers = new_centers
+    labels = np.abs(log_tau[:, np.newaxis] - centers).argmin(axis=1)
+    # drop empty clusters and number them by their time constant
+    used = np.unique(labels)
+    return np.searchsorted(used, labels)
+
+
+def aggregate_buildings(
+    building_configs, t_outside, solar_gains, internal_gains, labels
+):
+    """
+    Equivalent building of every cluster in labels (see cluster_buildings)
+    as AggregatedBuildings.
+
+    The conductances, capacities, areas and gains of the buildings are
+    summed up, the air change rates averaged weighted by the floor area. The
+    outside temperature is averaged weighted by the conductances to the
+    exterior. t_outside, solar_gains and internal_gains are one profile (T)
+    for all buildings or one profile per building (N x T).
+    """
+    configs = _as_batch(building_configs)
+    labels = np.asarray(labels)
+    number_of_buildings = len(configs)
+    number_of_clusters = labels.max() + 1
+    # indicator matrix (clusters x buildings)
+    members = labels == np.arange(number_of_clusters)[:, np.newaxis]
+
+    floor_area = members @ configs.floor_area
+    columns = {}
+    for name in building_config_fields:
+        values = getattr(configs, name)
+        if name in extensive_parameters:
+            columns[name] = members @ values
+        else:
+            columns[name] = members @ (values * configs.floor_area) / floor_area
+
+    h_exterior = configs.h_tr_em + configs.h_tr_w + configs.h_ve
+    t_outside = _profiles(t_outside, number_of_buildings)
+    return AggregatedBuildings(
+        configs=BuildingConfigBatch(**columns),
+        labels=labels,
+        t_outside=(members * h_exterior) @ t_outside / (members @ h_exterior)[
+            :, np.newaxis
+        ],
+        solar_gains=members @ _profiles(solar_gains, number_of_buildings),
+        internal_gains=members @ _profiles(internal_gains, number_of_buildings),
+    )
+
+
+def simulate_heat_demand(
+    building_configs,
+    t_outside,
+    solar_gains,
+    internal_gains,
+    timeincrement=1,
+    t_set_heating=20,
+    t_inital=20,
+):
+    """
+    Heat demand in W (N x T) of ideal heating, which keeps the air
+    temperature of every building at least at t_set_heating, and the air
+    temperature in Celsius (N x T), both for the timesteps of timeincrement
+    hours (number or list).
+    """
+    configs = _as_batch(building_configs)
+    fleet = M5RCFleet(
+        label="simulation",
+        building_configs=configs,
+        t_outside=t_outside,
+        solar_gains=solar_gains,
+        internal_gains=internal_gains,
+        t_set_heating=t_set_heating,
+        t_inital=t_inital,
+    )
+    number_of_time_steps = fleet.t_e.shape[1]
+    timeincrement = np.broadcast_to(
+        np.asarray(timeincrement, dtype=float), (number_of_time_steps,)
+    )
+    shape = (len(configs), number_of_time_steps)
+    c = {
+        name: np.broadcast_to(value, shape)
+        for name, value in fleet.calc_linear_coefficients(timeincrement).items()
+    }
+    heat_demand = np.empty(shape)
+    t_air = np.empty(shape)
+    t_m = np.array(fleet.t_inital, dtype=float)
+    for t in range(number_of_time_steps):
+        # t_air(t+1) = free + slope * phi_hc_nd(t), see calc_linear_coefficients
+        free_t_m = c["t_m_t_m"][:, t] * t_m + c["t_m_constant"][:, t]
+        free = (
+            c["t_air_t_m"][:, t] * (t_m + free_t_m) + c["t_air_constant"][:, t]
+        )
+        slope = c["t_air_t_m"][:, t] * c["t_m_phi"][:, t] + c["t_air_phi"][:, t]
+        heat_demand[:, t] = np.maximum(fleet.t_set_heating - free, 0) / slope
+        t_air[:, t] = free + slope * heat_demand[:, t]
+        t_m = free_t_m + c["t_m_phi"][:, t] * heat_demand[:, t]
+    return heat_demand, t_air
+
+
+def calc_aggregation_error(
+    building_configs,
+    t_outside,
+    solar_gains,
+    internal_gains,
+    aggregated,
+    timeincrement=1,
+    t_set_heating=20,
+    t_inital=20,
+):
+    """
+    Deaggregation error of AggregatedBuildings, compared by the heat demand
+    of ideal heating (see simulate_heat_demand).
+
+    Returns a DataFrame with one row per cluster and the columns
+    number_of_buildings, time_constant (mean in hours), heat_demand and
+    heat_demand_aggregated (in Wh), energy_error (relative), peak_error
+    (relative) and rmse (of the heat demand in W).
+    """
+    configs = _as_batch(building_configs)
+    heat_demand, _ = simulate_heat_demand(
+        configs,
+        t_outside,
+        solar_gains,
+        internal_gains,
+        timeincrement=timeincrement,
+        t_set_heating=t_set_heating,
+        t_inital=t_inital,
+    )
+    heat_demand_aggregated, _ = simulate_heat_demand(
+        aggregated.configs,
+        aggregated.t_outside,
+        aggregated.solar_gains,
+        aggregated.internal_gains,
+        timeincrement=timeincrement,
+        t_set_heating=t_set_heating,
+        t_inital=t_inital,
+    )
+    number_of_clusters = len(aggregated.configs)
+    members = aggregated.labels == np.arange(number_of_clusters)[:, np.newaxis]
+    heat_demand_clusters = members @ heat_demand
+    timeincrement = np.broadcast_to(
+        np.asarray(timeincrement, dtype=float), (heat_demand.shape[1],)
+    )
+    energy = heat_demand_clusters @ timeincrement
+    energy_aggregated = heat_demand_aggregated @ timeincrement
+    peak = heat_demand_clusters.max(axis=1)
+    time_constants = calc_time_constants(configs)
+    # clusters without heat demand have no relative errors
+    with np.errstate(divide="ignore", invalid="ignore"):
+        energy_error = np.where(
+            energy > 0, (energy_aggregated - energy) / energy, np.nan
+        )
+        peak_error = np.where(
+            peak > 0, (heat_demand_aggregated.max(axis=1) - peak) / peak, np.nan
+        )
+    return pd.DataFrame(
+        {
+            "number_of_buildings": members.sum(axis=1),
+            "time_constant": members @ time_constants / members.sum(axis=1),
+            "heat_demand": energy,
+            "heat_demand_aggregated": energy_aggregated,
+            "energy_error": energy_error,
+            "peak_error": peak_error,
+            "rmse": np.sqrt(
+                np.mean((heat_demand_aggregated - heat_demand_clusters) ** 2, axis=1)
+            ),
+        }
+    )
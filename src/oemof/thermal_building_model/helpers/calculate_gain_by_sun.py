@@ -4,9 +4,17 @@ Tool to Evaluate Radiation incident on a surface of a set angle
 """
 
 import pandas as pd
+import numpy as np
 import math
 import datetime
 
+from oemof.thermal_building_model.helpers.weather_reader import (
+    calc_weather_file_hash,
+    iter_resampled_weather,
+    read_weather_file,
+    read_weather_file_header,
+)
+
 r"""
 The BuildingConfig gets generated by the function build_building_config of the building class
 
@@ -50,63 +58,256 @@ SPDX-License-Identifier: MIT
 """
 
 
+compass_directions = {
+    "north": {"azimuth_tilt": 270, "alititude_tilt": 90},
+    "east": {"azimuth_tilt": 90, "alititude_tilt": 90},
+    "south": {"azimuth_tilt": 180, "alititude_tilt": 90},
+    "west": {"azimuth_tilt": 0, "alititude_tilt": 90},
+    "horizontal": {"azimuth_tilt": 0, "alititude_tilt": 0},
+}
+
+
 def sunPositionReader(SunPosition_path):
     sun_labels = ["altitude", "azimuth"]  # 'HOY',
     result = pd.read_csv(SunPosition_path, skiprows=1, names=sun_labels)
     return result
 
 
+def calc_sun_position_array(
+    latitude_deg, longitude_deg, year=None, hoy=None, timeindex=None
+):
+    """
+    Calculates the Sun Position for many hours at once. The formulas are the
+    same as in Location.calc_sun_position, but evaluated with numpy on whole
+    arrays instead of one datetime per hour.
+    :param latitude_deg: Geographical Latitude in Degrees
+    :type latitude_deg: float
+    :param longitude_deg: Geographical Longitude in Degrees
+    :type longitude_deg: float
+    :param year: year, only used together with hoy
+    :type year: int
+    :param hoy: Hours of the year from the start, may be fractional
+    :type hoy: array-like
+    :param timeindex: Timestamps (UTC) used instead of year and hoy
+    :type timeindex: pd.DatetimeIndex
+    :return: altitude, azimuth: Sun positions in altitude and azimuth degrees [degrees]
+    :rtype: tuple of np.ndarray
+    """
+    if timeindex is None:
+        if year is None or hoy is None:
+            raise ValueError("Either timeindex or year and hoy have to be given.")
+        seconds = np.round(np.asarray(hoy, dtype=float) * 3600).astype("int64")
+        utc_datetime = np.datetime64(str(year), "s") + seconds.astype(
+            "timedelta64[s]"
+        )
+    else:
+        timeindex = pd.DatetimeIndex(timeindex)
+        if timeindex.tz is not None:
+            timeindex = timeindex.tz_convert("UTC").tz_localize(None)
+        utc_datetime = timeindex.to_numpy().astype("datetime64[s]")
+
+    utc_day = utc_datetime.astype("datetime64[D]")
+    day_of_year = (
+        utc_day - utc_datetime.astype("datetime64[Y]").astype("datetime64[D]")
+    ).astype(float) + 1
+    # hour * 60 + minute, seconds are dropped as in the scalar version
+    minute_of_day = np.floor(
+        (utc_datetime - utc_day).astype("timedelta64[s]").astype(float) / 60
+    )
+
+    latitude_rad = np.radians(latitude_deg)
+    declination_rad = np.radians(
+        23.45 * np.sin((2 * np.pi / 365.0) * (day_of_year - 81))
+    )
+    angle_of_day = (day_of_year - 81) * (2 * np.pi / 364)
+    equation_of_time = (
+        (9.87 * np.sin(2 * angle_of_day))
+        - (7.53 * np.cos(angle_of_day))
+        - (1.5 * np.sin(angle_of_day))
+    )
+    solar_time = (minute_of_day + (4 * longitude_deg) + equation_of_time) / 60.0
+    hour_angle_rad = np.radians(15 * (12 - solar_time))
+
+    altitude_rad = np.arcsin(
+        np.clip(
+            np.cos(latitude_rad) * np.cos(declination_rad) * np.cos(hour_angle_rad)
+            + np.sin(latitude_rad) * np.sin(declination_rad),
+            -1.0,
+            1.0,
+        )
+    )
+    azimuth_rad = np.arcsin(
+        np.clip(
+            np.cos(declination_rad) * np.sin(hour_angle_rad) / np.cos(altitude_rad),
+            -1.0,
+            1.0,
+        )
+    )
+    altitude = np.degrees(altitude_rad)
+    azimuth = np.where(
+        np.cos(hour_angle_rad) >= np.tan(declination_rad) / np.tan(latitude_rad),
+        np.degrees(azimuth_rad),
+        180 - np.degrees(azimuth_rad),
+    )
+    return altitude, azimuth
+
+
 class Location(
     object,
 ):
-    """Set the Location of the Simulation with an Energy Plus Weather File"""
-
-    def __init__(self, epwfile_path):
-        epw_labels = [
-            "year",
-            "month",
-            "day",
-            "hour",
-            "minute",
-            "datasource",
-            "drybulb_C",
-            "dewpoint_C",
-            "relhum_percent",
-            "atmos_Pa",
-            "exthorrad_Whm2",
-            "extdirrad_Whm2",
-            "horirsky_Whm2",
-            "glohorrad_Whm2",
-            "dirnorrad_Whm2",
-            "difhorrad_Whm2",
-            "glohorillum_lux",
-            "dirnorillum_lux",
-            "difhorillum_lux",
-            "zenlum_lux",
-            "winddir_deg",
-            "windspd_ms",
-            "totskycvr_tenths",
-            "opaqskycvr_tenths",
-            "visibility_km",
-            "ceiling_hgt_m",
-            "presweathobs",
-            "presweathcodes",
-            "precip_wtr_mm",
-            "aerosol_opt_thousandths",
-            "snowdepth_cm",
-            "days_last_snow",
-            "Albedo",
-            "liq_precip_depth_mm",
-            "liq_precip_rate_Hour",
-        ]
-        self.weather_data = pd.read_csv(
-            epwfile_path,
-            skiprows=8,
-            header=None,
-            names=epw_labels,
-            encoding="ISO-8859-1",
-            engine="python",
-        ).drop("datasource", axis=1)
+    """Set the Location of the Simulation with an Energy Plus Weather File
+
+    Only the columns given by columns are read, e.g. model_columns of the
+    weather_reader. With use_cache the parsed data is stored in the cache
+    directory (see get_cache_dir) and loaded from it on later runs. The
+    station name and coordinates are taken from the LOCATION line of the file.
+    """
+
+    def __init__(self, epwfile_path, columns=None, use_cache=False):
+        weather_data = read_weather_file(
+            epwfile_path=epwfile_path, columns=columns, use_cache=use_cache
+        )
+        header = read_weather_file_header(epwfile_path)
+        self._initialize(
+            weather_data=weather_data,
+            station=header["station"],
+            latitude_deg=header["latitude_deg"],
+            longitude_deg=header["longitude_deg"],
+            epwfile_path=epwfile_path,
+        )
+
+    def _initialize(
+        self,
+        weather_data,
+        station,
+        latitude_deg,
+        longitude_deg,
+        epwfile_path=None,
+        weather_file_hash=None,
+        timestep_hours=1,
+    ):
+        """Sets the attributes of both __init__ and from_weather_data"""
+        self.weather_data = weather_data
+        self.station = station
+        self.latitude_deg = latitude_deg
+        self.longitude_deg = longitude_deg
+        self.timestep_hours = timestep_hours
+        self.epwfile_path = epwfile_path
+        self._weather_file_hash = weather_file_hash
+        self._sun_positions = {}
+
+    @classmethod
+    def from_weather_data(
+        cls,
+        weather_data,
+        station=None,
+        latitude_deg=None,
+        longitude_deg=None,
+        weather_file_hash=None,
+        timestep_hours=1,
+    ):
+        """
+        Creates a Location from already loaded weather data, e.g. a view
+        into a WeatherStore, without reading a weather file. The
+        weather_file_hash identifies the data in the irradiance cache.
+        """
+        location = cls.__new__(cls)
+        location._initialize(
+            weather_data=weather_data,
+            station=station,
+            latitude_deg=latitude_deg,
+            longitude_deg=longitude_deg,
+            weather_file_hash=weather_file_hash,
+            timestep_hours=timestep_hours,
+        )
+        return location
+
+    def iter_weather_chunks(self, timestep_hours=None, chunk_size=744, columns=None):
+        """
+        Yields the weather data resampled to timestep_hours as dicts of
+        np.ndarray, see iter_resampled_weather. chunk_size is given in
+        timesteps of this Location.
+        """
+        if timestep_hours is None:
+            timestep_hours = self.timestep_hours
+        return iter_resampled_weather(
+            weather_data=self.weather_data,
+            timestep_hours=timestep_hours,
+            source_timestep_hours=self.timestep_hours,
+            chunk_size=chunk_size,
+            columns=columns,
+        )
+
+    def resample(self, timestep_hours, columns=None):
+        """
+        Location with the weather data resampled to timestep_hours, e.g. 0.25
+        for 15 min or 3 for three hourly steps. Sun positions of the new
+        Location are calculated at the matching timestamps.
+        """
+        chunks = list(
+            self.iter_weather_chunks(timestep_hours=timestep_hours, columns=columns)
+        )
+        weather_data = pd.DataFrame(
+            {
+                column: np.concatenate([chunk[column] for chunk in chunks])
+                for column in chunks[0]
+            }
+        )
+        weather_file_hash = None
+        if self._weather_file_hash is not None or self.epwfile_path is not None:
+            weather_file_hash = self.weather_file_hash
+        return Location.from_weather_data(
+            weather_data=weather_data,
+            station=self.station,
+            latitude_deg=self.latitude_deg,
+            longitude_deg=self.longitude_deg,
+            weather_file_hash=weather_file_hash,
+            timestep_hours=timestep_hours,
+        )
+
+    @property
+    def weather_file_hash(self):
+        """sha256 hash of the content of the weather file"""
+        if self._weather_file_hash is None:
+            if self.epwfile_path is None:
+                raise AttributeError(
+                    "The Location has no weather file, pass weather_file_hash "
+                    "to from_weather_data."
+                )
+            self._weather_file_hash = calc_weather_file_hash(self.epwfile_path)
+        return self._weather_file_hash
+
+    def calc_sun_positions(
+        self, latitude_deg, longitude_deg, year=None, hoy=None, timeindex=None
+    ):
+        """
+        Calculates the Sun Positions for a whole horizon, see
+        calc_sun_position_array. The sun geometry only depends on the site,
+        so the result is kept on the Location and shared by all buildings
+        using it. The returned arrays must not be modified.
+        :return: altitude, azimuth: Sun positions in altitude and azimuth degrees [degrees]
+        :rtype: tuple of np.ndarray
+        """
+        if timeindex is None:
+            if hoy is None:
+                raise ValueError("Either timeindex or year and hoy have to be given.")
+            hoy = np.asarray(hoy, dtype=float)
+            key = (latitude_deg, longitude_deg, year, hoy.tobytes())
+        else:
+            timeindex = pd.DatetimeIndex(timeindex)
+            key = (latitude_deg, longitude_deg, timeindex.asi8.tobytes())
+        if key not in self._sun_positions:
+            altitude, azimuth = calc_sun_position_array(
+                latitude_deg=latitude_deg,
+                longitude_deg=longitude_deg,
+                year=year,
+                hoy=hoy,
+                timeindex=timeindex,
+            )
+            altitude.flags.writeable = False
+            azimuth.flags.writeable = False
+            self._sun_positions[key] = (altitude, azimuth)
+        return self._sun_positions[key]
 
     def calc_sun_position(self, latitude_deg, longitude_deg, year, hoy):
         """
@@ -189,6 +390,101 @@ class Location(
             return math.degrees(altitude_rad), (180 - math.degrees(azimuth_rad))
 
 
+def calc_orientation_factors(sun_altitude, sun_azimuth, directions=None):
+    """
+    Calculates the direct and diffuse solar factors of all window orientations
+    :param sun_altitude: Altitude Angles of the Sun in Degrees
+    :type sun_altitude: np.ndarray
+    :param sun_azimuth: Azimuth angles of the sun in degrees
+    :type sun_azimuth: np.ndarray
+    :param directions: Window orientations, default is compass_directions
+    :type directions: dict
+    :return: direct_factors (orientations x timesteps), diffuse_factors (orientations x 1)
+    :rtype: tuple of np.ndarray
+    """
+    if directions is None:
+        directions = compass_directions
+    windows = [
+        Window(
+            azimuth_tilt=direction["azimuth_tilt"],
+            alititude_tilt=direction["alititude_tilt"],
+        )
+        for direction in directions.values()
+    ]
+    direct_factors = np.vstack(
+        [
+            window.calc_direct_solar_factor_array(sun_altitude, sun_azimuth)
+            for window in windows
+        ]
+    )
+    diffuse_factors = np.array(
+        [[window.calc_diffuse_solar_factor()] for window in windows]
+    )
+    return direct_factors, diffuse_factors
+
+
+def calc_orientation_irradiance(
+    object_location,
+    latitude_deg,
+    longitude_deg,
+    year,
+    number_of_time_steps,
+    directions=None,
+):
+    """
+    Calculates the incident irradiance per m2 of window area for all
+    orientations. The result does not depend on the building.
+    :return: irradiance in W/m2 (orientations x timesteps)
+    :rtype: np.ndarray
+    """
+    altitude, azimuth = object_location.calc_sun_positions(
+        latitude_deg=latitude_deg,
+        longitude_deg=longitude_deg,
+        year=year,
+        hoy=np.arange(number_of_time_steps) * object_location.timestep_hours,
+    )
+    direct_factors, diffuse_factors = calc_orientation_factors(
+        sun_altitude=altitude, sun_azimuth=azimuth, directions=directions
+    )
+    normal_direct_radiation = object_location.weather_data[
+        "dirnorrad_Whm2"
+    ].to_numpy(dtype=float)[:number_of_time_steps]
+    horizontal_diffuse_radiation = object_location.weather_data[
+        "difhorrad_Whm2"
+    ].to_numpy(dtype=float)[:number_of_time_steps]
+    return (
+        direct_factors * normal_direct_radiation
+        + horizontal_diffuse_radiation * diffuse_factors
+    )
+
+
+def calc_solar_gains_fleet(window_areas, g_gl_n_window_avg, irradiance):
+    """
+    Calculates the solar gains of many buildings with one matrix product
+    :param window_areas: Window areas per building and orientation in m2 (buildings x orientations)
+    :type window_areas: array-like
+    :param g_gl_n_window_avg: Area weighted g-value of the windows per building
+    :type g_gl_n_window_avg: array-like
+    :param irradiance: Incident irradiance in W/m2 (orientations x timesteps), see calc_orientation_irradiance
+    :type irradiance: np.ndarray
+    :return: Solar gains in W (buildings x timesteps)
+    :rtype: np.ndarray
+    """
+    window_areas = np.atleast_2d(np.asarray(window_areas, dtype=float))
+    g_gl_n_window_avg = np.asarray(g_gl_n_window_avg, dtype=float).reshape(-1, 1)
+    if window_areas.shape[1] != irradiance.shape[0]:
+        raise ValueError(
+            "The window areas have {0} orientations, but the irradiance has "
+            "{1}.".format(window_areas.shape[1], irradiance.shape[0])
+        )
+    if g_gl_n_window_avg.shape[0] != window_areas.shape[0]:
+        raise ValueError(
+            "One g-value per building is needed, got {0} for {1} "
+            "buildings.".format(g_gl_n_window_avg.shape[0], window_areas.shape[0])
+        )
+    return (window_areas * g_gl_n_window_avg) @ irradiance
+
+
 class Window(object):
     """docstring for Window"""
 
@@ -307,6 +603,23 @@ class Window(object):
 
         return direct_factor
 
+    def calc_direct_solar_factor_array(self, sun_altitude, sun_azimuth):
+        """
+        Calculates the cosine of the angle of incidence on the window
+        for arrays of sun positions, see calc_direct_solar_factor
+        """
+        sun_altitude_rad = np.radians(sun_altitude)
+        sun_azimuth_rad = np.radians(sun_azimuth)
+        direct_factor = np.cos(sun_altitude_rad) * math.sin(
+            self.alititude_tilt_rad
+        ) * np.cos(sun_azimuth_rad - self.azimuth_tilt_rad) + np.sin(
+            sun_altitude_rad
+        ) * math.cos(
+            self.alititude_tilt_rad
+        )
+        # If the sun is behind the window surface
+        return np.where(direct_factor < 0, 0.0, direct_factor)
+
     def calc_diffuse_solar_factor(self):
         """Calculates the proportion of diffuse radiation"""
         # Proportion of incident light on the window surface
@@ -0,0 +1,150 @@
+"""Orientation irradiance cache
+
+The incident irradiance per m2 window area on the orientations of
+compass_directions only depends on the weather file and the location, not on
+the building. It is stored once in memory and optionally on disk, so the solar
+gains of a building reduce to a weighted sum of the cached profiles. The
+module instance irradiance_cache only keeps the profiles in memory, pass an
+OrientationIrradianceCache with a cache directory to keep them between runs.
+
+SPDX-License-Identifier: MIT
+
+"""
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+from oemof.thermal_building_model.helpers.path_helper import get_cache_dir
+from oemof.thermal_building_model.helpers.calculate_gain_by_sun import (
+    calc_orientation_irradiance,
+    compass_directions,
+)
+
+
+class OrientationIrradianceCache:
+    r"""
+    Cache of unit-area orientation irradiance profiles
+
+    Parameters
+    ----------
+    cache_dir : str or Path
+        Directory of the npz files. Default is get_cache_dir("irradiance").
+        With cache_dir=False the profiles are only kept in memory.
+    maxsize : int
+        Number of profiles kept in memory, the least recently used profile is
+        dropped first.
+    """
+
+    def __init__(self, cache_dir=None, maxsize: int = 32):
+        if cache_dir is None:
+            cache_dir = get_cache_dir("irradiance")
+        self.cache_dir = cache_dir
+        self.maxsize = maxsize
+        self._profiles = OrderedDict()
+
+    @staticmethod
+    def make_key(
+        object_location,
+        latitude_deg,
+        longitude_deg,
+        year,
+        number_of_time_steps,
+        timestep_hours=1,
+    ):
+        return (
+            object_location.weather_file_hash,
+            float(latitude_deg),
+            float(longitude_deg),
+            int(year),
+            int(number_of_time_steps),
+            float(timestep_hours),
+            tuple(compass_directions),
+        )
+
+    def _file_path(self, key):
+        name = hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+        return os.path.join(self.cache_dir, name + ".npz")
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+        file_path = self._file_path(key)
+        if not os.path.exists(file_path):
+            return None
+        with np.load(file_path) as data:
+            if str(data["key"]) != repr(key):
+                return None
+            return data["irradiance"]
+
+    def _save(self, key, irradiance):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # write to a temporary file first, so parallel workers never
+            # read a partially written profile
+            file_descriptor, tmp_path = tempfile.mkstemp(
+                dir=self.cache_dir, suffix=".npz"
+            )
+            with os.fdopen(file_descriptor, "wb") as file:
+                np.savez(file, key=np.array(repr(key)), irradiance=irradiance)
+            os.replace(tmp_path, self._file_path(key))
+        except OSError:
+            # the cache directory is not writable, keep the profile in memory
+            pass
+
+    def get_irradiance(
+        self,
+        object_location,
+        latitude_deg,
+        longitude_deg,
+        year,
+        number_of_time_steps,
+    ):
+        """
+        Returns the incident irradiance in W/m2 for all orientations
+        (orientations x timesteps) as read-only array. Missing profiles are
+        calculated with calc_orientation_irradiance and added to the cache.
+        """
+        key = self.make_key(
+            object_location=object_location,
+            latitude_deg=latitude_deg,
+            longitude_deg=longitude_deg,
+            year=year,
+            number_of_time_steps=number_of_time_steps,
+            timestep_hours=object_location.timestep_hours,
+        )
+        if key in self._profiles:
+            self._profiles.move_to_end(key)
+            return self._profiles[key]
+
+        irradiance = self._load(key)
+        if irradiance is None:
+            irradiance = calc_orientation_irradiance(
+                object_location=object_location,
+                latitude_deg=latitude_deg,
+                longitude_deg=longitude_deg,
+                year=year,
+                number_of_time_steps=number_of_time_steps,
+            )
+            self._save(key, irradiance)
+        irradiance.flags.writeable = False
+
+        self._profiles[key] = irradiance
+        while len(self._profiles) > self.maxsize:
+            self._profiles.popitem(last=False)
+        return irradiance
+
+    def clear(self, disk: bool = False):
+        """Empties the memory cache and optionally removes the npz files"""
+        self._profiles.clear()
+        if disk and self.cache_dir and os.path.isdir(self.cache_dir):
+            for file_name in os.listdir(self.cache_dir):
+                if file_name.endswith(".npz"):
+                    os.remove(os.path.join(self.cache_dir, file_name))
+
+
+irradiance_cache = OrientationIrradianceCache(cache_dir=False)
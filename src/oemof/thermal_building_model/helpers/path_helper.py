@@ -1,5 +1,21 @@
+import os
 from pathlib import Path
 
 
 def get_project_root() -> Path:
     return Path(__file__).absolute().parent.parent.parent
+
+
+def get_cache_dir(*subdirs) -> Path:
+    """
+    Directory for files cached by the thermal building model. It defaults to
+    ~/.oemof/thermal_building_model/cache and can be changed with the
+    environment variable OEMOF_THERMAL_BUILDING_MODEL_CACHE.
+    """
+    cache_dir = os.environ.get(
+        "OEMOF_THERMAL_BUILDING_MODEL_CACHE",
+        os.path.join(
+            os.path.expanduser("~"), ".oemof", "thermal_building_model", "cache"
+        ),
+    )
+    return Path(cache_dir, *subdirs)
@@ -0,0 +1,186 @@
+"""Rolling horizon operation
+
+Operational dispatch over a long horizon is solved window by window (e.g.
+48 h), of which only the first timesteps (e.g. 24 h) are committed. The
+model is built once for the length of a window. For every window the time
+series of the M5RC buildings are shifted and the air and mass temperature
+at the end of the committed timesteps become the initial temperatures of
+the next window, so the size of the model does not grow with the horizon.
+
+SPDX-License-Identifier: MIT
+
+"""
+import numpy as np
+import pandas as pd
+from pyomo.environ import Block
+from pyomo.opt import TerminationCondition
+
+from oemof.thermal_building_model.m_5RC import GenericBuildingBlock
+from oemof.thermal_building_model.m_5RC import ReducedGenericBuildingBlock
+from oemof.thermal_building_model.m_5RC_fleet import M5RCFleetBlock
+
+# time series of M5RC used by the building blocks
+building_time_series = ("t_e", "phi_ia", "phi_st", "phi_m")
+building_blocks = (GenericBuildingBlock, ReducedGenericBuildingBlock)
+
+
+class RollingHorizon:
+    r"""
+    Solves a model with M5RC buildings in consecutive windows
+
+    The model has the timesteps of one window and the buildings hold the
+    time series of the whole horizon, e.g. one year. Data of other
+    components, like prices or fixed flows, can be changed for each window
+    by update.
+
+    Parameters
+    ----------
+    model : solph.Model
+        Model of one window, the number of its timesteps is the window. The
+        model must not contain M5RCFleet, its time series are not shifted.
+    commit : int
+        Number of timesteps of a window, which are committed. The next
+        window starts after them.
+    number_of_time_steps : int
+        Length of the horizon. Default is the length of the shortest time
+        series of the buildings.
+    update : callable
+        update(model, start) is called before each window is solved with the
+        first timestep of the window in the horizon.
+    solver : str
+        Solver passed to model.solve.
+    \**solve_kwargs
+        Further arguments of model.solve, e.g. solve_kwargs or
+        cmdline_options.
+    """
+
+    def __init__(
+        self,
+        model,
+        commit: int = 24,
+        number_of_time_steps: int = None,
+        update=None,
+        solver: str = "cbc",
+        **solve_kwargs,
+    ):
+        self.model = model
+        self.window = len(model.TIMESTEPS)
+        self.commit = int(commit)
+        if not 0 < self.commit <= self.window:
+            raise ValueError(
+                "commit has to be between 1 and the window of {0} timesteps, "
+                "got {1}.".format(self.window, commit)
+            )
+        for block in model.component_objects(Block):
+            if isinstance(block, M5RCFleetBlock):
+                raise ValueError(
+                    "M5RCFleet can not be solved in a rolling horizon, use "
+                    "M5RC for the buildings."
+                )
+        self.blocks = [
+            block
+            for block in model.component_objects(Block)
+            if isinstance(block, building_blocks) and hasattr(block, "BUILDING")
+        ]
+        self.buildings = [n for block in self.blocks for n in block.BUILDING]
+        for n in self.buildings:
+            if n.typical_periods is not None:
+                raise ValueError(
+                    "{0} with typical periods can not be solved in a rolling "
+                    "horizon.".format(n.label)
+                )
+        # the horizon stays with the driver, the buildings get a window of it
+        self._time_series = {
+            n: {name: getattr(n, name) for name in building_time_series}
+            for n in self.buildings
+        }
+        self._initial_temperatures = {
+            n: (n.t_inital, n.t_m_ts) for n in self.buildings
+        }
+        if number_of_time_steps is None:
+            number_of_time_steps = min(
+                len(values)
+                for series in self._time_series.values()
+                for values in series.values()
+            )
+        self.number_of_time_steps = int(number_of_time_steps)
+        self.update = update
+        self.solver = solver
+        self.solve_kwargs = solve_kwargs
+
+    def _set_window(self, start):
+        """Time series of the window at start, padded with the last values"""
+        for n, series in self._time_series.items():
+            for name, values in series.items():
+                window = values[start : start + self.window]
+                missing = self.window - len(window)
+                if missing > 0:
+                    window = np.pad(window, (0, missing), "edge")
+                setattr(n, name, window)
+
+    def _columns(self):
+        flows = [((str(i), str(o)), "flow") for i, o in self.model.FLOWS]
+        temperatures = [
+            ((str(n.label), "None"), name)
+            for n in self.buildings
+            for name in ("t_air", "t_m_ts")
+        ]
+        return flows + temperatures
+
+    def run(self):
+        """
+        Solves all windows and returns the committed flows and the air and
+        mass temperature of the buildings at the end of every timestep as
+        DataFrame with one row per timestep of the horizon. Raises a
+        RuntimeError, if a window is not solved to optimality.
+        """
+        m = self.model
+        timeindex = list(m.TIMEINDEX)
+        columns = self._columns()
+        results = np.full((self.number_of_time_steps, len(columns)), np.nan)
+        try:
+            for start in range(0, self.number_of_time_steps, self.commit):
+                commit = min(self.commit, self.number_of_time_steps - start)
+                self._set_window(start)
+                for block in self.blocks:
+                    block.update()
+                if self.update is not None:
+                    self.update(m, start)
+                solver_results = m.solve(solver=self.solver, **self.solve_kwargs)
+                termination_condition = solver_results.solver.termination_condition
+                if termination_condition != TerminationCondition.optimal:
+                    raise RuntimeError(
+                        "The window starting at timestep {0} ended with "
+                        "termination condition {1}.".format(
+                            start, termination_condition
+                        )
+                    )
+                for block in self.blocks:
+                    if isinstance(block, ReducedGenericBuildingBlock):
+                        block.load_t_air()
+
+                column = 0
+                for i, o in m.FLOWS:
+                    results[start : start + commit, column] = [
+                        m.flow[i, o, p, t].value for p, t in timeindex[:commit]
+                    ]
+                    column += 1
+                for block in self.blocks:
+                    for n in block.BUILDING:
+                        for var in (block.t_air, block.t_m_ts):
+                            results[start : start + commit, column] = [
+                                var[n, t + 1].value for t in range(commit)
+                            ]
+                            column += 1
+                        # end of the committed timesteps is the next start
+                        n.t_inital = block.t_air[n, commit].value
+                        n.t_m_ts = block.t_m_ts[n, commit].value
+        finally:
+            # the buildings and the model are reset to the start of the horizon
+            for n, series in self._time_series.items():
+                for name, values in series.items():
+                    setattr(n, name, values)
+                n.t_inital, n.t_m_ts = self._initial_temperatures[n]
+            for block in self.blocks:
+                block.update()
+        return pd.DataFrame(results, columns=columns)
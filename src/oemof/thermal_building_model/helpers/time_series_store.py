@@ -0,0 +1,62 @@
+"""Shared time series store
+
+Many buildings of a district use the profiles of the same weather station or
+the same internal gains. The store returns one read-only array for identical
+series, so the buildings share the memory instead of holding copies.
+
+SPDX-License-Identifier: MIT
+
+"""
+import hashlib
+import weakref
+
+import numpy as np
+
+
+class TimeSeriesStore:
+    r"""
+    Deduplicating store of read-only float time series
+
+    The series are held by weak references, so a series is dropped as soon as
+    no building uses it anymore.
+    """
+
+    def __init__(self):
+        self._series = weakref.WeakValueDictionary()
+
+    @staticmethod
+    def make_key(values: np.ndarray):
+        """Hash of the shape and the data of a float array"""
+        values = np.ascontiguousarray(values)
+        digest = hashlib.sha1(memoryview(values).cast("B")).hexdigest()
+        return values.shape, digest
+
+    def get(self, values):
+        """
+        Read-only float array of values, the stored array if an identical
+        series is in the store.
+
+        The first series of a kind is copied into the store, so changes of the
+        input afterwards do not change the stored series.
+        """
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 0:
+            return values
+        key = self.make_key(values)
+        stored = self._series.get(key)
+        if stored is not None and np.array_equal(stored, values):
+            return stored
+        stored = np.array(values, dtype=float, copy=True)
+        stored.flags.writeable = False
+        self._series[key] = stored
+        return stored
+
+    def __len__(self):
+        return len(self._series)
+
+    def clear(self):
+        """Empties the store, the arrays in use are not affected"""
+        self._series.clear()
+
+
+time_series_store = TimeSeriesStore()
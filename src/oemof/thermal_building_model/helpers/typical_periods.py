@@ -0,0 +1,175 @@
+"""Typical periods
+
+Annual time series are clustered into a few typical periods (e.g. days). The
+model is built for the typical periods one after the other, the costs are
+weighted with the number of periods each typical period represents (see
+objective_weighting of solph.Model). M5RC buildings with typical_periods
+link the mass temperature of the typical periods over the original order of
+the periods.
+
+SPDX-License-Identifier: MIT
+
+"""
+import numpy as np
+import pandas as pd
+
+
+class TypicalPeriods:
+    r"""
+    Assignment of the periods of a time series to typical periods
+
+    Parameters
+    ----------
+    order : array-like of int
+        Typical period of every period of the original time series.
+    period_length : int
+        Number of timesteps of a period.
+    representatives : array-like of int
+        Period of the original time series, which is used as typical period
+        by aggregate. Default is the first period of each typical period.
+    """
+
+    def __init__(self, order, period_length: int, representatives=None):
+        self.order = np.asarray(order, dtype=int)
+        self.period_length = int(period_length)
+        self.number_of_typical_periods = int(self.order.max()) + 1
+        self.occurrences = np.bincount(
+            self.order, minlength=self.number_of_typical_periods
+        )
+        if representatives is None:
+            representatives = [
+                int(np.flatnonzero(self.order == k)[0])
+                for k in range(self.number_of_typical_periods)
+            ]
+        self.representatives = np.asarray(representatives, dtype=int)
+
+    @property
+    def number_of_periods(self):
+        """Number of periods of the original time series"""
+        return len(self.order)
+
+    @property
+    def number_of_time_steps(self):
+        """Number of timesteps of all typical periods"""
+        return self.number_of_typical_periods * self.period_length
+
+    def aggregate(self, values):
+        """
+        Typical periods one after the other of a time series (T) or of one
+        time series per row (N x T). Timesteps after the last complete period
+        are dropped.
+        """
+        values = np.asarray(values, dtype=float)
+        periods = values[..., : self.number_of_periods * self.period_length]
+        periods = periods.reshape(
+            values.shape[:-1] + (self.number_of_periods, self.period_length)
+        )
+        typical = periods[..., self.representatives, :]
+        return typical.reshape(values.shape[:-1] + (self.number_of_time_steps,))
+
+    def disaggregate(self, values):
+        """
+        Time series of the original periods of results of the typical
+        periods, (T) or (N x T).
+        """
+        values = np.asarray(values, dtype=float)[..., : self.number_of_time_steps]
+        typical = values.reshape(
+            values.shape[:-1] + (self.number_of_typical_periods, self.period_length)
+        )
+        return typical[..., self.order, :].reshape(
+            values.shape[:-1] + (self.number_of_periods * self.period_length,)
+        )
+
+    def objective_weighting(self, timeincrement=1):
+        """
+        Weight of every timestep of the typical periods, the number of
+        periods the typical period represents times the timeincrement. Use
+        it as objective_weighting of solph.Model.
+        """
+        timeincrement = np.broadcast_to(
+            np.asarray(timeincrement, dtype=float), (self.number_of_time_steps,)
+        )
+        occurrences = np.repeat(self.occurrences, self.period_length)
+        return (occurrences * timeincrement).tolist()
+
+
+def cluster_periods(
+    profiles,
+    period_length: int = 24,
+    number_of_typical_periods: int = 12,
+    seed: int = 0,
+    iterations: int = 100,
+):
+    """
+    Typical periods of profiles by k-means of the periods, the period
+    closest to the mean of each cluster is its representative.
+
+    profiles is a time series (T), an array (T x number of profiles) or a
+    DataFrame with one profile per column. Each profile is scaled to its
+    range, so all profiles have the same influence.
+    """
+    if isinstance(profiles, (pd.DataFrame, pd.Series)):
+        profiles = profiles.to_numpy()
+    profiles = np.asarray(profiles, dtype=float)
+    if profiles.ndim == 1:
+        profiles = profiles[:, np.newaxis]
+    number_of_periods = len(profiles) // period_length
+    if number_of_periods < number_of_typical_periods:
+        raise ValueError(
+            "{0} typical periods need at least {0} periods of {1} timesteps, "
+            "got {2} timesteps.".format(
+                number_of_typical_periods, period_length, len(profiles)
+            )
+        )
+    profiles = profiles[: number_of_periods * period_length]
+    value_range = profiles.max(axis=0) - profiles.min(axis=0)
+    scaled = (profiles - profiles.min(axis=0)) / np.where(
+        value_range > 0, value_range, 1
+    )
+    # one row per period with the profiles one after the other
+    periods = (
+        scaled.reshape(number_of_periods, period_length, -1)
+        .transpose(0, 2, 1)
+        .reshape(number_of_periods, -1)
+    )
+
+    # k-means++ initialisation
+    random = np.random.default_rng(seed)
+    centers = [periods[random.integers(number_of_periods)]]
+    for _ in range(1, number_of_typical_periods):
+        distance = np.min(
+            [((periods - center) ** 2).sum(axis=1) for center in centers], axis=0
+        )
+        if distance.sum() > 0:
+            probability = distance / distance.sum()
+        else:
+            probability = np.full(number_of_periods, 1 / number_of_periods)
+        centers.append(periods[random.choice(number_of_periods, p=probability)])
+    centers = np.array(centers)
+
+    for _ in range(iterations):
+        distance = ((periods[:, np.newaxis, :] - centers) ** 2).sum(axis=2)
+        clusters = distance.argmin(axis=1)
+        new_centers = np.array(
+            [
+                periods[clusters == k].mean(axis=0)
+                if np.any(clusters == k)
+                else centers[k]
+                for k in range(number_of_typical_periods)
+            ]
+        )
+        if np.array_equal(new_centers, centers):
+            break
+        centers = new_centers
+
+    distance = ((periods[:, np.newaxis, :] - centers) ** 2).sum(axis=2)
+    clusters = distance.argmin(axis=1)
+    # drop empty clusters and number the typical periods by first occurrence
+    used, first = np.unique(clusters, return_index=True)
+    order = np.empty(number_of_periods, dtype=int)
+    representatives = []
+    for k, cluster in enumerate(used[np.argsort(first)]):
+        members = np.flatnonzero(clusters == cluster)
+        order[members] = k
+        representatives.append(members[distance[members, cluster].argmin()])
+    return TypicalPeriods(order, period_length, representatives)
@@ -0,0 +1,274 @@
+"""Reader for the EnergyPlus weather files (EPW) of the test reference years
+
+The files in input/weather_files are parsed with the C engine of pandas and
+only the requested columns are read with explicit dtypes. The parsed columns
+are stored as npz file in the cache directory, so later runs load them
+without parsing the csv file again.
+
+SPDX-License-Identifier: MIT
+
+"""
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from oemof.thermal_building_model.helpers.path_helper import get_cache_dir
+
+epw_labels = [
+    "year",
+    "month",
+    "day",
+    "hour",
+    "minute",
+    "datasource",
+    "drybulb_C",
+    "dewpoint_C",
+    "relhum_percent",
+    "atmos_Pa",
+    "exthorrad_Whm2",
+    "extdirrad_Whm2",
+    "horirsky_Whm2",
+    "glohorrad_Whm2",
+    "dirnorrad_Whm2",
+    "difhorrad_Whm2",
+    "glohorillum_lux",
+    "dirnorillum_lux",
+    "difhorillum_lux",
+    "zenlum_lux",
+    "winddir_deg",
+    "windspd_ms",
+    "totskycvr_tenths",
+    "opaqskycvr_tenths",
+    "visibility_km",
+    "ceiling_hgt_m",
+    "presweathobs",
+    "presweathcodes",
+    "precip_wtr_mm",
+    "aerosol_opt_thousandths",
+    "snowdepth_cm",
+    "days_last_snow",
+    "Albedo",
+    "liq_precip_depth_mm",
+    "liq_precip_rate_Hour",
+]
+
+# columns which are used by the thermal building model
+model_columns = [
+    "year",
+    "month",
+    "day",
+    "hour",
+    "minute",
+    "drybulb_C",
+    "dirnorrad_Whm2",
+    "difhorrad_Whm2",
+    "glohorrad_Whm2",
+]
+
+# number of header lines in front of the hourly data
+epw_header_lines = 8
+
+_calendar_columns = {"year", "month", "day", "hour", "minute"}
+
+
+def is_energy_column(column):
+    """Irradiance and illuminance columns are resampled energy-conserving"""
+    return column.endswith(("_Whm2", "_lux"))
+
+
+def _resample_chunk(values, column, factor, upsample, timestep_hours, next_value=None):
+    if column in _calendar_columns:
+        if not upsample:
+            return values[::factor]
+        values = np.repeat(values, factor)
+        if column == "minute":
+            values = values + np.tile(
+                (np.arange(factor) * timestep_hours * 60).astype(values.dtype),
+                len(values) // factor,
+            )
+        return values
+    if not upsample:
+        return values.reshape(-1, factor).mean(axis=1)
+    if is_energy_column(column):
+        # the mean power of the hour is kept in every sub-step
+        return np.repeat(values, factor)
+    # interpolate between the source timesteps, the first value of the next
+    # chunk is needed at the end of the chunk
+    points = values.astype(float)
+    if next_value is not None:
+        points = np.append(points, next_value)
+    return np.interp(
+        np.arange(len(values) * factor) / factor, np.arange(len(points)), points
+    )
+
+
+def iter_resampled_weather(
+    weather_data, timestep_hours, source_timestep_hours=1, chunk_size=744, columns=None
+):
+    """
+    Resamples weather data chunk by chunk. Temperatures and other state
+    values are linearly interpolated, irradiance and illuminance are
+    resampled energy-conserving (mean power per timestep). Downsampling uses
+    the mean of all values within the new timestep.
+    :param weather_data: Weather data with one row per source timestep
+    :type weather_data: pd.DataFrame
+    :param timestep_hours: New length of the timesteps in hours
+    :type timestep_hours: float
+    :param source_timestep_hours: Length of the timesteps of weather_data in hours
+    :type source_timestep_hours: float
+    :param chunk_size: Number of source timesteps per chunk
+    :type chunk_size: int
+    :param columns: Columns to resample. Default are all columns
+    :type columns: list
+    :return: generator of dicts with one np.ndarray per column
+    :rtype: generator
+    """
+    if columns is None:
+        columns = list(weather_data.columns)
+    ratio = source_timestep_hours / timestep_hours
+    upsample = ratio >= 1
+    factor = int(round(ratio if upsample else 1 / ratio))
+    if not np.isclose(ratio if upsample else 1 / ratio, factor):
+        raise ValueError(
+            "The timesteps of {0} h and {1} h have to be integer multiples of "
+            "each other.".format(source_timestep_hours, timestep_hours)
+        )
+    number_of_rows = len(weather_data)
+    if not upsample:
+        if number_of_rows % factor != 0:
+            raise ValueError(
+                "{0} timesteps can not be aggregated to timesteps of "
+                "{1} h.".format(number_of_rows, timestep_hours)
+            )
+        chunk_size = max(factor, chunk_size - chunk_size % factor)
+
+    arrays = {column: weather_data[column].to_numpy() for column in columns}
+    for start in range(0, number_of_rows, chunk_size):
+        end = min(start + chunk_size, number_of_rows)
+        chunk = {}
+        for column, values in arrays.items():
+            chunk[column] = _resample_chunk(
+                values[start:end],
+                column,
+                factor,
+                upsample,
+                timestep_hours,
+                next_value=values[end] if end < number_of_rows else None,
+            )
+        yield chunk
+
+
+def read_weather_file_header(epwfile_path):
+    """
+    Reads the LOCATION line of an epw file without parsing the hourly data
+    :param epwfile_path: Path of the weather file
+    :type epwfile_path: str
+    :return: station, region, country, source, wmo, latitude_deg, longitude_deg, time_zone, elevation
+    :rtype: dict
+    """
+    with open(epwfile_path, encoding="ISO-8859-1") as file:
+        location_line = file.readline().strip()
+    fields = location_line.split(",")
+    if fields[0] != "LOCATION" or len(fields) < 10:
+        raise ValueError(
+            "{0} does not start with a LOCATION line.".format(epwfile_path)
+        )
+    return {
+        "station": fields[1],
+        "region": fields[2],
+        "country": fields[3],
+        "source": fields[4],
+        "wmo": fields[5],
+        "latitude_deg": float(fields[6]),
+        "longitude_deg": float(fields[7]),
+        "time_zone": float(fields[8]),
+        "elevation": float(fields[9]),
+    }
+
+
+def calc_weather_file_hash(epwfile_path):
+    """sha256 hash of the content of a weather file"""
+    with open(epwfile_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def get_epw_dtypes(columns):
+    """Explicit dtypes of the epw columns, the calendar columns are integers"""
+    return {
+        column: ("int64" if column in _calendar_columns else "float64")
+        for column in columns
+    }
+
+
+def _cache_file_path(epwfile_path, columns, cache_dir):
+    stat = os.stat(epwfile_path)
+    key = repr(
+        (os.path.abspath(epwfile_path), stat.st_size, stat.st_mtime_ns, columns)
+    )
+    name = hashlib.sha256(key.encode()).hexdigest()[:32]
+    return os.path.join(cache_dir, name + ".npz"), key
+
+
+def read_weather_file(epwfile_path, columns=None, use_cache=False, cache_dir=None):
+    """
+    Reads the hourly data of an epw file into a DataFrame
+    :param epwfile_path: Path of the weather file
+    :type epwfile_path: str
+    :param columns: Names of epw_labels to read. Default are all columns besides datasource
+    :type columns: list
+    :param use_cache: Load and store the parsed columns as npz file in cache_dir
+    :type use_cache: bool
+    :param cache_dir: Directory of the npz files. Default is get_cache_dir("weather")
+    :type cache_dir: str
+    :return: weather_data
+    :rtype: pd.DataFrame
+    """
+    if columns is None:
+        columns = [label for label in epw_labels if label != "datasource"]
+    columns = list(columns)
+    unknown_columns = set(columns) - set(epw_labels)
+    if unknown_columns:
+        raise ValueError(
+            "Unknown weather columns {0}, choose from epw_labels.".format(
+                sorted(unknown_columns)
+            )
+        )
+
+    if use_cache:
+        if cache_dir is None:
+            cache_dir = get_cache_dir("weather")
+        file_path, key = _cache_file_path(epwfile_path, columns, cache_dir)
+        if os.path.exists(file_path):
+            with np.load(file_path) as data:
+                if str(data["key"]) == key:
+                    return pd.DataFrame({column: data[column] for column in columns})
+
+    weather_data = pd.read_csv(
+        epwfile_path,
+        skiprows=epw_header_lines,
+        header=None,
+        names=epw_labels,
+        usecols=columns,
+        dtype=get_epw_dtypes(columns),
+        encoding="ISO-8859-1",
+        engine="c",
+    )[columns]
+
+    if use_cache:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            file_descriptor, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".npz")
+            with os.fdopen(file_descriptor, "wb") as file:
+                np.savez(
+                    file,
+                    key=np.array(key),
+                    **{column: weather_data[column].to_numpy() for column in columns},
+                )
+            os.replace(tmp_path, file_path)
+        except OSError:
+            # the cache directory is not writable, the data is parsed next time
+            pass
+    return weather_data
@@ -0,0 +1,161 @@
+"""Registry of the bundled weather files
+
+The registry indexes the weather files of input/weather_files by parsing only
+their LOCATION header line. One Location per file is created on first use and
+shared by all buildings of the process. The number of Location objects kept
+alive is bounded.
+
+SPDX-License-Identifier: MIT
+
+"""
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from oemof.thermal_building_model.helpers.path_helper import get_project_root
+from oemof.thermal_building_model.helpers.calculate_gain_by_sun import Location
+from oemof.thermal_building_model.helpers.weather_reader import (
+    read_weather_file_header,
+)
+
+
+def get_weather_file_directory():
+    return os.path.join(
+        get_project_root(), "thermal_building_model", "input", "weather_files"
+    )
+
+
+class WeatherFileRegistry:
+    r"""
+    Index of weather files by TRY region number, station name, federal state
+    (region) and coordinates.
+
+    Parameters
+    ----------
+    directory : str
+        Directory with the weather files. Default are the bundled TRY2035 files.
+    maxsize : int
+        Maximal number of Location objects kept in memory. The least recently
+        used Location is dropped first.
+    location_kwargs : dict
+        Keyword arguments passed to Location, e.g. columns.
+    """
+
+    def __init__(self, directory=None, maxsize: int = 15, location_kwargs=None):
+        if directory is None:
+            directory = get_weather_file_directory()
+        self.directory = directory
+        self.maxsize = maxsize
+        self.location_kwargs = location_kwargs or {}
+        self._stations = None
+        self._locations = OrderedDict()
+
+    @property
+    def stations(self):
+        """DataFrame with one row per weather file, indexed by file name"""
+        if self._stations is None:
+            rows = []
+            for file_name in sorted(os.listdir(self.directory)):
+                if not file_name.endswith((".csv", ".epw")):
+                    continue
+                file_path = os.path.join(self.directory, file_name)
+                header = read_weather_file_header(file_path)
+                prefix = file_name.split("_")[0]
+                header["try_region"] = int(prefix) if prefix.isdigit() else None
+                header["file_path"] = file_path
+                rows.append(pd.Series(header, name=os.path.splitext(file_name)[0]))
+            self._stations = pd.DataFrame(rows)
+        return self._stations
+
+    def find(self, station=None, try_region=None, region=None):
+        """
+        Names of the weather files matching the station name, TRY region
+        number and federal state (region code, e.g. "BW").
+        """
+        mask = np.ones(len(self.stations), dtype=bool)
+        if station is not None:
+            mask &= (self.stations["station"] == station).to_numpy()
+        if try_region is not None:
+            mask &= (self.stations["try_region"] == try_region).to_numpy()
+        if region is not None:
+            mask &= (self.stations["region"] == region).to_numpy()
+        return list(self.stations.index[mask])
+
+    def _resolve(self, key):
+        if key in self.stations.index:
+            return key
+        if isinstance(key, (int, np.integer)):
+            names = self.find(try_region=int(key))
+        else:
+            names = self.find(station=key)
+        if len(names) != 1:
+            raise KeyError(
+                "{0} does not identify exactly one weather file, found "
+                "{1}.".format(key, names)
+            )
+        return names[0]
+
+    def get_location(self, key):
+        """
+        Shared Location of a weather file. key is the file name (without
+        extension), the TRY region number or the station name.
+        """
+        name = self._resolve(key)
+        if name in self._locations:
+            self._locations.move_to_end(name)
+            return self._locations[name]
+        location = Location(
+            epwfile_path=self.stations.loc[name, "file_path"],
+            **self.location_kwargs,
+        )
+        self._locations[name] = location
+        while len(self._locations) > self.maxsize:
+            self._locations.popitem(last=False)
+        return location
+
+    def find_nearest(self, latitude_deg, longitude_deg, chunk_size: int = 100000):
+        """
+        Names of the nearest weather stations (great-circle distance) for
+        scalars or arrays of coordinates. The distances to all stations are
+        evaluated with numpy in chunks, which is faster than a search tree
+        for the small number of stations.
+        """
+        scalar = np.ndim(latitude_deg) == 0 and np.ndim(longitude_deg) == 0
+        latitude_rad = np.radians(np.atleast_1d(latitude_deg).astype(float))
+        longitude_rad = np.radians(np.atleast_1d(longitude_deg).astype(float))
+        latitude_rad, longitude_rad = np.broadcast_arrays(latitude_rad, longitude_rad)
+        station_latitude_rad = np.radians(
+            self.stations["latitude_deg"].to_numpy(dtype=float)
+        )
+        station_longitude_rad = np.radians(
+            self.stations["longitude_deg"].to_numpy(dtype=float)
+        )
+
+        nearest = np.empty(latitude_rad.shape, dtype=int)
+        for start in range(0, len(latitude_rad), chunk_size):
+            end = start + chunk_size
+            # haversine term, monotonic in the great-circle distance
+            haversine = (
+                np.sin((station_latitude_rad - latitude_rad[start:end, None]) / 2)
+                ** 2
+                + np.cos(latitude_rad[start:end, None])
+                * np.cos(station_latitude_rad)
+                * np.sin(
+                    (station_longitude_rad - longitude_rad[start:end, None]) / 2
+                )
+                ** 2
+            )
+            nearest[start:end] = np.argmin(haversine, axis=1)
+        names = self.stations.index.to_numpy()[nearest]
+        return names[0] if scalar else names
+
+    def get_nearest_location(self, latitude_deg, longitude_deg):
+        """Shared Location of the weather station nearest to the coordinates"""
+        return self.get_location(
+            self.find_nearest(latitude_deg=latitude_deg, longitude_deg=longitude_deg)
+        )
+
+
+weather_registry = WeatherFileRegistry()
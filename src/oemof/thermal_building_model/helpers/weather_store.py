@@ -0,0 +1,122 @@
+"""Memory-mapped weather store for many stations
+
+The used fields of many weather files are packed into one npy file with the
+layout (station x field x hour). The file is opened memory-mapped, so all
+processes of a process pool share the pages through the operating system
+cache, and Location objects get zero-copy views into it.
+
+SPDX-License-Identifier: MIT
+
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from oemof.thermal_building_model.helpers.calculate_gain_by_sun import Location
+from oemof.thermal_building_model.helpers.weather_reader import (
+    calc_weather_file_hash,
+    model_columns,
+    read_weather_file,
+    read_weather_file_header,
+)
+from oemof.thermal_building_model.helpers.weather_registry import weather_registry
+
+
+def _store_paths(store_path):
+    store_path = str(store_path)
+    if store_path.endswith(".npy"):
+        store_path = store_path[: -len(".npy")]
+    return store_path + ".npy", store_path + ".json"
+
+
+def pack_weather_store(store_path, epwfile_paths=None, fields=None):
+    """
+    Packs weather files into one memory-mappable store
+    :param store_path: Path of the store, a .npy and a .json file are written
+    :type store_path: str
+    :param epwfile_paths: Weather files by station name. Default are all files of the weather_registry
+    :type epwfile_paths: dict
+    :param fields: Columns of the weather files. Default are the model_columns
+    :type fields: list
+    :return: WeatherStore of the written file
+    :rtype: WeatherStore
+    """
+    if epwfile_paths is None:
+        epwfile_paths = weather_registry.stations["file_path"].to_dict()
+    if fields is None:
+        fields = model_columns
+    fields = list(fields)
+    array_path, metadata_path = _store_paths(store_path)
+
+    stations = {}
+    weather_data = {}
+    for name, epwfile_path in epwfile_paths.items():
+        weather_data[name] = read_weather_file(
+            epwfile_path=epwfile_path, columns=fields
+        )
+        stations[name] = read_weather_file_header(epwfile_path)
+        stations[name]["weather_file_hash"] = calc_weather_file_hash(epwfile_path)
+    number_of_hours = {len(data) for data in weather_data.values()}
+    if len(number_of_hours) != 1:
+        raise ValueError(
+            "All weather files need the same number of hours, got "
+            "{0}.".format(sorted(number_of_hours))
+        )
+
+    array = np.lib.format.open_memmap(
+        array_path,
+        mode="w+",
+        dtype="float64",
+        shape=(len(weather_data), len(fields), number_of_hours.pop()),
+    )
+    for position, data in enumerate(weather_data.values()):
+        array[position] = data.to_numpy(dtype="float64").T
+    array.flush()
+    del array
+
+    with open(metadata_path, "w") as file:
+        json.dump({"fields": fields, "stations": stations}, file, indent=2)
+    return WeatherStore(store_path)
+
+
+class WeatherStore:
+    r"""
+    Read-only, memory-mapped weather data of many stations
+
+    Parameters
+    ----------
+    store_path : str
+        Path of a store written by pack_weather_store.
+    """
+
+    def __init__(self, store_path):
+        array_path, metadata_path = _store_paths(store_path)
+        with open(metadata_path) as file:
+            metadata = json.load(file)
+        self.fields = metadata["fields"]
+        self.station_info = metadata["stations"]
+        self.stations = list(self.station_info)
+        self.data = np.load(array_path, mmap_mode="r")
+
+    def __len__(self):
+        return len(self.stations)
+
+    def get_array(self, station):
+        """View (field x hour) into the store"""
+        return self.data[self.stations.index(station)]
+
+    def get_weather_data(self, station):
+        """DataFrame (hour x field) sharing the memory of the store"""
+        return pd.DataFrame(self.get_array(station).T, columns=self.fields, copy=False)
+
+    def get_location(self, station):
+        """Location with a zero-copy view of the weather data of the station"""
+        info = self.station_info[station]
+        return Location.from_weather_data(
+            weather_data=self.get_weather_data(station),
+            station=info["station"],
+            latitude_deg=info["latitude_deg"],
+            longitude_deg=info["longitude_deg"],
+            weather_file_hash=info["weather_file_hash"],
+        )
@@ -12,12 +12,298 @@ SPDX-License-Identifier: MIT
 
 """
 from typing import List
+
+import numpy as np
 from oemof.network import network
 from oemof.solph._helpers import check_node_object_for_missing_attribute
 from pyomo.core.base.block import ScalarBlock
+from pyomo.environ import Block
 from pyomo.environ import Constraint
 from pyomo.environ import Set
 from pyomo.environ import Var
+from pyomo.environ import value
+from pyomo.core.expr.numeric_expr import LinearExpression
+
+from oemof.thermal_building_model.helpers.time_series_store import (
+    time_series_store as default_time_series_store,
+)
+
+
+def _get_period_length(n, number_of_time_steps):
+    """Length of the typical periods of building n, None without"""
+    typical_periods = getattr(n, "typical_periods", None)
+    if typical_periods is None:
+        return None
+    if typical_periods.number_of_time_steps != number_of_time_steps:
+        raise ValueError(
+            "The typical periods of {0} have {1} timesteps, the model has "
+            "{2}.".format(
+                n.label, typical_periods.number_of_time_steps, number_of_time_steps
+            )
+        )
+    return typical_periods.period_length
+
+
+def _aggregate_time_series(values, typical_periods, name, label):
+    """Time series of the typical periods, a series of all periods is aggregated"""
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 0 or len(values) == typical_periods.number_of_time_steps:
+        return values
+    number_of_original_time_steps = (
+        typical_periods.number_of_periods * typical_periods.period_length
+    )
+    if len(values) == number_of_original_time_steps:
+        return typical_periods.aggregate(values)
+    raise ValueError(
+        "{0} of {1} has {2} timesteps, the typical periods have {3} and the "
+        "original periods {4} timesteps.".format(
+            name,
+            label,
+            len(values),
+            typical_periods.number_of_time_steps,
+            number_of_original_time_steps,
+        )
+    )
+
+
+def _get_t_m_inital(n):
+    """Initial mass temperature of building n, None if it is free"""
+    if isinstance(n.t_m_ts, str):
+        return n.t_inital
+    return n.t_m_ts
+
+
+def _fix_initial_temperatures(block, group):
+    """
+    Fixes t_air and t_m_ts of the buildings in group at timepoint 0, or frees
+    them without initial value
+    """
+    for n in group:
+        if n.t_inital is not None:
+            block.t_air[n, 0] = n.t_inital
+            block.t_air[n, 0].fix()
+        else:
+            block.t_air[n, 0].unfix()
+
+        # with typical periods the initial mass temperature is the start of
+        # the first original period, see period_linkage_t_m
+        if n.typical_periods is not None:
+            continue
+        t_m_inital = _get_t_m_inital(n)
+        if t_m_inital is not None:
+            block.t_m_ts[n, 0] = t_m_inital
+            block.t_m_ts[n, 0].fix()
+        else:
+            block.t_m_ts[n, 0].unfix()
+
+
+def _update_constraints(constraint, expressions):
+    """
+    Sets the existing constraints of constraint to the expressions by id of
+    the node and the last element of the index.
+    """
+    for index, constraint_data in constraint.items():
+        constraint_data.set_value(expressions[id(index[0])][index[-1]])
+
+
+def _create_linear_expressions(m, group, i, o, t_m_ts_var, t_air_var=None):
+    """
+    Linear expressions of the buildings in group by id of the node and
+    timestep, the ids are cheaper to hash than the nodes.
+
+    Returns the balances of t_m_ts and, with t_air_var, the balances of t_air.
+    Without t_air_var the expressions of t_air(t+1) are returned instead of
+    its balances.
+
+    With typical periods, the timepoint after the last timestep of a typical
+    period is the start of the next typical period. The balance of t_m_ts is
+    skipped there and t_m(t+1) is substituted in the balance of t_air.
+    """
+    timeincrement = [m.timeincrement[t] for t in m.TIMESTEPS]
+    timeindex = list(m.TIMEINDEX)
+    balance_t_m = {}
+    expressions_t_air = {}
+    for n in group:
+        # plain floats keep numpy scalars out of the pyomo expressions
+        c = {
+            name: np.broadcast_to(value, (len(timeincrement),)).tolist()
+            for name, value in n.calc_linear_coefficients(timeincrement).items()
+        }
+        period_length = _get_period_length(n, len(timeincrement))
+        # look the variables up once, hashing the nodes is expensive
+        t_m_ts = [t_m_ts_var[n, t] for t in m.TIMEPOINTS]
+        phi_hc_heat = [m.flow[i[n], n, p, t] for p, t in timeindex]
+        phi_hc_cool = [m.flow[n, o[n], p, t] for p, t in timeindex]
+        if t_air_var is not None:
+            t_air = [t_air_var[n, t] for t in m.TIMEPOINTS]
+        balance_t_m[id(n)] = node_t_m = {}
+        expressions_t_air[id(n)] = node_t_air = {}
+        for p, t in timeindex:
+            a_air = c["t_air_t_m"][t]
+            b_air = c["t_air_phi"][t]
+            if period_length is not None and t % period_length == period_length - 1:
+                node_t_m[t] = Constraint.Skip
+                # t_air(t+1) = a_air * (1 + a_m) * t_m(t)
+                #     + (a_air * b_m + b_air) * phi_hc_nd(t) + a_air * c_m + c_air
+                b_air = a_air * c["t_m_phi"][t] + b_air
+                constant = a_air * c["t_m_constant"][t] + c["t_air_constant"][t]
+                coefs = [a_air * (1 + c["t_m_t_m"][t]), b_air, -b_air]
+                variables = [t_m_ts[t], phi_hc_heat[t], phi_hc_cool[t]]
+            else:
+                # t_m(t+1) = a_m * t_m(t) + b_m * phi_hc_nd(t) + c_m(t)
+                node_t_m[t] = (
+                    LinearExpression(
+                        constant=-c["t_m_constant"][t],
+                        linear_coefs=[
+                            1.0,
+                            -c["t_m_t_m"][t],
+                            -c["t_m_phi"][t],
+                            c["t_m_phi"][t],
+                        ],
+                        linear_vars=[
+                            t_m_ts[t + 1],
+                            t_m_ts[t],
+                            phi_hc_heat[t],
+                            phi_hc_cool[t],
+                        ],
+                    )
+                    == 0
+                )
+                # t_air(t+1) = a_air * (t_m(t) + t_m(t+1)) + b_air * phi_hc_nd(t)
+                #     + c_air(t)
+                constant = c["t_air_constant"][t]
+                coefs = [a_air, a_air, b_air, -b_air]
+                variables = [
+                    t_m_ts[t],
+                    t_m_ts[t + 1],
+                    phi_hc_heat[t],
+                    phi_hc_cool[t],
+                ]
+            if t_air_var is None:
+                node_t_air[t] = LinearExpression(
+                    constant=constant, linear_coefs=coefs, linear_vars=variables
+                )
+            else:
+                node_t_air[t] = (
+                    LinearExpression(
+                        constant=-constant,
+                        linear_coefs=[1.0] + [-coef for coef in coefs],
+                        linear_vars=[t_air[t + 1]] + variables,
+                    )
+                    == 0
+                )
+    return balance_t_m, expressions_t_air
+
+
+def _create_period_linkage(m, group, i, o, t_m_ts_var):
+    """
+    Linkage of the typical periods of the buildings in group by id of the
+    node and typical period.
+
+    The mass temperature at the start of every original period follows from
+    t_inital and the change of t_m_ts over the typical periods before it,
+    with the decay of the start temperature over a period (the product of
+    a_m of its timesteps). As the balances are linear, the trajectory of a
+    typical period is the mean of the trajectories of the periods it
+    represents, so its start is the mean of their starts.
+    """
+    timeincrement = [m.timeincrement[t] for t in m.TIMESTEPS]
+    timeindex = list(m.TIMEINDEX)
+    linkage = {}
+    for n in group:
+        period_length = _get_period_length(n, len(timeincrement))
+        if period_length is None:
+            continue
+        t_m_inital = _get_t_m_inital(n)
+        if t_m_inital is None:
+            raise ValueError(
+                "{0} needs an initial mass temperature with typical periods, "
+                "t_inital and t_m_ts must not be None.".format(n.label)
+            )
+        typical_periods = n.typical_periods
+        number_of_typical_periods = typical_periods.number_of_typical_periods
+        c = {
+            name: np.broadcast_to(value, (len(timeincrement),))
+            for name, value in n.calc_linear_coefficients(timeincrement).items()
+        }
+        decay = np.prod(
+            c["t_m_t_m"].reshape(number_of_typical_periods, period_length), axis=1
+        )
+        # start of every original period as g * t_inital + h @ delta, with
+        # delta = t_m(end) - decay * t_m(start) of each typical period
+        order = typical_periods.order
+        g = np.empty(len(order))
+        h = np.zeros((len(order), number_of_typical_periods))
+        g[0] = 1
+        for d, k in enumerate(order[:-1]):
+            g[d + 1] = decay[k] * g[d]
+            h[d + 1] = decay[k] * h[d]
+            h[d + 1, k] += 1
+
+        starts = [k * period_length for k in range(number_of_typical_periods)]
+        ends = [start + period_length - 1 for start in starts]
+        linkage[id(n)] = node_linkage = {}
+        for k in range(number_of_typical_periods):
+            members = order == k
+            # the constraint is scaled to the mean start, divided by the
+            # occurrences of the typical period
+            occurrences = float(typical_periods.occurrences[k])
+            weights = h[members].sum(axis=0) / occurrences
+            coefficients = {}
+            variables = {}
+
+            def add(var, coef):
+                coefficients[id(var)] = coefficients.get(id(var), 0.0) + coef
+                variables[id(var)] = var
+
+            # t_m(start) = mean of the starts of the members
+            add(t_m_ts_var[n, starts[k]], 1.0)
+            constant = -float(g[members].sum()) / occurrences * t_m_inital
+            for j in np.flatnonzero(weights):
+                weight = float(weights[j])
+                end = ends[j]
+                # t_m(end) = a_m * t_m(t) + b_m * phi_hc_nd(t) + c_m of the
+                # last timestep t of the typical period
+                add(t_m_ts_var[n, end], -weight * c["t_m_t_m"][end])
+                add(m.flow[i[n], n, timeindex[end]], -weight * c["t_m_phi"][end])
+                add(m.flow[n, o[n], timeindex[end]], weight * c["t_m_phi"][end])
+                add(t_m_ts_var[n, starts[j]], weight * decay[j])
+                constant -= weight * c["t_m_constant"][end]
+            node_linkage[k] = (
+                LinearExpression(
+                    constant=float(constant),
+                    linear_coefs=[float(coef) for coef in coefficients.values()],
+                    linear_vars=list(variables.values()),
+                )
+                == 0
+            )
+    return linkage
+
+
+def _add_period_linkage(block, group, i, o):
+    """Adds the linkage of the typical periods of the buildings to block"""
+    m = block.parent_block()
+    period_linkage = _create_period_linkage(m, group, i, o, block.t_m_ts)
+    block.TYPICAL_PERIODS = Set(
+        dimen=2,
+        initialize=[
+            (n, k)
+            for n in group
+            if id(n) in period_linkage
+            for k in period_linkage[id(n)]
+        ],
+    )
+
+    def _period_linkage_rule(block, n, k):
+        """
+        Rule definition for the start of the mass temperature of every
+        typical period k of building n.
+        """
+        return period_linkage[id(n)][k]
+
+    block.period_linkage_t_m = Constraint(
+        block.TYPICAL_PERIODS, rule=_period_linkage_rule
+    )
 
 
 class M5RC(network.Node):
@@ -38,7 +324,7 @@ class M5RC(network.Node):
 
     Parameters
     ----------
-    internal_gains : list
+    internal_gains : list, np.ndarray or pd.Series
         List with sum of internal gains in Watts produces by residents and electrical devices in the building.
     building_config : dict
         Dictionary with mandatory building information. building_config can be generated with tabula data base.
@@ -46,17 +332,34 @@ class M5RC(network.Node):
         Value which describes the minimal permissible air temperature in Celsius in the building.
     t_set_cooling : list of numerical values
         Value which describes the maximum permissible  air temperature in Celsius in the building.
-    t_e : list
+    t_e : list, np.ndarray or pd.Series
         List of the ambient temperature in Celsius.
     t_inital : numeric
         Value of the initial/starting air temperature in Celsius inside the building.
     t_m : numeric
         Value of the initial/starting t_m temperature in Celsius inside the building. More information in Block.
-    t_m_ts : numeric
-        Value of the initial/starting air temperature in Celsius inside the building. More information in Block.
+    t_m_ts : numeric, "t_inital" or None
+        Value of the initial/starting mass temperature t_m_ts in Celsius inside the building. With the default
+        "t_inital" it is t_inital. With None the initial mass temperature is left free.
     phi_m_tot : numeric
         Value of the initial/starting air temperature in Celsius inside the building. : see formula for the calculation,
         eq C.5 in standard.
+    time_series_store : TimeSeriesStore
+        Store of the time series, identical series of all buildings are held
+        once. Default is the shared store. The store holds a read-only copy
+        of each distinct series.
+    reduced_formulation : bool
+        If True, the building is modelled by ReducedGenericBuildingBlock,
+        which only has the mass temperature as variable. t_air is calculated
+        after solving: call load_reduced_results(model) before
+        solph.processing.results, otherwise t_air has no values in the
+        results.
+    typical_periods : TypicalPeriods
+        If given, the timesteps of the model are the typical periods one after
+        the other (see helpers.typical_periods). t_outside, solar_gains and
+        internal_gains are either given for the typical periods or for all
+        original periods, then they are aggregated. The mass temperature of
+        the typical periods is linked over the original order of the periods.
 
     Notes
     -----
@@ -64,8 +367,20 @@ class M5RC(network.Node):
      * :py:class:`~oemof.solph.components._generic_storage.GenericBuildingBlock`
        (if no Investment object present)
 
+    With reduced_formulation=True, t_air is not a variable of the
+    optimization problem and has no values after model.solve(). Call
+    load_reduced_results(model) after solving and before
+    solph.processing.results(model), otherwise the results contain no t_air of
+    these buildings.
+
     Examples
     --------
+    Solving a model with buildings in the reduced formulation:
+
+    >>> model = solph.Model(energy_system)  # doctest: +SKIP
+    >>> model.solve(solver="cbc")  # doctest: +SKIP
+    >>> load_reduced_results(model)  # doctest: +SKIP
+    >>> results = solph.processing.results(model)  # doctest: +SKIP
 
     """  # noqa: E501
 
@@ -83,7 +398,10 @@ class M5RC(network.Node):
         t_set_cooling: float = 40,
         t_inital: float = 20,
         t_m: float = 20,
-        t_m_ts: float = 20,
+        t_m_ts: float = "t_inital",
+        reduced_formulation: bool = False,
+        time_series_store=None,
+        typical_periods=None,
     ):
         if inputs is None:
             inputs = {}
@@ -91,64 +409,93 @@ class M5RC(network.Node):
             outputs = {}
         super().__init__(label=label, inputs=inputs, outputs=outputs)
 
+        if time_series_store is None:
+            time_series_store = default_time_series_store
+        if typical_periods is not None:
+            t_outside, solar_gains, internal_gains = (
+                _aggregate_time_series(values, typical_periods, name, label)
+                for name, values in (
+                    ("t_outside", t_outside),
+                    ("solar_gains", solar_gains),
+                    ("internal_gains", internal_gains),
+                )
+            )
         self.building_config = building_config
-        self.t_e = t_outside
-        self.internal_gains = internal_gains
+        self.t_e = time_series_store.get(t_outside)
+        self.internal_gains = time_series_store.get(internal_gains)
         self.phi_m_tot = phi_m_tot
-        self.solar_gains = solar_gains
+        self.solar_gains = time_series_store.get(solar_gains)
         self.t_set_heating = t_set_heating
         self.t_set_cooling = t_set_cooling
         self.t_inital = t_inital
         self.t_m = t_m
+        if isinstance(t_m_ts, str) and t_m_ts != "t_inital":
+            raise ValueError(
+                "t_m_ts of {0} has to be a number, 't_inital' or None, got "
+                "{1!r}.".format(label, t_m_ts)
+            )
         self.t_m_ts = t_m_ts
+        self.reduced_formulation = reduced_formulation
+        self.typical_periods = typical_periods
 
-        self.floor_area = self.building_config.floor_area  # [m2] Floor Area
-        self.mass_area = (
+        self.floor_area = float(self.building_config.floor_area)  # [m2] Floor Area
+        self.mass_area = float(
             self.building_config.mass_area
         )  # [m2] Effective Mass Area DIN 12.3.1.2
-        self.A_t = (
+        self.A_t = float(
             self.building_config.total_internal_area
         )  # [m2] the area of all surfaces facing the room DIN 7.2.2.2
-        self.c_m = self.building_config.c_m  # [kWh/K] Room Capacitance
-        self.ach_tot = (
+        self.c_m = float(self.building_config.c_m)  # [kWh/K] Room Capacitance
+        self.ach_tot = float(
             self.building_config.total_air_change_rate
         )  # [m3/s]Total Air Changes Per Hour
 
-        self.h_tr_em = (
+        self.h_tr_em = float(
             self.building_config.h_tr_em
         )  # [W/K] Conductance of opaque surfaces to exterior
-        self.h_tr_w = (
+        self.h_tr_w = float(
             self.building_config.h_tr_w
         )  # [W/K] Conductance to exterior through glazed surfaces
         # [W/K] Conductance to ventilation
-        self.h_ve = self.building_config.h_ve
-        self.h_tr_ms = (
+        self.h_ve = float(self.building_config.h_ve)
+        self.h_tr_ms = float(
             self.building_config.h_tr_ms
         )  # [W/K] transmittance from the internal air to the thermal mass
-        self.h_tr_is = (
+        self.h_tr_is = float(
             self.building_config.h_tr_is
         )  # [W/K] Conductance from the conditioned air to interior zone surface
 
-        self.phi_st = (
-            []
-        )  # [W] Combination of internal and solar gains directly to the internal surfa
-        self.phi_m = (
-            []
-        )  # [W] Combination of internal and solar gains directly to the medium
-        self.phi_ia = []  # [W] Combination of internal and solar gains to the air
-        for i in range(len(self.solar_gains)):
-            self.h_tr_1 = (
-                self.calc_h_tr_1()
-            )  # [W/K] combined heat conductance, see function for definition
-            self.h_tr_2 = (
-                self.calc_h_tr_2()
-            )  # [W/K] combined heat conductance, see function for definition
-            self.h_tr_3 = (
-                self.calc_h_tr_3()
-            )  # [W/K] combined heat conductance, see function for definition
-            self.phi_ia.append(self.calc_phi_ia(i))
-            self.phi_st.append(self.calc_phi_st(i))
-            self.phi_m.append(self.calc_phi_m(i))
+        self.h_tr_1 = (
+            self.calc_h_tr_1()
+        )  # [W/K] combined heat conductance, see function for definition
+        self.h_tr_2 = (
+            self.calc_h_tr_2()
+        )  # [W/K] combined heat conductance, see function for definition
+        self.h_tr_3 = (
+            self.calc_h_tr_3()
+        )  # [W/K] combined heat conductance, see function for definition
+        # [W/K] conductance of the mass node in the Crank-Nicolson step of t_m
+        self.h_tr_m_half = 0.5 * (self.h_tr_3 + self.h_tr_em)
+        # shares of the internal and solar gains of the mass and surface node
+        self.factor_phi_m = self.mass_area / self.A_t
+        self.factor_phi_st = (
+            1 - (self.mass_area / self.A_t) - (self.h_tr_w / (9.1 * self.A_t))
+        )
+        self._t_m_coefficients = {}
+
+        number_of_time_steps = len(self.solar_gains)
+        internal_gains = self.internal_gains[:number_of_time_steps]
+        solar_gains = self.solar_gains
+        # [W] Combination of internal and solar gains to the air
+        self.phi_ia = time_series_store.get(self.calc_phi_ia(internal_gains))
+        # [W] Combination of internal and solar gains directly to the internal surface
+        self.phi_st = time_series_store.get(
+            self.calc_phi_st(internal_gains, solar_gains)
+        )
+        # [W] Combination of internal and solar gains directly to the medium
+        self.phi_m = time_series_store.get(
+            self.calc_phi_m(internal_gains, solar_gains)
+        )
 
     def calc_h_tr_1(self):
         """
@@ -171,30 +518,109 @@ class M5RC(network.Node):
         """
         return 1.0 / (1.0 / self.h_tr_2 + 1.0 / self.h_tr_ms)
 
-    def calc_phi_ia(self, i: float):
+    def calc_phi_ia(self, internal_gains):
         """
         Heat flow in [W] to the air node
         (based on the breakdown in section C.2) formulas C.1-C.3 in [ISO 13790]
         """
-        return 0.5 * self.internal_gains[i]
+        return 0.5 * internal_gains
 
-    def calc_phi_st(self, i: float):
+    def calc_phi_st(self, internal_gains, solar_gains):
         """
         Heat flow in [W] to the surface node
         (based on the breakdown in section C.2) formulas C.1-C.3 in [ISO 13790]
         """
-        return (1 - (self.mass_area / self.A_t) - (self.h_tr_w / (9.1 * self.A_t))) * (
-            0.5 * self.internal_gains[i] + self.solar_gains[i]
-        )
+        return self.factor_phi_st * (0.5 * internal_gains + solar_gains)
 
-    def calc_phi_m(self, i: float):
+    def calc_phi_m(self, internal_gains, solar_gains):
         """
         Heatflow in [W] to the thermal mass node
         (based on the breakdown in section C.2) formulas C.1-C.3 in [ISO 13790]
         """
-        return (self.mass_area / self.A_t) * (
-            0.5 * self.internal_gains[i] + self.solar_gains[i]
+        return self.factor_phi_m * (0.5 * internal_gains + solar_gains)
+
+    def calc_t_m_coefficients(self, timeincrement: float):
+        """
+        Coefficients of the Crank-Nicolson step of the mass temperature for a
+        timestep of timeincrement hours: the heat capacity per timestep in W/K
+        minus and plus h_tr_m_half.
+        """
+        if timeincrement not in self._t_m_coefficients:
+            # heat capacity per length of the timestep in W/K
+            c_m_per_timestep = self.c_m / (3600 * timeincrement)
+            self._t_m_coefficients[timeincrement] = (
+                c_m_per_timestep - self.h_tr_m_half,
+                c_m_per_timestep + self.h_tr_m_half,
+            )
+        return self._t_m_coefficients[timeincrement]
+
+    def calc_linear_coefficients(self, timeincrement):
+        r"""
+        Folds all constants of the balances of GenericBuildingBlock into the
+        coefficients of
+
+        .. math:: t_m(t+1) = a_m(t) \cdot t_m(t) + b_m(t) \cdot \phi_{hc\_nd}(t)
+            + c_m(t)
+
+        .. math:: t_{air}(t+1) = a_{air} \cdot (t_m(t) + t_m(t+1))
+            + b_{air} \cdot \phi_{hc\_nd}(t) + c_{air}(t)
+
+        for the timesteps with the lengths timeincrement in hours. Returns a
+        dict of np.ndarray (t_m_t_m, t_m_phi, t_m_constant, t_air_t_m,
+        t_air_phi, t_air_constant).
+        """
+        timeincrement = np.asarray(timeincrement, dtype=float)
+        number_of_time_steps = len(timeincrement)
+        # the last axis is the time, so the parameters can be columns of many
+        # buildings (see M5RCFleet)
+        t_e = self.t_e[..., :number_of_time_steps]
+        phi_ia = self.phi_ia[..., :number_of_time_steps]
+        phi_st = self.phi_st[..., :number_of_time_steps]
+        phi_m = self.phi_m[..., :number_of_time_steps]
+        if (
+            t_e.shape[-1] < number_of_time_steps
+            or phi_ia.shape[-1] < number_of_time_steps
+        ):
+            raise ValueError(
+                "t_outside, solar_gains and internal_gains of {0} need at least "
+                "{1} values.".format(self.label, number_of_time_steps)
+            )
+
+        # mass node, see Building balance ts of GenericBuildingBlock
+        ratio_h_tr_3_h_tr_2 = self.h_tr_3 / self.h_tr_2
+        c_m_per_timestep = self.c_m / (3600 * timeincrement)
+        c_m_minus = c_m_per_timestep - self.h_tr_m_half
+        c_m_plus = c_m_per_timestep + self.h_tr_m_half
+        phi_m_tot_constant = (
+            phi_m
+            + self.h_tr_em * t_e
+            + ratio_h_tr_3_h_tr_2
+            * (
+                phi_st
+                + self.h_tr_w * t_e
+                + self.h_tr_1 * (phi_ia / self.h_ve + t_e)
+            )
         )
+        phi_m_tot_phi = ratio_h_tr_3_h_tr_2 * self.h_tr_1 / self.h_ve
+
+        # air node, see Building balance t_air of GenericBuildingBlock
+        h_tr_s = self.h_tr_ms + self.h_tr_w + self.h_tr_1
+        h_tr_air = self.h_tr_is + self.h_ve
+        t_s_constant = (
+            phi_st + self.h_tr_w * t_e + self.h_tr_1 * (t_e + phi_ia / self.h_ve)
+        ) / h_tr_s
+        return {
+            "t_m_t_m": c_m_minus / c_m_plus,
+            "t_m_phi": phi_m_tot_phi / c_m_plus,
+            "t_m_constant": phi_m_tot_constant / c_m_plus,
+            "t_air_t_m": self.h_tr_is * self.h_tr_ms / (2 * h_tr_s * h_tr_air),
+            "t_air_phi": (self.h_tr_is * self.h_tr_1 / (self.h_ve * h_tr_s) + 1)
+            / h_tr_air,
+            "t_air_constant": (
+                self.h_tr_is * t_s_constant + self.h_ve * t_e + phi_ia
+            )
+            / h_tr_air,
+        }
 
     def _check_number_of_flows(self):
         """Ensure that there is only one inflow and outflow to the building"""
@@ -207,6 +633,8 @@ class M5RC(network.Node):
             raise AttributeError(msg.format("output", self.label))
 
     def constraint_group(self):
+        if self.reduced_formulation:
+            return ReducedGenericBuildingBlock
         return GenericBuildingBlock
 
 
@@ -245,9 +673,12 @@ class GenericBuildingBlock(ScalarBlock):
         \phi_{o}(p, t)}{h_{ve}} + t_e(t) \right) \right)
 
         .. math:: t_{m\_t} =  &t_{m\_t}(t-1) \cdot
-        \left(\frac{c_m}{3600} - 0.5 \cdot
+        \left(\frac{c_m}{3600 \cdot \Delta t} - 0.5 \cdot
         (h_{tr\_3} + h_{tr\_em})\right) + \phi_{m\_tot}(t)}} \cdot
-        {{\frac{c_m}{3600} + 0.5 \cdot (h_{tr\_3} + h_{tr\_em})}}
+        {{\frac{c_m}{3600 \cdot \Delta t} + 0.5 \cdot (h_{tr\_3} + h_{tr\_em})}}
+
+        with the length of the timestep :math:`\Delta t` in hours
+        (`timeincrement` of the model).
 
     Building balance t_air :attr:`om.Building.balance_rule_t_air[n, t]`
         :math::`t_s(t) = \frac{h_{tr\_ms} \cdot \frac{t_{m}(t-1) +
@@ -261,6 +692,24 @@ class GenericBuildingBlock(ScalarBlock):
         \phi_{o}(p, t)}{h_{tr\_is} + h_{ve}}
 
 
+    All constants of both balances are folded per building and timestep by
+    :py:meth:`M5RC.calc_linear_coefficients`, so the constraints are created
+    as flat linear expressions.
+
+    Period linkage :attr:`om.Building.period_linkage_t_m[n, k]`
+        Only for buildings with typical_periods. The balance of t_m is not
+        created for the last timestep of a typical period, t_m at the start
+        of each typical period k is the mean of the starts of the original
+        periods it represents:
+
+        .. math:: N_k \cdot t_m(start_k) = \sum_{d: k(d) = k} t_{m, d}
+
+        .. math:: t_{m, d+1} = A_{k(d)} \cdot t_{m, d} + t_m(end_{k(d)})
+            - A_{k(d)} \cdot t_m(start_{k(d)}), \quad t_{m, 0} = t_{inital}
+
+        with the decay :math:`A_k` of t_m over the typical period, the product
+        of :math:`a_m(t)` of its timesteps.
+
     =========================== ======================= =========
     symbol                      explanation             attribute
     =========================== ======================= =========
@@ -316,47 +765,22 @@ class GenericBuildingBlock(ScalarBlock):
         self.phi_m_tot = Var(self.BUILDING, m.TIMEPOINTS)
 
         # set the initial building temperature
+        _fix_initial_temperatures(self, group)
         for n in group:
-            if n.t_inital is not None:
-                self.t_air[n, 0] = n.t_inital
-                self.t_air[n, 0].fix()
-
-            if n.t_m_ts is not None:
-                self.t_m_ts[n, 0] = n.t_inital
-                self.t_m_ts[n, 0].fix()
-
             if n.phi_m_tot is not None:
                 self.phi_m_tot[n, 0] = 0
                 self.phi_m_tot[n, 0].fix()
 
+        balance_t_m, balance_t_air = _create_linear_expressions(
+            m, group, i, o, self.t_m_ts, self.t_air
+        )
+
         def _storage_balance_rule_tm(block, n, p, t):
             """
             Rule definition for the building temperature t_m
             of every storage n and every timestep.
             """
-            t_m_last_ts = block.t_m_ts[n, t]
-            phi_hc_heat = m.flow[i[n], n, p, t]
-            phi_hc_cool = m.flow[n, o[n], p, t]
-            phi_hc_nd = phi_hc_heat - phi_hc_cool
-
-            phi_m_tot = (
-                n.phi_m[t]
-                + n.h_tr_em * n.t_e[t]
-                + (n.h_tr_3 / n.h_tr_2)
-                * (
-                    n.phi_st[t]
-                    + n.h_tr_w * n.t_e[t]
-                    + n.h_tr_1 *
-                    (((n.phi_ia[t] + phi_hc_nd) / n.h_ve) + n.t_e[t])
-                )
-            )
-
-            t_m_current_ts = (
-                t_m_last_ts * ((n.c_m / 3600) - 0.5 * (n.h_tr_3 + n.h_tr_em))
-                + phi_m_tot
-            ) / ((n.c_m / 3600) + 0.5 * (n.h_tr_3 + n.h_tr_em))
-
-            return block.t_m_ts[n, t + 1] == t_m_current_ts
+            return balance_t_m[id(n)][t]
 
         self.balance_t_m_current_t_s = Constraint(
             self.BUILDING, m.TIMEINDEX, rule=_storage_balance_rule_tm
@@ -367,28 +791,35 @@ class GenericBuildingBlock(ScalarBlock):
             Rule definition for the building temperature t_air
             of every storage n and every timestep.
             """
-            phi_hc_heat = m.flow[i[n], n, p, t]
-            phi_hc_cool = m.flow[n, o[n], p, t]
-            phi_hc_nd = phi_hc_heat - phi_hc_cool
-            t_m_last_ts = block.t_m_ts[n, t]
-            t_m_current_ts = block.t_m_ts[n, t + 1]
-            t_m = (t_m_last_ts + t_m_current_ts) / 2
-
-            t_s = (
-                n.h_tr_ms * t_m
-                + n.phi_st[t]
-                + n.h_tr_w * n.t_e[t]
-                + n.h_tr_1 * (n.t_e[t] + (n.phi_ia[t] + phi_hc_nd) / n.h_ve)
-            ) / (n.h_tr_ms + n.h_tr_w + n.h_tr_1)
-            t_air = (n.h_tr_is * t_s + n.h_ve * n.t_e[t] + n.phi_ia[t] + phi_hc_nd) / (
-                n.h_tr_is + n.h_ve
-            )
-            return block.t_air[n, t + 1] == t_air
+            return balance_t_air[id(n)][t]
 
         self.balance_t_air = Constraint(
             self.BUILDING, m.TIMEINDEX, rule=_storage_balance_rule_t_air
         )
 
+        _add_period_linkage(self, group, i, o)
+
+    def update(self):
+        """
+        Sets the initial temperatures and the constraints again from the
+        buildings, after their initial values or time series were changed,
+        without building the model again (see helpers.rolling_horizon).
+        """
+        m = self.parent_block()
+        group = list(self.BUILDING)
+        i = {n: [i for i in n.inputs][0] for n in group}
+        o = {n: [o for o in n.outputs][0] for n in group}
+        _fix_initial_temperatures(self, group)
+        balance_t_m, balance_t_air = _create_linear_expressions(
+            m, group, i, o, self.t_m_ts, self.t_air
+        )
+        _update_constraints(self.balance_t_m_current_t_s, balance_t_m)
+        _update_constraints(self.balance_t_air, balance_t_air)
+        _update_constraints(
+            self.period_linkage_t_m,
+            _create_period_linkage(m, group, i, o, self.t_m_ts),
+        )
+
     def _objective_expression(self):
         r"""
         Objective expression for BUILDING with no investment.
@@ -399,3 +830,150 @@ class GenericBuildingBlock(ScalarBlock):
             return 0
 
         return 0
+
+
+class ReducedGenericBuildingBlock(ScalarBlock):
+    r"""GenericBuildingBlock with the mass temperature as only variable.
+
+    The air temperature is an affine function of the mass temperature and the
+    heat flows, see :py:meth:`M5RC.calc_linear_coefficients`. Instead of a
+    variable with an equality constraint, its expression is bounded by the
+    comfort range. phi_m_tot is not created, it is not part of any constraint.
+
+    **The following sets are created:**
+
+    BUILDING
+        A set with all :py:class:`~.M5RC` objects with reduced_formulation.
+
+    **The following variables are created:**
+
+    t_m_ts
+        Temperature of the knot, which represents the mass of the building
+        zone, see GenericBuildingBlock.
+
+    t_air
+        Internal building air temperature. It is not part of any constraint
+        and therefore not passed to the solver, the values are set by
+        :py:meth:`load_t_air` (see :py:func:`load_reduced_results`) so the
+        results have the same shape as with GenericBuildingBlock.
+
+    **The following constraints are created:**
+
+    Building balance ts :attr:`om.Building.balance_t_m_current_t_s[n, t]`
+        Same as in GenericBuildingBlock.
+
+    Comfort range :attr:`om.Building.comfort_t_air[n, t]`
+        .. math:: t_{set\_heating} \leq a_{air} \cdot (t_m(t) + t_m(t+1))
+            + b_{air} \cdot \phi_{hc\_nd}(t) + c_{air}(t) \leq
+            t_{set\_cooling}
+    """  # noqa: E501
+
+    CONSTRAINT_GROUP = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    def _create(self, group=None):
+        m = self.parent_block()
+        if group is None:
+            return None
+
+        i = {n: [i for i in n.inputs][0] for n in group}
+
+        o = {n: [o for o in n.outputs][0] for n in group}
+
+        #  ************* SETS *********************************
+
+        self.BUILDING = Set(initialize=[n for n in group])
+
+        #  ************* VARIABLES *****************************
+
+        self.t_m_ts = Var(self.BUILDING, m.TIMEPOINTS)
+        self.t_air = Var(self.BUILDING, m.TIMEPOINTS)
+
+        # set the initial building temperature
+        _fix_initial_temperatures(self, group)
+
+        balance_t_m, self._t_air_expressions = _create_linear_expressions(
+            m, group, i, o, self.t_m_ts
+        )
+
+        def _storage_balance_rule_tm(block, n, p, t):
+            """
+            Rule definition for the building temperature t_m
+            of every storage n and every timestep.
+            """
+            return balance_t_m[id(n)][t]
+
+        self.balance_t_m_current_t_s = Constraint(
+            self.BUILDING, m.TIMEINDEX, rule=_storage_balance_rule_tm
+        )
+
+        def _comfort_rule_t_air(block, n, p, t):
+            """
+            Rule definition for the comfort range of the building temperature
+            t_air of every storage n at the end of every timestep.
+            """
+            return (
+                n.t_set_heating,
+                self._t_air_expressions[id(n)][t],
+                n.t_set_cooling,
+            )
+
+        self.comfort_t_air = Constraint(
+            self.BUILDING, m.TIMEINDEX, rule=_comfort_rule_t_air
+        )
+
+        _add_period_linkage(self, group, i, o)
+
+    def update(self):
+        """
+        Sets the initial temperatures and the constraints again from the
+        buildings, after their initial values or time series were changed,
+        without building the model again (see helpers.rolling_horizon).
+        """
+        m = self.parent_block()
+        group = list(self.BUILDING)
+        i = {n: [i for i in n.inputs][0] for n in group}
+        o = {n: [o for o in n.outputs][0] for n in group}
+        _fix_initial_temperatures(self, group)
+        balance_t_m, self._t_air_expressions = _create_linear_expressions(
+            m, group, i, o, self.t_m_ts
+        )
+        _update_constraints(self.balance_t_m_current_t_s, balance_t_m)
+        comfort_t_air = {
+            id(n): {
+                t: (n.t_set_heating, expression, n.t_set_cooling)
+                for t, expression in self._t_air_expressions[id(n)].items()
+            }
+            for n in group
+        }
+        _update_constraints(self.comfort_t_air, comfort_t_air)
+        _update_constraints(
+            self.period_linkage_t_m,
+            _create_period_linkage(m, group, i, o, self.t_m_ts),
+        )
+
+    def load_t_air(self):
+        """Sets the values of t_air from the solved mass temperature and flows"""
+        for n in self.BUILDING:
+            for t, expression in self._t_air_expressions[id(n)].items():
+                self.t_air[n, t + 1].value = value(expression)
+
+    def _objective_expression(self):
+        r"""
+        Objective expression for BUILDING with no investment.
+        Note: This adds nothing as variable costs are already
+        added in the Block :class:`SimpleFlowBlock`.
+        """
+        return 0
+
+
+def load_reduced_results(model):
+    """
+    Sets t_air of all ReducedGenericBuildingBlock of the solved model, call
+    it before solph.processing.results.
+    """
+    for block in model.component_objects(Block):
+        if isinstance(block, ReducedGenericBuildingBlock):
+            block.load_t_air()
@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fleet of 5RC buildings as one node with one input and one output.
+
+The parameters and time series of all buildings are kept as arrays with one
+row per building, the coefficients of all balances are calculated in one
+numpy step by the equations of M5RC.
+
+SPDX-License-Identifier: MIT
+
+"""
+import numpy as np
+from oemof.network import network
+from pyomo.common.gc_manager import PauseGC
+from pyomo.core.base.block import ScalarBlock
+from pyomo.core.expr.numeric_expr import LinearExpression
+from pyomo.environ import Constraint
+from pyomo.environ import NonNegativeReals
+from pyomo.environ import Set
+from pyomo.environ import Var
+
+from oemof.thermal_building_model.m_5RC import M5RC
+from oemof.thermal_building_model.tabula.tabula_batch import BuildingConfigBatch
+
+
+def _per_building(values, number_of_buildings, name):
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 0 or values.shape == (number_of_buildings,):
+        return np.broadcast_to(values, (number_of_buildings,))
+    raise ValueError(
+        "{0} needs one value or one value per building, got shape {1}.".format(
+            name, values.shape
+        )
+    )
+
+
+def _per_building_and_timestep(values, number_of_buildings, name):
+    # broadcasting keeps a shared profile as view instead of copying it
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1 or (
+        values.ndim == 2 and values.shape[0] in (1, number_of_buildings)
+    ):
+        return np.broadcast_to(values, (number_of_buildings, values.shape[-1]))
+    raise ValueError(
+        "{0} needs one profile or one profile per building (N x T), "
+        "got shape {1}.".format(name, values.shape)
+    )
+
+
+class M5RCFleet(network.Node):
+    r"""
+    Many 5RC buildings in one node, see M5RC for the model of a building.
+
+    The heat demand and cooling of all buildings is taken from the input and
+    given to the output of the fleet, each building has its own heating and
+    cooling variable.
+
+    Parameters
+    ----------
+    building_configs : BuildingConfigBatch or list of BuildingConfig5RC
+        Parameters of the N buildings.
+    label : str
+        Label of the node.
+    t_outside : array-like
+        Ambient temperature in Celsius, one profile for all buildings (T) or
+        one profile per building (N x T).
+    solar_gains : array-like
+        Solar gains in Watts, (T) or (N x T).
+    internal_gains : array-like
+        Internal gains in Watts, (T) or (N x T).
+    t_set_heating : numeric or array-like
+        Minimal permissible air temperature in Celsius, one value or one
+        value per building.
+    t_set_cooling : numeric or array-like
+        Maximum permissible air temperature in Celsius, one value or one
+        value per building.
+    t_inital : numeric or array-like
+        Initial air and mass temperature in Celsius, one value or one value
+        per building.
+
+    Notes
+    -----
+    The following sets, variables and constraints are created
+     * :py:class:`~oemof.thermal_building_model.m_5RC_fleet.M5RCFleetBlock`
+    """
+
+    # the equations of M5RC work on columns of buildings as well
+    calc_h_tr_1 = M5RC.calc_h_tr_1
+    calc_h_tr_2 = M5RC.calc_h_tr_2
+    calc_h_tr_3 = M5RC.calc_h_tr_3
+    calc_phi_ia = M5RC.calc_phi_ia
+    calc_phi_st = M5RC.calc_phi_st
+    calc_phi_m = M5RC.calc_phi_m
+    calc_linear_coefficients = M5RC.calc_linear_coefficients
+
+    def __init__(
+        self,
+        building_configs,
+        label: str,
+        t_outside,
+        solar_gains,
+        internal_gains,
+        inputs=None,
+        outputs=None,
+        t_set_heating=20,
+        t_set_cooling=40,
+        t_inital=20,
+    ):
+        if inputs is None:
+            inputs = {}
+        if outputs is None:
+            outputs = {}
+        super().__init__(label=label, inputs=inputs, outputs=outputs)
+
+        if not isinstance(building_configs, BuildingConfigBatch):
+            building_configs = BuildingConfigBatch.from_building_configs(
+                building_configs
+            )
+        self.building_configs = building_configs
+        self.number_of_buildings = len(building_configs)
+        number_of_buildings = self.number_of_buildings
+
+        self.t_e = _per_building_and_timestep(
+            t_outside, number_of_buildings, "t_outside"
+        )
+        solar_gains = _per_building_and_timestep(
+            solar_gains, number_of_buildings, "solar_gains"
+        )
+        internal_gains = _per_building_and_timestep(
+            internal_gains, number_of_buildings, "internal_gains"
+        )[:, : solar_gains.shape[1]]
+        self.t_set_heating = _per_building(
+            t_set_heating, number_of_buildings, "t_set_heating"
+        )
+        self.t_set_cooling = _per_building(
+            t_set_cooling, number_of_buildings, "t_set_cooling"
+        )
+        self.t_inital = _per_building(t_inital, number_of_buildings, "t_inital")
+
+        # columns (N x 1) of the parameters, see M5RC
+        def column(name):
+            return getattr(building_configs, name)[:, np.newaxis]
+
+        self.floor_area = column("floor_area")
+        self.mass_area = column("mass_area")
+        self.A_t = column("total_internal_area")
+        self.c_m = column("c_m")
+        self.h_tr_em = column("h_tr_em")
+        self.h_tr_w = column("h_tr_w")
+        self.h_ve = column("h_ve")
+        self.h_tr_ms = column("h_tr_ms")
+        self.h_tr_is = column("h_tr_is")
+
+        self.h_tr_1 = self.calc_h_tr_1()
+        self.h_tr_2 = self.calc_h_tr_2()
+        self.h_tr_3 = self.calc_h_tr_3()
+        self.h_tr_m_half = 0.5 * (self.h_tr_3 + self.h_tr_em)
+        self.factor_phi_m = self.mass_area / self.A_t
+        self.factor_phi_st = (
+            1 - (self.mass_area / self.A_t) - (self.h_tr_w / (9.1 * self.A_t))
+        )
+        self.phi_ia = self.calc_phi_ia(internal_gains)
+        self.phi_st = self.calc_phi_st(internal_gains, solar_gains)
+        self.phi_m = self.calc_phi_m(internal_gains, solar_gains)
+
+    def __hash__(self):
+        # the node is part of the index of all variables of its buildings,
+        # the hash of the (immutable) label is only calculated once
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = super().__hash__()
+            return self._hash
+
+    def constraint_group(self):
+        return M5RCFleetBlock
+
+
+class M5RCFleetBlock(ScalarBlock):
+    r"""Block of all M5RCFleet nodes
+
+    **The following sets are created:**
+
+    FLEET
+        A set with all :py:class:`~.M5RCFleet` objects.
+
+    FLEET_BUILDINGS
+        Pairs of the fleet and the position of the building in the fleet.
+
+    **The following variables are created:**
+
+    t_air, t_m_ts
+        Air and mass temperature of building b of fleet n, see
+        GenericBuildingBlock: `om.M5RCFleetBlock.t_air[n, b, t]`
+
+    phi_heat, phi_cool
+        Heating and cooling of building b of fleet n in timestep t.
+
+    **The following constraints are created:**
+
+    balance_t_m_current_t_s, balance_t_air
+        The balances of GenericBuildingBlock for every building, with the
+        heat flow :math:`\phi_{heat}(b, t) - \phi_{cool}(b, t)`.
+
+    heat_sum, cool_sum
+        .. math:: \phi_{i}(p, t) = \sum_b \phi_{heat}(b, t)
+
+        .. math:: \phi_{o}(p, t) = \sum_b \phi_{cool}(b, t)
+    """  # noqa: E501
+
+    CONSTRAINT_GROUP = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    def _create(self, group=None):
+        if group is None:
+            return None
+
+        # the many small expressions trigger the garbage collector without
+        # finding garbage, pyomo pauses it for its constructions as well
+        with PauseGC():
+            self._create_fleet(group)
+
+    def _create_fleet(self, group):
+        m = self.parent_block()
+
+        i = {n: [i for i in n.inputs][0] for n in group}
+
+        o = {n: [o for o in n.outputs][0] for n in group}
+
+        #  ************* SETS *********************************
+
+        self.FLEET = Set(initialize=[n for n in group])
+
+        self.FLEET_BUILDINGS = Set(
+            dimen=2,
+            initialize=[(n, b) for n in group for b in range(n.number_of_buildings)],
+        )
+
+        #  ************* VARIABLES *****************************
+
+        self.t_air = Var(self.FLEET_BUILDINGS, m.TIMEPOINTS)
+        self.t_m_ts = Var(self.FLEET_BUILDINGS, m.TIMEPOINTS)
+        self.phi_heat = Var(
+            self.FLEET_BUILDINGS, m.TIMESTEPS, within=NonNegativeReals
+        )
+        self.phi_cool = Var(
+            self.FLEET_BUILDINGS, m.TIMESTEPS, within=NonNegativeReals
+        )
+
+        timeincrement = [m.timeincrement[t] for t in m.TIMESTEPS]
+        timeindex = list(m.TIMEINDEX)
+        timepoints = list(m.TIMEPOINTS)
+        number_of_time_steps = len(timeincrement)
+        # expressions by id of the node, building and timestep, the ids are
+        # cheaper to hash than the nodes
+        balance_t_m = {}
+        balance_t_air = {}
+        heat_sum = {}
+        cool_sum = {}
+        for n in group:
+            # coefficients of all buildings in one step, as lists of floats
+            c = {
+                name: np.broadcast_to(
+                    value, (n.number_of_buildings, number_of_time_steps)
+                ).tolist()
+                for name, value in n.calc_linear_coefficients(timeincrement).items()
+            }
+            t_set_heating = n.t_set_heating.tolist()
+            t_set_cooling = n.t_set_cooling.tolist()
+            t_inital = n.t_inital.tolist()
+            phi_heat_fleet = [[] for t in timeindex]
+            phi_cool_fleet = [[] for t in timeindex]
+            for b in range(n.number_of_buildings):
+                # the variables of the building as lists by timestep, so
+                # the node is not hashed again for every use
+                t_air = [self.t_air[n, b, t] for t in timepoints]
+                t_m_ts = [self.t_m_ts[n, b, t] for t in timepoints]
+                phi_heat = [self.phi_heat[n, b, t] for p, t in timeindex]
+                phi_cool = [self.phi_cool[n, b, t] for p, t in timeindex]
+                for t in timepoints:
+                    t_air[t].setlb(t_set_heating[b])
+                    t_air[t].setub(t_set_cooling[b])
+                # set the initial building temperature
+                t_air[0].fix(t_inital[b])
+                t_m_ts[0].fix(t_inital[b])
+
+                a_m = c["t_m_t_m"][b]
+                b_m = c["t_m_phi"][b]
+                c_m = c["t_m_constant"][b]
+                a_air = c["t_air_t_m"][b]
+                b_air = c["t_air_phi"][b]
+                c_air = c["t_air_constant"][b]
+                expressions_t_m = balance_t_m[id(n), b] = {}
+                expressions_t_air = balance_t_air[id(n), b] = {}
+                for p, t in timeindex:
+                    phi_heat_fleet[t].append(phi_heat[t])
+                    phi_cool_fleet[t].append(phi_cool[t])
+                    # t_m(t+1) = a_m * t_m(t) + b_m * phi_hc_nd(t) + c_m(t)
+                    expressions_t_m[t] = (
+                        LinearExpression(
+                            constant=-c_m[t],
+                            linear_coefs=[1.0, -a_m[t], -b_m[t], b_m[t]],
+                            linear_vars=[
+                                t_m_ts[t + 1],
+                                t_m_ts[t],
+                                phi_heat[t],
+                                phi_cool[t],
+                            ],
+                        )
+                        == 0
+                    )
+                    # t_air(t+1) = a_air * (t_m(t) + t_m(t+1))
+                    #     + b_air * phi_hc_nd(t) + c_air(t)
+                    expressions_t_air[t] = (
+                        LinearExpression(
+                            constant=-c_air[t],
+                            linear_coefs=[
+                                1.0,
+                                -a_air[t],
+                                -a_air[t],
+                                -b_air[t],
+                                b_air[t],
+                            ],
+                            linear_vars=[
+                                t_air[t + 1],
+                                t_m_ts[t],
+                                t_m_ts[t + 1],
+                                phi_heat[t],
+                                phi_cool[t],
+                            ],
+                        )
+                        == 0
+                    )
+
+            ones = [1.0] * n.number_of_buildings
+            heat_sum[id(n)] = {
+                t: LinearExpression(
+                    constant=0.0,
+                    linear_coefs=[-1.0] + ones,
+                    linear_vars=[m.flow[i[n], n, p, t]] + phi_heat_fleet[t],
+                )
+                == 0
+                for p, t in timeindex
+            }
+            cool_sum[id(n)] = {
+                t: LinearExpression(
+                    constant=0.0,
+                    linear_coefs=[-1.0] + ones,
+                    linear_vars=[m.flow[n, o[n], p, t]] + phi_cool_fleet[t],
+                )
+                == 0
+                for p, t in timeindex
+            }
+
+        def _balance_rule_tm(block, n, b, p, t):
+            """
+            Rule definition for the mass temperature t_m of every building b
+            of fleet n and every timestep.
+            """
+            return balance_t_m[id(n), b][t]
+
+        self.balance_t_m_current_t_s = Constraint(
+            self.FLEET_BUILDINGS, m.TIMEINDEX, rule=_balance_rule_tm
+        )
+
+        def _balance_rule_t_air(block, n, b, p, t):
+            """
+            Rule definition for the air temperature t_air of every building b
+            of fleet n and every timestep.
+            """
+            return balance_t_air[id(n), b][t]
+
+        self.balance_t_air = Constraint(
+            self.FLEET_BUILDINGS, m.TIMEINDEX, rule=_balance_rule_t_air
+        )
+
+        def _heat_sum_rule(block, n, p, t):
+            """Input flow of fleet n is the heating of its buildings"""
+            return heat_sum[id(n)][t]
+
+        self.heat_sum = Constraint(self.FLEET, m.TIMEINDEX, rule=_heat_sum_rule)
+
+        def _cool_sum_rule(block, n, p, t):
+            """Output flow of fleet n is the cooling of its buildings"""
+            return cool_sum[id(n)][t]
+
+        self.cool_sum = Constraint(self.FLEET, m.TIMEINDEX, rule=_cool_sum_rule)
+
+    def _objective_expression(self):
+        r"""
+        Objective expression for FLEET, the costs of the flows are added in
+        the Block :class:`SimpleFlowBlock`.
+        """
+        return 0
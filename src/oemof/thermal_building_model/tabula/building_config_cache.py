@@ -0,0 +1,202 @@
+"""Building parameter cache
+
+The parameters calculated by Building.calculate_all_parameters only depend on
+the TABULA building (or the BuildingParameters), the building class and the
+floor area. They are stored in memory and, if a cache directory is given, on
+disk, so repeated runs of a scenario do not process the TABULA data again.
+The files are JSON, arrays and
+the dataclasses of the building are stored with their type, so loading a file
+never runs code.
+
+SPDX-License-Identifier: MIT
+
+"""
+import copy
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from dataclasses import fields
+from dataclasses import is_dataclass
+
+import numpy as np
+
+# increase, if the calculation of the building parameters changes
+cache_version = 1
+
+# attributes of Building which are inputs and not stored in the cache
+_input_attributes = {
+    "building_parameters",
+    "config_cache",
+    "list_class_buildig",
+    "number_of_time_steps",
+    "tabula_catalog",
+}
+
+
+def _dataclass_types():
+    # dataclasses, which may be restored from a file
+    from oemof.thermal_building_model.tabula import tabula_reader
+
+    return {
+        cls.__name__: cls
+        for cls in (tabula_reader.BuildingConfig5RC, tabula_reader.BuildingEnvelope)
+    }
+
+
+def _encode(value):
+    """JSON representation of the values json does not know"""
+    if isinstance(value, np.ndarray):
+        return {"__ndarray__": value.tolist(), "dtype": value.dtype.str}
+    if isinstance(value, np.generic):
+        return value.item()
+    if is_dataclass(value) and not isinstance(value, type):
+        return {
+            "__dataclass__": type(value).__name__,
+            "fields": {
+                field.name: getattr(value, field.name) for field in fields(value)
+            },
+        }
+    raise TypeError(
+        "{0} can not be stored in the building cache.".format(type(value).__name__)
+    )
+
+
+def _decode(dictionary):
+    """Restores arrays and the known dataclasses of _encode"""
+    if "__ndarray__" in dictionary:
+        return np.array(dictionary["__ndarray__"], dtype=dictionary["dtype"])
+    if "__dataclass__" in dictionary:
+        cls = _dataclass_types()[dictionary["__dataclass__"]]
+        return cls(**dictionary["fields"])
+    return dictionary
+
+
+class BuildingConfigCache:
+    r"""
+    Cache of the parameters of Building.calculate_all_parameters
+
+    Parameters
+    ----------
+    cache_dir : str or Path
+        Directory of the JSON files, e.g. get_cache_dir("building"). By
+        default (cache_dir=False) the parameters are only kept in memory.
+    maxsize : int
+        Number of buildings kept in memory, the least recently used building
+        is dropped first.
+    """
+
+    def __init__(self, cache_dir=False, maxsize: int = 1024):
+        self.cache_dir = cache_dir
+        self.maxsize = maxsize
+        self._parameters = OrderedDict()
+
+    @staticmethod
+    def make_key(building):
+        """Hash of all inputs of calculate_all_parameters of the building"""
+        if building.building_parameters is not None:
+            parameters = building.building_parameters
+            source = (
+                "building_parameters",
+                hashlib.sha256(
+                    json.dumps(
+                        [
+                            getattr(parameters, field.name)
+                            for field in fields(parameters)
+                        ],
+                        default=_encode,
+                        sort_keys=True,
+                    ).encode()
+                ).hexdigest(),
+            )
+        else:
+            source = (
+                "tabula",
+                building.tabula_catalog.fingerprint,
+                building.tabula_building_code,
+            )
+        key = (
+            cache_version,
+            source,
+            building.class_building,
+            None if building.floor_area is None else float(building.floor_area),
+        )
+        return hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+
+    def _file_path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+        file_path = self._file_path(key)
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path) as file:
+                return json.load(file, object_hook=_decode)
+        except (KeyError, TypeError, ValueError):
+            # not a file of this cache, the parameters are calculated again
+            return None
+
+    def _save(self, key, parameters):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # write to a temporary file first, so parallel workers never
+            # read partially written parameters
+            file_descriptor, tmp_path = tempfile.mkstemp(
+                dir=self.cache_dir, suffix=".json"
+            )
+            with os.fdopen(file_descriptor, "w") as file:
+                json.dump(parameters, file, default=_encode)
+            os.replace(tmp_path, self._file_path(key))
+        except OSError:
+            # the cache directory is not writable, keep the parameters in memory
+            pass
+
+    def _remember(self, key, parameters):
+        self._parameters[key] = parameters
+        self._parameters.move_to_end(key)
+        while len(self._parameters) > self.maxsize:
+            self._parameters.popitem(last=False)
+
+    def get(self, key):
+        """
+        Copy of the cached attributes of a building, or None if the building
+        is not cached.
+        """
+        if key in self._parameters:
+            self._parameters.move_to_end(key)
+            parameters = self._parameters[key]
+        else:
+            parameters = self._load(key)
+            if parameters is None:
+                return None
+            self._remember(key, parameters)
+        return copy.deepcopy(parameters)
+
+    def set(self, key, building):
+        """Stores the calculated attributes of a building"""
+        parameters = copy.deepcopy(
+            {
+                name: value
+                for name, value in vars(building).items()
+                if name not in _input_attributes
+            }
+        )
+        self._remember(key, parameters)
+        self._save(key, parameters)
+
+    def clear(self, disk: bool = False):
+        """Empties the memory cache and optionally removes the JSON files"""
+        self._parameters.clear()
+        if disk and self.cache_dir and os.path.isdir(self.cache_dir):
+            for file_name in os.listdir(self.cache_dir):
+                if file_name.endswith(".json"):
+                    os.remove(os.path.join(self.cache_dir, file_name))
+
+
+building_config_cache = BuildingConfigCache()
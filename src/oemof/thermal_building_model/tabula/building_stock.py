@@ -0,0 +1,192 @@
+"""Synthetic building stock
+
+BuildingStockSampler draws buildings from the TABULA archetypes of a country
+with random building type, construction year, refurbishment status, floor
+area and location. The stock is generated in chunks, each with the 5RC
+parameters as BuildingConfigBatch and the assigned weather station, so large
+stocks never need to be held in memory at once.
+
+SPDX-License-Identifier: MIT
+
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from oemof.thermal_building_model.helpers.weather_registry import weather_registry
+from oemof.thermal_building_model.tabula.tabula_batch import (
+    BuildingConfigBatch,
+    calc_building_configs,
+)
+from oemof.thermal_building_model.tabula.tabula_catalog import get_tabula_catalog
+
+BuildingStockChunk = namedtuple("BuildingStockChunk", ["configs", "buildings"])
+BuildingStockChunk.__doc__ = """
+Part of a sampled building stock
+
+configs is a BuildingConfigBatch and buildings a DataFrame with one row per
+building (Code_BuildingVariant, building_type, construction_year,
+refurbishment_status, floor_area, latitude_deg, longitude_deg and
+weather_station).
+"""
+
+
+def _normalize_shares(shares, name):
+    if not isinstance(shares, dict):
+        shares = {key: 1.0 for key in shares}
+    values = np.asarray(list(shares.values()), dtype=float)
+    if len(values) == 0 or np.any(values < 0) or values.sum() <= 0:
+        raise ValueError("{0} need positive shares, got {1}.".format(name, shares))
+    return list(shares), values / values.sum()
+
+
+class BuildingStockSampler:
+    r"""
+    Random building stock from the TABULA catalog
+
+    Parameters
+    ----------
+    country : str
+        Code_Country of the archetypes, e.g. "DE".
+    building_types : dict or list
+        Code_BuildingSizeClass with their shares, e.g. {"SFH": 0.7, "MFH": 0.3}.
+        A list gives equal shares.
+    construction_years : tuple
+        First and last construction year, the years are drawn uniformly.
+    refurbishment_shares : dict or list
+        Refurbishment status (see refurbishment_variants) with their shares.
+    floor_area_scale : tuple
+        Range of the floor area relative to the TABULA reference floor area,
+        drawn uniformly. (1, 1) keeps the reference floor areas.
+    bounds : tuple
+        ((latitude_min, latitude_max), (longitude_min, longitude_max)) in
+        degree of the area the buildings are placed in uniformly. Default is
+        Germany.
+    class_building : str
+        Building class of all buildings, see Building.
+    tabula_catalog : TabulaCatalog
+        Default is the shared catalog.
+    registry : WeatherFileRegistry
+        Weather stations the buildings are assigned to (the nearest one).
+    seed : int
+        Seed of the random number generator.
+    """
+
+    def __init__(
+        self,
+        country: str = "DE",
+        building_types=("SFH", "TH", "MFH", "AB"),
+        construction_years=(1860, 2015),
+        refurbishment_shares=None,
+        floor_area_scale=(0.9, 1.1),
+        bounds=((47.3, 55.1), (5.9, 15.0)),
+        class_building: str = "average",
+        tabula_catalog=None,
+        registry=None,
+        seed: int = None,
+    ):
+        if refurbishment_shares is None:
+            refurbishment_shares = {
+                "no_refurbishment": 0.6,
+                "usual_refurbishment": 0.3,
+                "advanced_refurbishment": 0.1,
+            }
+        self.country = country
+        self.building_types, self.building_type_shares = _normalize_shares(
+            building_types, "building_types"
+        )
+        self.refurbishment_status, self.refurbishment_shares = _normalize_shares(
+            refurbishment_shares, "refurbishment_shares"
+        )
+        self.construction_years = construction_years
+        self.floor_area_scale = floor_area_scale
+        self.bounds = bounds
+        self.class_building = class_building
+        self.tabula_catalog = (
+            tabula_catalog if tabula_catalog is not None else get_tabula_catalog()
+        )
+        self.registry = registry if registry is not None else weather_registry
+        self.random = np.random.default_rng(seed)
+
+    def _draw(self, number_of_buildings):
+        random = self.random
+        buildings = pd.DataFrame(
+            {
+                "building_type": random.choice(
+                    self.building_types,
+                    size=number_of_buildings,
+                    p=self.building_type_shares,
+                ),
+                "construction_year": random.integers(
+                    self.construction_years[0],
+                    self.construction_years[1],
+                    size=number_of_buildings,
+                    endpoint=True,
+                ),
+                "refurbishment_status": random.choice(
+                    self.refurbishment_status,
+                    size=number_of_buildings,
+                    p=self.refurbishment_shares,
+                ),
+            }
+        )
+        buildings.insert(
+            0,
+            "Code_BuildingVariant",
+            self.tabula_catalog.find_building_codes(
+                country=self.country,
+                construction_year=buildings["construction_year"],
+                building_type=buildings["building_type"],
+                refurbishment_status=buildings["refurbishment_status"],
+            ),
+        )
+        # combinations without archetype (e.g. no advanced refurbishment)
+        return buildings[buildings["Code_BuildingVariant"].notna()]
+
+    def _sample_chunk(self, number_of_buildings):
+        parts = []
+        missing = number_of_buildings
+        while missing > 0:
+            buildings = self._draw(missing)
+            if len(buildings) == 0:
+                raise ValueError(
+                    "No TABULA archetype matches the building types, "
+                    "construction years and refurbishment shares."
+                )
+            parts.append(buildings)
+            missing -= len(buildings)
+        buildings = pd.concat(parts, ignore_index=True)
+
+        rows = self.tabula_catalog.get_buildings(buildings["Code_BuildingVariant"])
+        buildings["floor_area"] = rows["A_C_Ref"].to_numpy(
+            dtype=float
+        ) * self.random.uniform(*self.floor_area_scale, size=len(buildings))
+        (latitude_min, latitude_max), (longitude_min, longitude_max) = self.bounds
+        buildings["latitude_deg"] = self.random.uniform(
+            latitude_min, latitude_max, size=len(buildings)
+        )
+        buildings["longitude_deg"] = self.random.uniform(
+            longitude_min, longitude_max, size=len(buildings)
+        )
+        buildings["weather_station"] = self.registry.find_nearest(
+            latitude_deg=buildings["latitude_deg"].to_numpy(),
+            longitude_deg=buildings["longitude_deg"].to_numpy(),
+        )
+
+        configs = BuildingConfigBatch.from_frame(
+            calc_building_configs(
+                data=rows,
+                floor_area=buildings["floor_area"].to_numpy(),
+                class_building=self.class_building,
+            )
+        )
+        return BuildingStockChunk(configs=configs, buildings=buildings)
+
+    def sample(self, number_of_buildings: int, chunk_size: int = 10000):
+        """
+        Generator of BuildingStockChunk with at most chunk_size buildings,
+        until number_of_buildings buildings are sampled.
+        """
+        for start in range(0, number_of_buildings, chunk_size):
+            yield self._sample_chunk(min(chunk_size, number_of_buildings - start))
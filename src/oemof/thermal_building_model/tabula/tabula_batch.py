@@ -0,0 +1,401 @@
+"""Column-wise 5RC parameters of many TABULA buildings
+
+The functions calculate the parameters of BuildingConfig5RC for all rows of
+the TABULA table (or any filtered subset) at once. Every step follows the
+calculation of the Building class in the same order, so the results are equal
+to the ones of one Building object per row.
+
+BuildingConfigBatch keeps the parameters of many buildings as numpy columns.
+Indexing it returns light views, which can be passed as building_config to
+M5RC like a BuildingConfig5RC.
+
+calc_refurbishment_combinations evaluates the conductances of all
+combinations of element-wise refurbishments in one pass.
+
+SPDX-License-Identifier: MIT
+
+"""
+from dataclasses import fields
+
+import numpy as np
+import pandas as pd
+
+from oemof.thermal_building_model.tabula.tabula_catalog import (
+    get_tabula_catalog,
+    refurbishment_variants,
+)
+from oemof.thermal_building_model.tabula.tabula_reader import (
+    BuildingConfig5RC,
+    class_building_parameters,
+)
+
+# opaque elements and their number of areas in the TABULA table, in the order
+# used by Building.calc_h_tr_em
+opaque_elements = {"Wall": 3, "Roof": 2, "Floor": 2}
+
+
+def _column(data, column):
+    return data[column].to_numpy(dtype=float)
+
+
+def calc_floor_area_ratio(data, floor_area=None):
+    """
+    Floor areas and the ratios to the TABULA reference floor areas
+    :param data: Rows of the TABULA table
+    :type data: pd.DataFrame
+    :param floor_area: Floor areas in m2, scalar or one per row. Default (and NaN entries) are the reference floor areas
+    :type floor_area: numeric or np.ndarray
+    :return: floor_area, floor_area_ratio
+    :rtype: tuple of np.ndarray
+    """
+    floor_area_reference = _column(data, "A_C_Ref")
+    if floor_area is None:
+        return floor_area_reference.copy(), np.ones(len(data))
+    floor_area = np.broadcast_to(
+        np.asarray(floor_area, dtype=float), floor_area_reference.shape
+    )
+    undefined = np.isnan(floor_area)
+    floor_area = np.where(undefined, floor_area_reference, floor_area)
+    floor_area_ratio = np.where(undefined, 1.0, floor_area / floor_area_reference)
+    return floor_area, floor_area_ratio
+
+
+def calc_h_tr_em(data, floor_area_ratio):
+    """Conductance of the opaque elements in W/K, see Building.calc_h_tr_em"""
+    h_tr_em = np.zeros(len(data))
+    a_external = np.zeros(len(data))
+    for element, number in opaque_elements.items():
+        for x in range(1, number + 1):
+            a = _column(data, "A_{0}_{1}".format(element, x)) * floor_area_ratio
+            h_tr_em = (
+                h_tr_em
+                + a
+                * _column(data, "U_Measure_{0}_{1}".format(element, x))
+                * _column(data, "b_Transmission_{0}_{1}".format(element, x))
+            )
+            a_external = a_external + a
+    a_door = _column(data, "A_Door_1") * floor_area_ratio
+    h_tr_em = h_tr_em + a_door * _column(data, "U_Measure_Door_1")
+    a_external = a_external + a_door
+    return h_tr_em + _column(data, "delta_U_ThermalBridging") * a_external
+
+
+def calc_h_tr_w(data, floor_area_ratio):
+    """Conductance of the windows in W/K, see Building.calc_h_tr_w"""
+    h_tr_w = np.zeros(len(data))
+    for x in [1, 2]:
+        h_tr_w = h_tr_w + (
+            _column(data, "A_Window_{0}".format(x)) * floor_area_ratio
+        ) * _column(data, "U_Measure_Window_{0}".format(x))
+    # Building.calc_h_tr_w adds the thermal bridges with a window area of 0
+    return h_tr_w + _column(data, "delta_U_ThermalBridging") * 0.0
+
+
+def calc_building_configs(data=None, floor_area=None, class_building="average"):
+    """
+    Parameters of BuildingConfig5RC for many TABULA buildings
+    :param data: Rows of the TABULA table. Default is the whole table of the shared catalog
+    :type data: pd.DataFrame
+    :param floor_area: Floor areas in m2, scalar or one per row. Default are the reference floor areas
+    :type floor_area: numeric or np.ndarray
+    :param class_building: Building class of Building.list_class_buildig, scalar or one per row
+    :type class_building: str or list
+    :return: One row per building and one column per field of BuildingConfig5RC, indexed by Code_BuildingVariant
+    :rtype: pd.DataFrame
+    """
+    if data is None:
+        data = get_tabula_catalog().data
+    floor_area, floor_area_ratio = calc_floor_area_ratio(data, floor_area)
+    class_building = pd.Series(
+        np.broadcast_to(np.asarray(class_building, dtype=object), (len(data),))
+    )
+    unknown = ~class_building.isin(class_building_parameters)
+    if unknown.any():
+        raise ValueError(
+            "Unknown class_building {0}, use one of {1}.".format(
+                sorted(set(class_building[unknown])),
+                list(class_building_parameters),
+            )
+        )
+    a_m_var = class_building.map(
+        {key: value["a_m_var"] for key, value in class_building_parameters.items()}
+    ).to_numpy(dtype=float)
+    c_m_var = class_building.map(
+        {key: value["c_m_var"] for key, value in class_building_parameters.items()}
+    ).to_numpy(dtype=float)
+
+    total_air_change_rate = _column(data, "n_air_use") + _column(
+        data, "n_air_infiltration"
+    )
+    # DIN 7.2.2.2
+    total_internal_area = floor_area * 4.5
+    # DIN 13790 9.3.1
+    h_ve = (1200 / 3600) * (
+        total_air_change_rate * _column(data, "h_room") * floor_area
+    )
+    mass_area = floor_area * a_m_var
+
+    configs = {
+        "total_internal_area": total_internal_area,
+        "h_ve": h_ve,
+        "h_tr_w": calc_h_tr_w(data, floor_area_ratio),
+        "h_tr_em": calc_h_tr_em(data, floor_area_ratio),
+        "h_tr_is": 3.45 * total_internal_area,
+        "mass_area": mass_area,
+        "h_tr_ms": 9.1 * mass_area,
+        "c_m": floor_area * c_m_var,
+        "floor_area": floor_area,
+        "heat_transfer_coefficient_ventilation": _column(data, "h_Ventilation"),
+        "total_air_change_rate": total_air_change_rate,
+    }
+    return pd.DataFrame(
+        {field.name: configs[field.name] for field in fields(BuildingConfig5RC)},
+        index=pd.Index(data["Code_BuildingVariant"], name="Code_BuildingVariant"),
+    )
+
+
+building_config_fields = tuple(field.name for field in fields(BuildingConfig5RC))
+
+
+class BuildingConfigView:
+    r"""
+    Read-only view of one building of a BuildingConfigBatch
+
+    The view has the attributes of BuildingConfig5RC and reads them from the
+    columns of the batch, so no data is copied.
+    """
+
+    __slots__ = ("_batch", "_position")
+
+    def __init__(self, batch, position: int):
+        self._batch = batch
+        self._position = position
+
+    def to_building_config(self):
+        """Independent BuildingConfig5RC of the building"""
+        return BuildingConfig5RC(
+            **{name: getattr(self, name) for name in building_config_fields}
+        )
+
+    def __repr__(self):
+        return "BuildingConfigView({0})".format(
+            ", ".join(
+                "{0}={1}".format(name, getattr(self, name))
+                for name in building_config_fields
+            )
+        )
+
+
+def _make_property(name):
+    return property(lambda view: float(getattr(view._batch, name)[view._position]))
+
+
+for _name in building_config_fields:
+    setattr(BuildingConfigView, _name, _make_property(_name))
+
+
+class BuildingConfigBatch:
+    r"""
+    Parameters of BuildingConfig5RC of many buildings as numpy columns
+
+    Parameters
+    ----------
+    labels : list
+        Optional label of each building, e.g. Code_BuildingVariant.
+    **columns : np.ndarray
+        One array per field of BuildingConfig5RC, all of the same length.
+    """
+
+    __slots__ = building_config_fields + ("labels",)
+
+    def __init__(self, labels=None, **columns):
+        missing = set(building_config_fields) - set(columns)
+        unknown = set(columns) - set(building_config_fields)
+        if missing or unknown:
+            raise ValueError(
+                "BuildingConfigBatch needs the columns {0}, missing {1}, "
+                "unknown {2}.".format(
+                    list(building_config_fields), sorted(missing), sorted(unknown)
+                )
+            )
+        lengths = set()
+        for name in building_config_fields:
+            column = np.ascontiguousarray(columns[name], dtype=float)
+            column.flags.writeable = False
+            lengths.add(column.shape)
+            setattr(self, name, column)
+        if len(lengths) != 1 or len(lengths.pop()) != 1:
+            raise ValueError("All columns need to be 1-d arrays of the same length.")
+        if labels is not None:
+            labels = np.asarray(labels, dtype=object)
+            if len(labels) != len(self):
+                raise ValueError("labels need one entry per building.")
+        self.labels = labels
+
+    @classmethod
+    def from_frame(cls, building_configs):
+        """Batch of a DataFrame like the one of calc_building_configs"""
+        return cls(
+            labels=building_configs.index,
+            **{name: building_configs[name] for name in building_config_fields},
+        )
+
+    @classmethod
+    def from_building_configs(cls, building_configs, labels=None):
+        """Batch of a list of BuildingConfig5RC (or views)"""
+        return cls(
+            labels=labels,
+            **{
+                name: [getattr(config, name) for config in building_configs]
+                for name in building_config_fields
+            },
+        )
+
+    def __len__(self):
+        return len(self.c_m)
+
+    def __getitem__(self, item):
+        """View of one building, or a new batch for slices and index arrays"""
+        if isinstance(item, (int, np.integer)):
+            if not -len(self) <= item < len(self):
+                raise IndexError("building index out of range")
+            return BuildingConfigView(self, int(item) % len(self))
+        return BuildingConfigBatch(
+            labels=None if self.labels is None else self.labels[item],
+            **{name: getattr(self, name)[item] for name in building_config_fields},
+        )
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield BuildingConfigView(self, position)
+
+    def get(self, label):
+        """View of the building with the label"""
+        if self.labels is None:
+            raise KeyError("The batch has no labels.")
+        positions = np.flatnonzero(self.labels == label)
+        if len(positions) == 0:
+            raise KeyError(label)
+        return BuildingConfigView(self, int(positions[0]))
+
+    def to_frame(self):
+        """DataFrame with one row per building"""
+        return pd.DataFrame(
+            {name: getattr(self, name) for name in building_config_fields},
+            index=self.labels,
+        )
+
+
+# elements of the refurbishment combinations: TABULA element name, number of
+# areas and whether a b-factor (temperature adjustment) is given
+refurbishment_elements = {
+    "wall": ("Wall", 3, True),
+    "roof": ("Roof", 2, True),
+    "floor": ("Floor", 2, True),
+    "door": ("Door", 1, False),
+    "window": ("Window", 2, False),
+}
+
+
+def _variant_code(tabula_building_code, variant):
+    # the last part of Code_BuildingVariant is the number of the variant
+    return "{0}.{1:03d}".format(tabula_building_code.rsplit(".", 1)[0], variant)
+
+
+def calc_refurbishment_combinations(
+    data=None, tabula_building_codes=None, floor_area=None
+):
+    """
+    Conductances of all combinations of element-wise refurbishments
+
+    Every element class (wall, roof, floor, door, window) takes the U-values
+    and b-factors of one of the TABULA variants (1: no, 2: usual, 3: advanced
+    refurbishment) independently of the other elements, which gives 3^5
+    combinations per building. The areas are the ones of the given building
+    and the thermal bridge surcharge is taken from the variant of the walls.
+    Combinations with a variant missing in the table are left out.
+    :param data: Rows of the TABULA table including the refurbished variants. Default is the whole table of the shared catalog
+    :type data: pd.DataFrame
+    :param tabula_building_codes: Codes of the buildings to refurbish. Default are all buildings of variant 1 in data
+    :type tabula_building_codes: list
+    :param floor_area: Floor areas in m2, scalar or one per building. Default are the reference floor areas
+    :type floor_area: numeric or np.ndarray
+    :return: One row per building and combination with the variant of each element, h_tr_em and h_tr_w in W/K
+    :rtype: pd.DataFrame
+    """
+    if data is None:
+        data = get_tabula_catalog().data
+    codes = data["Code_BuildingVariant"]
+    if tabula_building_codes is None:
+        tabula_building_codes = codes[
+            data["Number_BuildingVariant"].to_numpy(dtype=float) == 1
+        ]
+    tabula_building_codes = np.asarray(tabula_building_codes, dtype=object)
+    rows = data.set_index(codes, drop=False)
+    base = rows.reindex(tabula_building_codes)
+    if base["Code_BuildingVariant"].isna().any():
+        raise KeyError(
+            "The building codes {0} are not part of the TABULA data.".format(
+                list(tabula_building_codes[base["Code_BuildingVariant"].isna()])
+            )
+        )
+    floor_area, floor_area_ratio = calc_floor_area_ratio(base, floor_area)
+    variants = sorted(refurbishment_variants.values())
+    variant_rows = [
+        rows.reindex([_variant_code(code, v) for code in tabula_building_codes])
+        for v in variants
+    ]
+    # (buildings x variants)
+    available = np.stack(
+        [row["Code_BuildingVariant"].notna().to_numpy() for row in variant_rows],
+        axis=1,
+    )
+
+    conductances = {}
+    a_external = np.zeros(len(base))
+    for element, (name, number, with_b) in refurbishment_elements.items():
+        conductance = np.zeros((len(base), len(variants)))
+        for x in range(1, number + 1):
+            a = _column(base, "A_{0}_{1}".format(name, x)) * floor_area_ratio
+            if element != "window":
+                a_external = a_external + a
+            for position, row in enumerate(variant_rows):
+                h = a * _column(row, "U_Measure_{0}_{1}".format(name, x))
+                if with_b:
+                    h = h * _column(row, "b_Transmission_{0}_{1}".format(name, x))
+                conductance[:, position] += h
+        conductances[element] = conductance
+    delta_u = np.stack(
+        [_column(row, "delta_U_ThermalBridging") for row in variant_rows], axis=1
+    )
+
+    # (combinations x elements) positions of the variants
+    combinations = np.stack(
+        np.meshgrid(
+            *[np.arange(len(variants))] * len(refurbishment_elements), indexing="ij"
+        ),
+        axis=-1,
+    ).reshape(-1, len(refurbishment_elements))
+    wall, roof, floor, door, window = combinations.T
+    h_tr_em = (
+        conductances["wall"][:, wall]
+        + conductances["roof"][:, roof]
+        + conductances["floor"][:, floor]
+        + conductances["door"][:, door]
+        + delta_u[:, wall] * a_external[:, None]
+    )
+    h_tr_w = conductances["window"][:, window]
+    valid = available[:, combinations].all(axis=2)
+
+    buildings, combination = np.nonzero(valid)
+    result = pd.DataFrame(
+        {"Code_BuildingVariant": tabula_building_codes[buildings]}
+    )
+    for position, element in enumerate(refurbishment_elements):
+        result["variant_" + element] = np.asarray(variants)[
+            combinations[combination, position]
+        ]
+    result["floor_area"] = floor_area[buildings]
+    result["h_tr_em"] = h_tr_em[buildings, combination]
+    result["h_tr_w"] = h_tr_w[buildings, combination]
+    return result
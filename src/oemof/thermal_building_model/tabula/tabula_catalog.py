@@ -0,0 +1,480 @@
+"""TABULA catalog
+
+The TABULA table is loaded once per process and shared by all Building
+objects. Queries return views or copies of single rows and never modify the
+shared table. With use_cache=True the parsed table is stored as npz file in
+the cache directory, so a restart does not parse the csv file again. The
+shared catalog stays in memory, a persisted catalog can be passed to Building
+as tabula_catalog.
+
+Only the columns used by Building are read, with numeric and categorical
+dtypes instead of the mixed object columns of the full table.
+
+Building codes are looked up in an index keyed by country, building size
+class, data type and variant. The construction periods of a key are sorted by
+their first year, so a construction year is found with a binary search, also
+for many queries at once.
+
+SPDX-License-Identifier: MIT
+
+"""
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from oemof.thermal_building_model.helpers.path_helper import (
+    get_cache_dir,
+    get_project_root,
+)
+
+refurbishment_variants = {
+    "no_refurbishment": 1,
+    "usual_refurbishment": 2,
+    "advanced_refurbishment": 3,
+}
+
+
+# columns of the TABULA table used by Building, see tabula_columns
+_identifier_dtypes = {
+    "Code_BuildingVariant": "object",
+    "Code_Country": "category",
+    "Code_BuildingSizeClass": "category",
+    "Code_DataType_Building": "category",
+    "Number_BuildingVariant": "float64",
+    # construction periods like "...1859" are parsed by _parse_years
+    "Year1_Building": "object",
+    "Year2_Building": "object",
+}
+_parameter_columns = (
+    ["A_C_Ref"]
+    + [
+        "{0}_{1}".format(prefix, element)
+        for element in ["Roof_1", "Roof_2", "Floor_1", "Floor_2"]
+        for prefix in ["A", "U_Measure", "b_Transmission"]
+    ]
+    + [
+        "{0}_Wall_{1}".format(prefix, number)
+        for number in [1, 2, 3]
+        for prefix in ["A", "U_Measure", "b_Transmission"]
+    ]
+    + ["A_Door_1", "U_Measure_Door_1"]
+    + [
+        "A_Window_" + orientation
+        for orientation in ["1", "2", "Horizontal", "East", "South", "West", "North"]
+    ]
+    + ["delta_U_ThermalBridging"]
+    + ["U_Measure_Window_1", "U_Measure_Window_2"]
+    + ["g_gl_n_Window_1", "g_gl_n_Window_2"]
+    + ["h_Ventilation", "q_ht_tr", "q_ht_ve", "q_ht", "q_sol", "q_int"]
+    + ["n_air_use", "n_air_infiltration", "h_room", "q_h_nd", "h_Transmission"]
+)
+# float64 keeps the results identical to the untyped table
+tabula_columns = {
+    **_identifier_dtypes,
+    **{column: "float64" for column in _parameter_columns},
+}
+
+
+def get_tabula_data_path():
+    return os.path.join(
+        get_project_root(),
+        "thermal_building_model",
+        "tabula",
+        "tabula_data_sorted.csv",
+    )
+
+
+_YearIndex = namedtuple("_YearIndex", ["year1", "year2", "codes", "overlapping"])
+
+
+def _parse_years(years):
+    # years like "...1859" or empty fields are treated like 0, as before
+    return pd.to_numeric(years, errors="coerce").fillna(0).to_numpy(dtype=float)
+
+
+def _write_npz(file_path, data, key=None):
+    arrays = {}
+    columns = []
+    for position, column in enumerate(data.columns):
+        values = data[column]
+        dtype = str(values.dtype)
+        if values.dtype.kind in "biuf":
+            arrays["column_{0}".format(position)] = values.to_numpy()
+        else:
+            missing = values.isna().to_numpy()
+            arrays["column_{0}".format(position)] = np.where(
+                missing, "", values.astype(object).astype(str).to_numpy()
+            ).astype(str)
+            arrays["missing_{0}".format(position)] = missing
+        columns.append([column, dtype])
+    with open(file_path, "wb") as file:
+        np.savez(
+            file,
+            key=np.array("" if key is None else key),
+            columns=np.array(json.dumps(columns)),
+            **arrays,
+        )
+
+
+def _read_npz(file_path):
+    """Key and table of a file written by _write_npz"""
+    with np.load(file_path, allow_pickle=False) as cached:
+        key = str(cached["key"]) or None
+        data = {}
+        for position, (column, dtype) in enumerate(
+            json.loads(str(cached["columns"]))
+        ):
+            values = cached["column_{0}".format(position)]
+            if "missing_{0}".format(position) in cached.files:
+                values = values.astype(object)
+                values[cached["missing_{0}".format(position)]] = np.nan
+            data[column] = pd.Series(values).astype(dtype)
+    return key, pd.DataFrame(data)
+
+
+class TabulaCatalog:
+    r"""
+    Read-only access to the TABULA building table
+
+    Parameters
+    ----------
+    csv_path : str
+        Path of the TABULA csv file. Default is tabula_data_sorted.csv.
+    data : pd.DataFrame
+        Already loaded TABULA table, used instead of csv_path.
+    use_cache : bool
+        Load the parsed table from the cache directory and store it there
+        after parsing the csv file.
+    cache_dir : str
+        Directory of the npz file. Default is get_cache_dir("tabula").
+    columns : dict
+        Columns read from the csv file and their dtypes. Default are the
+        tabula_columns used by Building. With columns=None all columns are
+        read without dtypes.
+    """
+
+    def __init__(
+        self,
+        csv_path=None,
+        data=None,
+        use_cache=False,
+        cache_dir=None,
+        columns=tabula_columns,
+    ):
+        if csv_path is None and data is None:
+            csv_path = get_tabula_data_path()
+        if cache_dir is None:
+            cache_dir = get_cache_dir("tabula")
+        self.csv_path = csv_path
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.columns = columns
+        self._data = data
+        self._positions = None
+        self._year_index = None
+        self._fingerprint = None
+
+    @property
+    def data(self):
+        """The shared TABULA table, which must not be modified"""
+        if self._data is None:
+            self._data = self._load()
+        return self._data
+
+    def _source_key(self):
+        stat = os.stat(self.csv_path)
+        return repr(
+            (
+                os.path.abspath(self.csv_path),
+                stat.st_size,
+                stat.st_mtime_ns,
+                self.columns,
+            )
+        )
+
+    def _cache_file_path(self):
+        key = self._source_key()
+        name = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return os.path.join(self.cache_dir, name + ".npz"), key
+
+    @property
+    def fingerprint(self):
+        """
+        Hash of the content of the catalog. For a csv file the path, size and
+        modification time are used, so the table does not need to be loaded.
+        """
+        if self._fingerprint is None:
+            if self.csv_path is not None:
+                key = self._source_key().encode()
+            else:
+                key = repr(list(self.data.columns)).encode() + (
+                    pd.util.hash_pandas_object(self.data).to_numpy().tobytes()
+                )
+            self._fingerprint = hashlib.sha256(key).hexdigest()
+        return self._fingerprint
+
+    def _read_csv(self):
+        if self.columns is None:
+            return pd.read_csv(self.csv_path, low_memory=False)
+        data = pd.read_csv(
+            self.csv_path,
+            usecols=list(self.columns),
+            dtype={
+                column: "object"
+                for column, dtype in self.columns.items()
+                if not dtype.startswith("float")
+            },
+            low_memory=False,
+        )[list(self.columns)]
+        for column, dtype in self.columns.items():
+            if dtype.startswith("float") and data[column].dtype == object:
+                # single non-numeric entries become NaN
+                data[column] = pd.to_numeric(data[column], errors="coerce")
+            data[column] = data[column].astype(dtype)
+        return data
+
+    def _load(self):
+        if not self.use_cache:
+            return self._read_csv()
+        file_path, key = self._cache_file_path()
+        if os.path.exists(file_path):
+            cached_key, data = _read_npz(file_path)
+            if cached_key == key:
+                return data
+        data = self._read_csv()
+        self._data = data
+        self.to_binary(file_path, key=key)
+        return data
+
+    def to_binary(self, file_path, key=None):
+        """
+        Stores the table with its dtypes as npz file. Text and categorical
+        columns are stored as strings, so no pickled objects are written.
+        """
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+            _write_npz(file_path, self.data, key)
+        except OSError:
+            # the cache directory is not writable, the csv is parsed next time
+            pass
+
+    @classmethod
+    def from_binary(cls, file_path):
+        """Catalog of a table stored with to_binary"""
+        return cls(data=_read_npz(file_path)[1])
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, tabula_building_code):
+        return tabula_building_code in self._get_positions()
+
+    def _get_positions(self):
+        if self._positions is None:
+            self._positions = {
+                code: position
+                for position, code in enumerate(self.data["Code_BuildingVariant"])
+            }
+        return self._positions
+
+    def get_building(self, tabula_building_code):
+        """One row DataFrame of a Code_BuildingVariant"""
+        try:
+            position = self._get_positions()[tabula_building_code]
+        except KeyError:
+            raise KeyError(
+                "The building code {0} is not part of the TABULA "
+                "data.".format(tabula_building_code)
+            )
+        return self.data.iloc[[position]]
+
+    def get_buildings(self, tabula_building_codes):
+        """Rows of many Code_BuildingVariant, in the given order"""
+        positions = self._get_positions()
+        try:
+            return self.data.iloc[
+                [positions[code] for code in tabula_building_codes]
+            ]
+        except KeyError as error:
+            raise KeyError(
+                "The building code {0} is not part of the TABULA "
+                "data.".format(error.args[0])
+            )
+
+    def _get_year_index(self):
+        if self._year_index is None:
+            data = self.data
+            year1 = _parse_years(data["Year1_Building"])
+            year2 = _parse_years(data["Year2_Building"])
+            codes = data["Code_BuildingVariant"].to_numpy(dtype=object)
+            groups = pd.DataFrame(
+                {
+                    "country": data["Code_Country"].to_numpy(dtype=object),
+                    "building_type": data["Code_BuildingSizeClass"].to_numpy(
+                        dtype=object
+                    ),
+                    "datatype": data["Code_DataType_Building"].to_numpy(dtype=object),
+                    "variant": data["Number_BuildingVariant"].to_numpy(dtype=object),
+                }
+            ).groupby(
+                ["country", "building_type", "datatype", "variant"], dropna=False
+            ).indices
+            self._year_index = {}
+            for key, positions in groups.items():
+                positions = positions[np.argsort(year1[positions], kind="stable")]
+                group_year1 = year1[positions]
+                group_year2 = year2[positions]
+                self._year_index[key] = _YearIndex(
+                    year1=group_year1,
+                    year2=group_year2,
+                    codes=codes[positions],
+                    # periods sharing years can not be found by a binary search
+                    overlapping=bool(np.any(group_year1[1:] <= group_year2[:-1])),
+                )
+        return self._year_index
+
+    def _find_in_index(self, index, construction_year):
+        """Codes of all periods of an index containing the construction year"""
+        if index.overlapping:
+            mask = (index.year1 <= construction_year) & (
+                index.year2 >= construction_year
+            )
+            return list(index.codes[mask])
+        position = np.searchsorted(index.year1, construction_year, side="right") - 1
+        if position >= 0 and index.year2[position] >= construction_year:
+            return [index.codes[position]]
+        return []
+
+    def find_building_code(
+        self,
+        country: str,
+        construction_year: int,
+        building_type: str,
+        refurbishment_status: str,
+    ):
+        """
+        Code_BuildingVariant of the existing (ReEx) TABULA building of a
+        country, building size class and construction year in the given
+        refurbishment status.
+        """
+        if refurbishment_status in refurbishment_variants:
+            index = self._get_year_index().get(
+                (
+                    country,
+                    building_type,
+                    "ReEx",
+                    refurbishment_variants[refurbishment_status],
+                )
+            )
+            codes = (
+                [] if index is None else self._find_in_index(index, construction_year)
+            )
+        else:
+            # all variants of the construction period
+            data = self.data
+            mask = (
+                (data["Code_Country"] == country)
+                & (data["Code_BuildingSizeClass"] == building_type)
+                & (data["Code_DataType_Building"] == "ReEx")
+                & (_parse_years(data["Year1_Building"]) <= construction_year)
+                & (_parse_years(data["Year2_Building"]) >= construction_year)
+            )
+            codes = list(data.loc[mask, "Code_BuildingVariant"])
+
+        assert len(codes) <= 1, (
+            "More than one building is founded for "
+            "the input parameters. Please write an "
+            "issue in Github"
+        )
+        if len(codes) == 0:
+            raise ValueError(
+                "No TABULA building found for country {0}, building type {1}, "
+                "construction year {2} and {3}.".format(
+                    country, building_type, construction_year, refurbishment_status
+                )
+            )
+        return codes[0]
+
+    def find_building_codes(
+        self,
+        country,
+        construction_year,
+        building_type,
+        refurbishment_status,
+    ):
+        """
+        Code_BuildingVariant of many existing (ReEx) TABULA buildings
+
+        All arguments are scalars or array-likes of the same length. Returns an
+        object array with one code per query and None where no building is
+        found. If construction periods overlap, the period with the latest
+        first year is used.
+        """
+        queries = pd.DataFrame(
+            {
+                "country": country,
+                "building_type": building_type,
+                "refurbishment_status": refurbishment_status,
+                "construction_year": construction_year,
+            },
+            index=np.arange(
+                max(
+                    np.size(country),
+                    np.size(building_type),
+                    np.size(refurbishment_status),
+                    np.size(construction_year),
+                )
+            ),
+        )
+        unknown = ~queries["refurbishment_status"].isin(refurbishment_variants)
+        if unknown.any():
+            raise ValueError(
+                "Unknown refurbishment status {0}, use one of {1}.".format(
+                    sorted(set(queries.loc[unknown, "refurbishment_status"])),
+                    list(refurbishment_variants),
+                )
+            )
+        queries["variant"] = queries["refurbishment_status"].map(
+            refurbishment_variants
+        )
+
+        year_index = self._get_year_index()
+        codes = np.full(len(queries), None, dtype=object)
+        for (country_, building_type_, variant), positions in queries.groupby(
+            ["country", "building_type", "variant"]
+        ).indices.items():
+            index = year_index.get((country_, building_type_, "ReEx", variant))
+            if index is None:
+                continue
+            years = queries["construction_year"].to_numpy(dtype=float)[positions]
+            candidates = np.searchsorted(index.year1, years, side="right") - 1
+            if index.overlapping:
+                # walk back to the latest period which contains the year
+                found = np.full(len(years), -1)
+                for position in range(len(index.year1) - 1, -1, -1):
+                    contains = (
+                        (found < 0)
+                        & (index.year1[position] <= years)
+                        & (index.year2[position] >= years)
+                    )
+                    found[contains] = position
+                candidates = found
+            valid = candidates >= 0
+            valid[valid] = index.year2[candidates[valid]] >= years[valid]
+            codes[positions[valid]] = index.codes[candidates[valid]]
+        return codes
+
+
+_tabula_catalog = None
+
+
+def get_tabula_catalog():
+    """Process-wide TABULA catalog, loaded on first use and kept in memory"""
+    global _tabula_catalog
+    if _tabula_catalog is None:
+        _tabula_catalog = TabulaCatalog(use_cache=False)
+    return _tabula_catalog
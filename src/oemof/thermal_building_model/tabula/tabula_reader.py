@@ -3,10 +3,24 @@
 SPDX-FileCopyrightText: Maximilian Hillen <maximilian.hillen@dlr.de>
 
 """
-import pandas as pd
-from oemof.thermal_building_model.helpers.path_helper import get_project_root
-from oemof.thermal_building_model.helpers.calculate_gain_by_sun import Window
-import os
+import numpy as np
+from oemof.thermal_building_model.helpers.calculate_gain_by_sun import (
+    Window,
+    calc_orientation_irradiance,
+    calc_solar_gains_fleet,
+    compass_directions,
+)
+from oemof.thermal_building_model.helpers.irradiance_cache import (
+    OrientationIrradianceCache,
+    irradiance_cache,
+)
+from oemof.thermal_building_model.tabula.building_config_cache import (
+    BuildingConfigCache,
+)
+from oemof.thermal_building_model.tabula.tabula_catalog import (
+    TabulaCatalog,
+    get_tabula_catalog,
+)
 import warnings
 from dataclasses import dataclass, field, fields
 
@@ -56,6 +70,154 @@ class BuildingConfig5RC:
     total_air_change_rate: float
 
 
+def _sequential_sum(values):
+    # adds the values one after the other, like a loop over the elements
+    return float(np.add.accumulate(values)[-1]) if len(values) else 0.0
+
+
+def _dict_to_array(dictionary, prefix):
+    # values of keys like "a_wall_1", "a_wall_2", ... ordered by their number
+    return np.array(
+        [dictionary[prefix + str(x)] for x in range(1, len(dictionary) + 1)],
+        dtype=float,
+    )
+
+
+@dataclass
+class BuildingEnvelope:
+    r"""
+    Envelope of a building as arrays of areas, U-values and b-factors per
+    element class.
+
+    Parameters
+    ----------
+    a_wall, u_wall, b_wall : array-like
+        Areas in m2, U-values in W/(m2K) and temperature adjustment factors of
+        the walls. The same for roof and floor.
+    a_door, u_door : array-like
+        Areas in m2 and U-values in W/(m2K) of the doors.
+    a_window, u_window, g_gl_n_window : array-like
+        Areas in m2, U-values in W/(m2K) and total solar energy transmittance
+        of the windows.
+    a_window_specific : array-like
+        Window areas in m2 in the order of compass_directions.
+    delta_u_thermal_bridging : float
+        Surcharge on the U-values for thermal bridges in W/(m2K).
+    """
+    a_wall: np.ndarray
+    u_wall: np.ndarray
+    b_wall: np.ndarray
+    a_roof: np.ndarray
+    u_roof: np.ndarray
+    b_roof: np.ndarray
+    a_floor: np.ndarray
+    u_floor: np.ndarray
+    b_floor: np.ndarray
+    a_door: np.ndarray
+    u_door: np.ndarray
+    a_window: np.ndarray
+    u_window: np.ndarray
+    g_gl_n_window: np.ndarray
+    a_window_specific: np.ndarray
+    delta_u_thermal_bridging: float = 0.0
+
+    def __post_init__(self):
+        element_classes = {
+            "wall": ["a_wall", "u_wall", "b_wall"],
+            "roof": ["a_roof", "u_roof", "b_roof"],
+            "floor": ["a_floor", "u_floor", "b_floor"],
+            "door": ["a_door", "u_door"],
+            "window": ["a_window", "u_window", "g_gl_n_window"],
+        }
+        for names in element_classes.values():
+            for name in names:
+                setattr(
+                    self,
+                    name,
+                    np.atleast_1d(np.asarray(getattr(self, name), dtype=float)),
+                )
+            shapes = {getattr(self, name).shape for name in names}
+            if len(shapes) != 1 or len(shapes.pop()) != 1:
+                raise ValueError(
+                    f"{', '.join(names)} must be 1-d arrays of the same length"
+                )
+        self.a_window_specific = np.asarray(self.a_window_specific, dtype=float)
+        if self.a_window_specific.shape != (len(compass_directions),):
+            raise ValueError(
+                "a_window_specific needs one area per orientation of "
+                f"{list(compass_directions)}"
+            )
+        self.delta_u_thermal_bridging = float(self.delta_u_thermal_bridging)
+        values = np.concatenate(
+            [
+                getattr(self, name)
+                for names in element_classes.values()
+                for name in names
+            ]
+            + [self.a_window_specific]
+        )
+        if np.any(values < 0):
+            raise ValueError(
+                "Areas and coefficients of the envelope must not be negative"
+            )
+
+    @classmethod
+    def from_dicts(
+        cls,
+        a_wall,
+        u_wall,
+        b_wall,
+        a_roof,
+        u_roof,
+        b_roof,
+        a_floor,
+        u_floor,
+        b_floor,
+        a_door,
+        u_door,
+        a_window,
+        u_window,
+        g_gl_n_window,
+        a_window_specific,
+        delta_u_thermal_bridging,
+    ):
+        """Envelope of the dicts used by BuildingParameters and Building"""
+        arrays = {
+            name: _dict_to_array(dictionary, name + "_")
+            for name, dictionary in {
+                "a_wall": a_wall,
+                "u_wall": u_wall,
+                "b_wall": b_wall,
+                "a_roof": a_roof,
+                "u_roof": u_roof,
+                "b_roof": b_roof,
+                "a_floor": a_floor,
+                "u_floor": u_floor,
+                "b_floor": b_floor,
+                "a_door": a_door,
+                "u_door": u_door,
+                "a_window": a_window,
+                "u_window": u_window,
+                "g_gl_n_window": g_gl_n_window,
+            }.items()
+        }
+        return cls(
+            **arrays,
+            a_window_specific=[
+                a_window_specific["a_window_" + str(x)] for x in compass_directions
+            ],
+            # the only value, the key differs between TABULA and expert mode
+            delta_u_thermal_bridging=(
+                next(iter(delta_u_thermal_bridging.values()))
+                if delta_u_thermal_bridging
+                else 0.0
+            ),
+        )
+
+
+envelope_fields = [field.name for field in fields(BuildingEnvelope)]
+
+
 @dataclass
 class BuildingParameters:
     floor_area: float
@@ -78,14 +240,29 @@ class BuildingParameters:
     delta_u_thermal_bridging: dict = field(default_factory=dict)
     u_window: dict = field(default_factory=dict)
     g_gl_n_window: dict = field(default_factory=dict)
+    envelope: BuildingEnvelope = None
 
     def __post_init__(self):
+        if self.envelope is not None:
+            if any(getattr(self, name) for name in envelope_fields):
+                raise ValueError(
+                    "Define the envelope either as BuildingEnvelope or as dicts"
+                )
+            return
         for field in fields(self):
             if field.name.startswith(("a_", "u_", "b_")) and isinstance(
                 getattr(self, field.name), dict
             ):
                 self.validate_dict_keys(getattr(self, field.name), field.name)
 
+    def get_envelope(self):
+        """The envelope, built from the dicts if no BuildingEnvelope is given"""
+        if self.envelope is not None:
+            return self.envelope
+        return BuildingEnvelope.from_dicts(
+            **{name: getattr(self, name) for name in envelope_fields}
+        )
+
     def validate_dict_keys(self, dictionary, field_name):
         required_prefix = field_name + "_"
 
@@ -116,6 +293,15 @@ class BuildingParameters:
                         f"The numeric part of the key in {field_name} must be an integer"
                     )
 
+# DIN 13790: 12.3.1.2
+class_building_parameters = {
+    "very light": {"a_m_var": 2.5, "c_m_var": 80000},
+    "light": {"a_m_var": 2.5, "c_m_var": 110000},
+    "average": {"a_m_var": 2.5, "c_m_var": 165000},
+    "heavy": {"a_m_var": 3.0, "c_m_var": 260000},
+    "very heavy": {"a_m_var": 3.0, "c_m_var": 370000},
+}
+
 
 class Building:
     def __init__(
@@ -129,6 +315,8 @@ class Building:
         construction_year: int = None,
         floor_area: float = None,
         building_parameters: BuildingParameters = None,
+        tabula_catalog: TabulaCatalog = None,
+        config_cache: BuildingConfigCache = None,
     ):
         if building_parameters is not None:
             print(
@@ -136,18 +324,9 @@ class Building:
             )
             self.tabula_building_code = tabula_building_code
         else:
-            main_path = get_project_root()
-            self.tabula_df = pd.DataFrame(
-                pd.read_csv(
-                    os.path.join(
-                        main_path,
-                        "thermal_building_model",
-                        "tabula",
-                        "tabula_data_sorted.csv",
-                    ),
-                    low_memory=False,
-                )
-            )
+            if tabula_catalog is None:
+                tabula_catalog = get_tabula_catalog()
+            self.tabula_catalog = tabula_catalog
             if tabula_building_code is not None:
                 print(
                     "You entered the Expert mode, by using a specific building"
@@ -172,16 +351,15 @@ class Building:
             self.floor_area = floor_area
         else:
             self.floor_area = None
-        # DIN 13790: 12.3.1.2
-        self.list_class_buildig = {
-            "very light": {"a_m_var": 2.5, "c_m_var": 80000},
-            "light": {"a_m_var": 2.5, "c_m_var": 110000},
-            "average": {"a_m_var": 2.5, "c_m_var": 165000},
-            "heavy": {"a_m_var": 3.0, "c_m_var": 260000},
-            "very heavy": {"a_m_var": 3.0, "c_m_var": 370000},
-        }
+        self.list_class_buildig = class_building_parameters
+        self.config_cache = config_cache
         self.building_config = {}
 
+    @property
+    def tabula_df(self):
+        """The TABULA table shared between all buildings, must not be modified"""
+        return self.tabula_catalog.data
+
     def define_tabula_building_code(
         self,
         country: str,
@@ -189,46 +367,20 @@ class Building:
         building_type: str,
         refurbishment_status: str,
     ):
-        self.tabula_df = self.tabula_df[
-            (self.tabula_df["Code_Country"] == country)
-            & (self.tabula_df["Code_BuildingSizeClass"] == building_type)
-            & (self.tabula_df["Code_DataType_Building"] == "ReEx")
-            & (
-                pd.to_numeric(self.tabula_df["Year1_Building"], errors="coerce").fillna(
-                    0
-                )
-                <= construction_year
-            )
-            & (
-                pd.to_numeric(self.tabula_df["Year2_Building"], errors="coerce").fillna(
-                    0
-                )
-                >= construction_year
-            )
-        ]
-        if refurbishment_status in {
-            "no_refurbishment",
-            "usual_refurbishment",
-            "advanced_refurbishment",
-        }:
-            variant_mapping = {
-                "no_refurbishment": 1,
-                "usual_refurbishment": 2,
-                "advanced_refurbishment": 3,
-            }
-            self.tabula_df = self.tabula_df[
-                self.tabula_df["Number_BuildingVariant"]
-                == variant_mapping[refurbishment_status]
-            ]
-
-        assert len(self.tabula_df) <= 1, (
-            "More than one building is founded for "
-            "the input parameters. Please write an "
-            "issue in Github"
+        return self.tabula_catalog.find_building_code(
+            country=country,
+            construction_year=construction_year,
+            building_type=building_type,
+            refurbishment_status=refurbishment_status,
         )
-        return self.tabula_df["Code_BuildingVariant"]
 
     def calculate_all_parameters(self):
+        if self.config_cache is not None:
+            key = self.config_cache.make_key(self)
+            parameters = self.config_cache.get(key)
+            if parameters is not None:
+                self.__dict__.update(parameters)
+                return
         if self.building_parameters is not None:
             self.initialize_from_building_parameters()
         else:
@@ -243,6 +395,8 @@ class Building:
         self.c_m: float = self.calc_c_m()
         # self.solar_gains : list  = self.calc_solar_gaings_through_windows()
         self.building_config = self.build_building_config()
+        if self.config_cache is not None:
+            self.config_cache.set(key, self)
 
     def build_building_config(self):
         building_config = BuildingConfig5RC(
@@ -264,11 +418,10 @@ class Building:
         for field in fields(BuildingParameters):
             setattr(self, field.name, getattr(
                 self.building_parameters, field.name))
+        self.envelope = self.building_parameters.get_envelope()
 
     def get_building_parameters_from_csv(self):
-        row = self.tabula_df.loc[
-            self.tabula_df["Code_BuildingVariant"] == self.tabula_building_code
-        ]
+        row = self.tabula_catalog.get_building(self.tabula_building_code)
 
         list_type = ["", "Measure_", "Actual_"]
         t_b = list_type[1]
@@ -352,8 +505,8 @@ class Building:
             key: value * self.floor_area_ratio
             for key, value in self.a_window_specific.items()
         }
-        self.delta_u_thermal_bridiging = {
-            "delta_u_thermal_bridiging": float(row["delta_U_ThermalBridging"].values[0])
+        self.delta_u_thermal_bridging = {
+            "delta_u_thermal_bridging": float(row["delta_U_ThermalBridging"].values[0])
         }
         self.u_window = {
             "u_window_1": float(row["U_" + str(t_b) + "Window_1"].values[0]),
@@ -363,6 +516,9 @@ class Building:
             "g_gl_n_window_1": float(row["g_gl_n_Window_1"].values[0]),
             "g_gl_n_window_2": float(row["g_gl_n_Window_2"].values[0]),
         }
+        self.envelope = BuildingEnvelope.from_dicts(
+            **{name: getattr(self, name) for name in envelope_fields}
+        )
 
         self.heat_transfer_coefficient_ventilation = float(
             row["h_Ventilation"].values[0]
@@ -436,61 +592,32 @@ class Building:
         return total_internal_area
 
     def calc_h_tr_em(self):
-        h_tr_em = 0
-        a_external = 0
-        for x in range(1, len(self.a_wall) + 1):
-            h_tr_em = (
-                h_tr_em
-                + self.a_wall["a_wall_" + str(x)]
-                * self.u_wall["u_wall_" + str(x)]
-                * self.b_wall["b_wall_" + str(x)]
-            )
-            a_external = a_external + self.a_wall["a_wall_" + str(x)]
-
-        for x in range(1, len(self.a_roof) + 1):
-            h_tr_em = (
-                h_tr_em
-                + self.a_roof["a_roof_" + str(x)]
-                * self.u_roof["u_roof_" + str(x)]
-                * self.b_roof["b_roof_" + str(x)]
-            )
-            a_external = a_external + self.a_roof["a_roof_" + str(x)]
-
-        for x in range(1, len(self.a_floor) + 1):
-            h_tr_em = (
-                h_tr_em
-                + self.a_floor["a_floor_" + str(x)]
-                * self.u_floor["u_floor_" + str(x)]
-                * self.b_floor["b_floor_" + str(x)]
-            )
-            a_external = a_external + self.a_floor["a_floor_" + str(x)]
-
-        for x in range(1, len(self.a_door) + 1):
-            h_tr_em = (
-                h_tr_em
-                + self.a_door["a_door_" +
-                              str(x)] * self.u_door["u_door_" + str(x)]
-            )
-            a_external = a_external + self.a_door["a_door_" + str(x)]
+        envelope = self.envelope
+        a_opaque = np.concatenate(
+            [envelope.a_wall, envelope.a_roof, envelope.a_floor, envelope.a_door]
+        )
+        h_opaque = np.concatenate(
+            [
+                envelope.a_wall * envelope.u_wall * envelope.b_wall,
+                envelope.a_roof * envelope.u_roof * envelope.b_roof,
+                envelope.a_floor * envelope.u_floor * envelope.b_floor,
+                envelope.a_door * envelope.u_door,
+            ]
+        )
+        a_external = _sequential_sum(a_opaque)
         h_tr_em = (
-            h_tr_em
-            + self.delta_u_thermal_bridiging["delta_u_thermal_bridiging"] * a_external
+            _sequential_sum(h_opaque)
+            + envelope.delta_u_thermal_bridging * a_external
         )
         return h_tr_em  # [W/K]
 
     def calc_h_tr_w(self):
-        h_tr_w = 0
+        envelope = self.envelope
+        # the thermal bridges of the windows are not taken into account
         a_window = 0
-        for x in range(1, len(self.a_window) + 1):
-            h_tr_w = (
-                h_tr_w
-                + self.a_window["a_window_" + str(x)]
-                * self.u_window["u_window_" + str(x)]
-            )
-            a_window = a_window * self.a_window["a_window_" + str(x)]
         h_tr_w = (
-            h_tr_w
-            + self.delta_u_thermal_bridiging["delta_u_thermal_bridiging"] * a_window
+            _sequential_sum(envelope.a_window * envelope.u_window)
+            + envelope.delta_u_thermal_bridging * a_window
         )
         return h_tr_w  # [W/K]
 
@@ -529,34 +656,21 @@ class Building:
             self.list_class_buildig[self.class_building]["c_m_var"]
         return c_m
 
-    def calc_solar_gaings_through_windows(self, object_location_of_building):
-        a_window_total = 0
-        g_gl_n_window_avg = 0
-        for x in range(1, len(self.u_window) + 1):
-            a_window_total = a_window_total + \
-                self.a_window["a_window_" + str(x)]
-
-        for x in range(1, len(self.g_gl_n_window) + 1):
-            g_gl_n_window_avg = (
-                g_gl_n_window_avg
-                + (
-                    self.g_gl_n_window["g_gl_n_window_" + str(x)]
-                    * self.a_window["a_window_" + str(x)]
-                )
-                / a_window_total
-            )
+    def calc_g_gl_n_window_avg(self):
+        envelope = self.envelope
+        a_window_total = _sequential_sum(envelope.a_window)
+        g_gl_n_window_avg = _sequential_sum(
+            (envelope.g_gl_n_window * envelope.a_window) / a_window_total
+        )
+        return g_gl_n_window_avg
 
-        compass_directions = {
-            "north": {"azimuth_tilt": 270, "alititude_tilt": 90},
-            "east": {"azimuth_tilt": 90, "alititude_tilt": 90},
-            "south": {"azimuth_tilt": 180, "alititude_tilt": 90},
-            "west": {"azimuth_tilt": 0, "alititude_tilt": 90},
-            "horizontal": {"azimuth_tilt": 0, "alititude_tilt": 0},
-        }
+    def calc_solar_gaings_through_windows(self, object_location_of_building):
+        g_gl_n_window_avg = self.calc_g_gl_n_window_avg()
+        window_areas = self.get_window_areas_by_orientation()
         list_solar_gains = []
         for hour in range(self.number_of_time_steps):
             sum_solar_gains = 0
-            for x in compass_directions:
+            for position, x in enumerate(compass_directions):
                 (
                     altitude,
                     azimuth,
@@ -573,7 +687,7 @@ class Building:
                     alititude_tilt=alititude_tilt,
                     glass_solar_transmittance=g_gl_n_window_avg,
                     glass_light_transmittance=0.8,
-                    area=self.a_window_specific["a_window_" + str(x)],
+                    area=window_areas[position],
                 )
 
                 window_var.calc_solar_gains(
@@ -591,3 +705,113 @@ class Building:
                 sum_solar_gains = window_var.solar_gains + sum_solar_gains
             list_solar_gains.append(sum_solar_gains)
         return list_solar_gains
+
+    def calc_solar_gains_array(
+        self,
+        object_location_of_building,
+        latitude_deg: float = None,
+        longitude_deg: float = None,
+        year: int = 2015,
+        cache: OrientationIrradianceCache = irradiance_cache,
+    ):
+        """
+        Batched version of calc_solar_gaings_through_windows. The direct and
+        diffuse factors of all orientations are calculated as one
+        (orientations x timesteps) matrix and weighted with the window areas.
+        The unit-area irradiance is taken from the cache, if given.
+        latitude_deg and longitude_deg default to the coordinates of the
+        weather file of the location.
+        Returns the summed solar gains in W as np.ndarray.
+        """
+        latitude_deg, longitude_deg = _get_coordinates(
+            object_location_of_building, latitude_deg, longitude_deg
+        )
+        if cache is None:
+            irradiance = calc_orientation_irradiance(
+                object_location=object_location_of_building,
+                latitude_deg=latitude_deg,
+                longitude_deg=longitude_deg,
+                year=year,
+                number_of_time_steps=self.number_of_time_steps,
+            )
+        else:
+            irradiance = cache.get_irradiance(
+                object_location=object_location_of_building,
+                latitude_deg=latitude_deg,
+                longitude_deg=longitude_deg,
+                year=year,
+                number_of_time_steps=self.number_of_time_steps,
+            )
+        return self.calc_g_gl_n_window_avg() * (
+            self.get_window_areas_by_orientation() @ irradiance
+        )
+
+    def get_window_areas_by_orientation(self):
+        """Window areas in m2 in the order of compass_directions"""
+        return self.envelope.a_window_specific
+
+
+def _get_coordinates(object_location, latitude_deg, longitude_deg):
+    """Coordinates of the location, if latitude_deg or longitude_deg is None"""
+    if latitude_deg is None:
+        latitude_deg = getattr(object_location, "latitude_deg", None)
+    if longitude_deg is None:
+        longitude_deg = getattr(object_location, "longitude_deg", None)
+    if latitude_deg is None or longitude_deg is None:
+        raise ValueError(
+            "The location has no coordinates, pass latitude_deg and "
+            "longitude_deg."
+        )
+    return latitude_deg, longitude_deg
+
+
+def calc_solar_gains_of_buildings(
+    buildings,
+    object_location_of_building,
+    latitude_deg: float = None,
+    longitude_deg: float = None,
+    year: int = 2015,
+    cache: OrientationIrradianceCache = irradiance_cache,
+):
+    """
+    Calculates the solar gains of many buildings at the same location with
+    one matrix product, see calc_solar_gains_fleet. All buildings need the
+    same number_of_time_steps. latitude_deg and longitude_deg default to the
+    coordinates of the weather file of the location. Returns the solar gains
+    in W as np.ndarray (buildings x timesteps).
+    """
+    latitude_deg, longitude_deg = _get_coordinates(
+        object_location_of_building, latitude_deg, longitude_deg
+    )
+    number_of_time_steps = {building.number_of_time_steps for building in buildings}
+    if len(number_of_time_steps) != 1:
+        raise ValueError(
+            "All buildings need the same number_of_time_steps, got "
+            "{0}.".format(sorted(number_of_time_steps))
+        )
+    number_of_time_steps = number_of_time_steps.pop()
+    if cache is None:
+        irradiance = calc_orientation_irradiance(
+            object_location=object_location_of_building,
+            latitude_deg=latitude_deg,
+            longitude_deg=longitude_deg,
+            year=year,
+            number_of_time_steps=number_of_time_steps,
+        )
+    else:
+        irradiance = cache.get_irradiance(
+            object_location=object_location_of_building,
+            latitude_deg=latitude_deg,
+            longitude_deg=longitude_deg,
+            year=year,
+            number_of_time_steps=number_of_time_steps,
+        )
+    return calc_solar_gains_fleet(
+        window_areas=[
+            building.get_window_areas_by_orientation() for building in buildings
+        ],
+        g_gl_n_window_avg=[
+            building.calc_g_gl_n_window_avg() for building in buildings
+        ],
+        irradiance=irradiance,
+    )
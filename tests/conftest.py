@@ -0,0 +1,114 @@
+"""Fixtures and helpers shared by the test modules"""
+import numpy as np
+import pandas as pd
+import pytest
+from pyomo.environ import Block
+
+from oemof.thermal_building_model.tabula.tabula_catalog import tabula_columns
+from oemof.thermal_building_model.tabula.tabula_reader import BuildingConfig5RC
+from oemof.thermal_building_model.tabula.tabula_reader import BuildingParameters
+
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true", help="run the benchmarks")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: timing benchmark, only run with --benchmark"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Files cached by the tests are written to a temporary directory"""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("OEMOF_THERMAL_BUILDING_MODEL_CACHE", str(cache_dir))
+    return cache_dir
+
+
+def create_building_config():
+    return BuildingConfig5RC(
+        total_internal_area=900.0,
+        h_ve=80.0,
+        h_tr_w=60.0,
+        h_tr_em=166.7,
+        h_tr_is=3105.0,
+        mass_area=500.0,
+        h_tr_ms=4550.0,
+        c_m=33000000.0,
+        floor_area=200.0,
+        heat_transfer_coefficient_ventilation=0.5,
+        total_air_change_rate=0.6,
+    )
+
+
+def get_building_block(model, block_type):
+    for block in model.component_objects(Block):
+        if isinstance(block, block_type):
+            return block
+
+
+def create_tabula_data(number_of_buildings=6, seed=1):
+    random = np.random.default_rng(seed)
+    data = pd.DataFrame(
+        {
+            column: random.uniform(0.1, 2.0, number_of_buildings)
+            for column in tabula_columns
+        }
+    )
+    for column in data.columns:
+        if column.startswith("A_"):
+            data[column] = random.uniform(5, 150, number_of_buildings)
+    data["A_C_Ref"] = random.uniform(80, 400, number_of_buildings)
+    data["Code_BuildingVariant"] = [
+        "DE.N.SFH.{0:02d}.Gen.ReEx.001.001".format(x)
+        for x in range(number_of_buildings)
+    ]
+    data["Code_Country"] = "DE"
+    data["Code_BuildingSizeClass"] = "SFH"
+    data["Code_DataType_Building"] = "ReEx"
+    data["Number_BuildingVariant"] = 1
+    data["Year1_Building"] = [str(1900 + 10 * x) for x in range(number_of_buildings)]
+    data["Year2_Building"] = [str(1909 + 10 * x) for x in range(number_of_buildings)]
+    return data
+
+
+def create_building_parameters():
+    return BuildingParameters(
+        floor_area=150,
+        heat_transfer_coefficient_ventilation=0.5,
+        total_air_change_rate=0.6,
+        room_height=2.5,
+        a_roof={"a_roof_1": 90.0, "a_roof_2": 0.0},
+        u_roof={"u_roof_1": 0.3, "u_roof_2": 0.0},
+        b_roof={"b_roof_1": 1.0, "b_roof_2": 1.0},
+        a_floor={"a_floor_1": 80.0, "a_floor_2": 0.0},
+        u_floor={"u_floor_1": 0.4, "u_floor_2": 0.0},
+        b_floor={"b_floor_1": 0.5, "b_floor_2": 0.5},
+        a_wall={"a_wall_1": 140.0, "a_wall_2": 10.0, "a_wall_3": 0.0},
+        u_wall={"u_wall_1": 0.5, "u_wall_2": 1.0, "u_wall_3": 0.0},
+        b_wall={"b_wall_1": 1.0, "b_wall_2": 1.0, "b_wall_3": 1.0},
+        a_door={"a_door_1": 2.0},
+        u_door={"u_door_1": 3.0},
+        a_window={"a_window_1": 25.0, "a_window_2": 5.0},
+        a_window_specific={
+            "a_window_horizontal": 0.0,
+            "a_window_east": 6.0,
+            "a_window_south": 12.0,
+            "a_window_west": 6.0,
+            "a_window_north": 6.0,
+        },
+        delta_u_thermal_bridging={"delta_u_thermal_bridging": 0.05},
+        u_window={"u_window_1": 1.3, "u_window_2": 2.8},
+        g_gl_n_window={"g_gl_n_window_1": 0.6, "g_gl_n_window_2": 0.75},
+    )
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from conftest import create_building_config
+
+from oemof.thermal_building_model.helpers.building_aggregation import (
+    aggregate_buildings,
+    calc_aggregation_error,
+    calc_time_constants,
+    cluster_buildings,
+    simulate_heat_demand,
+)
+from oemof.thermal_building_model.tabula.tabula_batch import BuildingConfigBatch
+
+
+def create_fleet():
+    """Scaled copies of a light and a heavy building"""
+    building_configs = []
+    for c_m_factor in [0.5, 3.0]:
+        for scale in [0.5, 1.0, 2.0]:
+            building_config = create_building_config()
+            building_config.c_m = building_config.c_m * c_m_factor
+            for name in [
+                "total_internal_area",
+                "h_ve",
+                "h_tr_w",
+                "h_tr_em",
+                "h_tr_is",
+                "mass_area",
+                "h_tr_ms",
+                "c_m",
+                "floor_area",
+            ]:
+                setattr(building_config, name, getattr(building_config, name) * scale)
+            building_configs.append(building_config)
+    return BuildingConfigBatch.from_building_configs(building_configs)
+
+
+def create_profiles(building_configs, number_of_time_steps=96):
+    hours = np.arange(number_of_time_steps)
+    t_outside = 8 * np.sin(hours / 24 * 2 * np.pi)
+    # gains proportional to the floor area
+    solar_gains = np.outer(
+        building_configs.floor_area,
+        np.clip(20 * np.sin(hours / 24 * 2 * np.pi), 0, None),
+    )
+    internal_gains = np.outer(building_configs.floor_area, np.full(number_of_time_steps, 3.0))
+    return t_outside, solar_gains, internal_gains
+
+
+def test_cluster_buildings_by_time_constant():
+    building_configs = create_fleet()
+    time_constants = calc_time_constants(building_configs)
+    assert time_constants[0] == pytest.approx(time_constants[2])
+    assert time_constants[3] > time_constants[0]
+    labels = cluster_buildings(building_configs, 2)
+    assert list(labels) == [0, 0, 0, 1, 1, 1]
+    assert list(cluster_buildings(building_configs, 1)) == [0] * 6
+    # only two different time constants
+    assert labels.max() == cluster_buildings(building_configs, 5).max()
+
+
+def test_aggregate_buildings():
+    building_configs = create_fleet()
+    t_outside, solar_gains, internal_gains = create_profiles(building_configs)
+    labels = cluster_buildings(building_configs, 2)
+    aggregated = aggregate_buildings(
+        building_configs, t_outside, solar_gains, internal_gains, labels
+    )
+    assert len(aggregated.configs) == 2
+    assert aggregated.configs.c_m[1] == pytest.approx(
+        building_configs.c_m[3:].sum()
+    )
+    assert aggregated.configs.total_air_change_rate[0] == pytest.approx(0.6)
+    np.testing.assert_allclose(aggregated.t_outside[0], t_outside)
+    np.testing.assert_allclose(
+        aggregated.solar_gains[1], solar_gains[3:].sum(axis=0)
+    )
+
+    # scaled copies of a building are aggregated without error
+    error = calc_aggregation_error(
+        building_configs, t_outside, solar_gains, internal_gains, aggregated
+    )
+    assert list(error["number_of_buildings"]) == [3, 3]
+    assert (error["heat_demand"] > 0).all()
+    np.testing.assert_allclose(error["energy_error"], 0, atol=1e-9)
+    np.testing.assert_allclose(error["peak_error"], 0, atol=1e-9)
+
+    # one cluster for different buildings has an error
+    aggregated = aggregate_buildings(
+        building_configs, t_outside, solar_gains, internal_gains, np.zeros(6, int)
+    )
+    error = calc_aggregation_error(
+        building_configs, t_outside, solar_gains, internal_gains, aggregated
+    )
+    assert abs(error["energy_error"][0]) > 1e-6
+
+
+def test_simulate_heat_demand():
+    building_configs = create_fleet()
+    t_outside, solar_gains, internal_gains = create_profiles(building_configs)
+    heat_demand, t_air = simulate_heat_demand(
+        building_configs, t_outside, solar_gains, internal_gains, t_set_heating=20
+    )
+    assert heat_demand.shape == (6, 96)
+    assert (heat_demand >= 0).all()
+    assert (t_air >= 20 - 1e-9).all()
+    # the air temperature is held at the set point while heating
+    np.testing.assert_allclose(t_air[heat_demand > 0], 20)
@@ -0,0 +1,109 @@
+from dataclasses import asdict
+from dataclasses import fields
+
+import numpy as np
+from conftest import create_building_parameters
+from conftest import create_tabula_data
+
+from oemof.thermal_building_model.tabula.building_config_cache import (
+    BuildingConfigCache,
+)
+from oemof.thermal_building_model.tabula.tabula_catalog import TabulaCatalog
+from oemof.thermal_building_model.tabula.tabula_reader import Building
+
+
+def test_tabula_building_from_cache(tmp_path, monkeypatch):
+    catalog = TabulaCatalog(data=create_tabula_data())
+    code = catalog.data["Code_BuildingVariant"].iloc[2]
+    building = Building(
+        tabula_building_code=code,
+        tabula_catalog=catalog,
+        class_building="heavy",
+        number_of_time_steps=1,
+        config_cache=BuildingConfigCache(cache_dir=tmp_path),
+    )
+    building.calculate_all_parameters()
+    assert [file.suffix for file in tmp_path.iterdir()] == [".json"]
+
+    def get_building(tabula_building_code):
+        raise AssertionError("The TABULA data should not be read again")
+
+    monkeypatch.setattr(catalog, "get_building", get_building)
+    cached_building = Building(
+        tabula_building_code=code,
+        tabula_catalog=catalog,
+        class_building="heavy",
+        number_of_time_steps=1,
+        # new cache, the parameters are read from disk
+        config_cache=BuildingConfigCache(cache_dir=tmp_path),
+    )
+    cached_building.calculate_all_parameters()
+    assert asdict(cached_building.building_config) == asdict(building.building_config)
+    assert cached_building.q_heating_demand_annual == building.q_heating_demand_annual
+    assert np.array_equal(
+        cached_building.get_window_areas_by_orientation(),
+        building.get_window_areas_by_orientation(),
+    )
+    for field in fields(building.envelope):
+        assert np.array_equal(
+            getattr(cached_building.envelope, field.name),
+            getattr(building.envelope, field.name),
+        )
+
+
+def test_invalid_cache_file_is_ignored(tmp_path):
+    building_parameters = create_building_parameters()
+    config_cache = BuildingConfigCache(cache_dir=tmp_path)
+    building = Building(
+        number_of_time_steps=1,
+        building_parameters=building_parameters,
+        config_cache=config_cache,
+    )
+    key = config_cache.make_key(building)
+    with open(config_cache._file_path(key), "w") as file:
+        file.write('{"__dataclass__": "Building", "fields": {}}')
+    assert BuildingConfigCache(cache_dir=tmp_path).get(key) is None
+    building.calculate_all_parameters()
+    assert BuildingConfigCache(cache_dir=tmp_path).get(key)["c_m"] == building.c_m
+
+
+def test_building_parameters_in_cache_key():
+    config_cache = BuildingConfigCache(cache_dir=False)
+    buildings = []
+    for floor_area in [150, 150, 200]:
+        building_parameters = create_building_parameters()
+        building_parameters.floor_area = floor_area
+        building = Building(
+            number_of_time_steps=1,
+            building_parameters=building_parameters,
+            config_cache=config_cache,
+        )
+        building.calculate_all_parameters()
+        buildings.append(building)
+    assert len(config_cache._parameters) == 2
+    assert buildings[0].building_config == buildings[1].building_config
+    assert buildings[2].c_m == 200 * 165000
+    # the cached values are copies
+    buildings[1].a_wall["a_wall_1"] = 0
+    assert buildings[0].a_wall["a_wall_1"] == 140.0
+
+
+def test_cache_is_in_memory_by_default(cache_dir):
+    catalog = TabulaCatalog(data=create_tabula_data())
+    code = catalog.data["Code_BuildingVariant"].iloc[1]
+    config_cache = BuildingConfigCache()
+    keys = []
+    for floor_area in [100, 100.0]:
+        building = Building(
+            tabula_building_code=code,
+            tabula_catalog=catalog,
+            floor_area=floor_area,
+            number_of_time_steps=1,
+            config_cache=config_cache,
+        )
+        building.calculate_all_parameters()
+        keys.append(config_cache.make_key(building))
+    # integer and float floor areas are the same building
+    assert keys[0] == keys[1]
+    assert len(config_cache._parameters) == 1
+    assert not cache_dir.exists()
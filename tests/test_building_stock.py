@@ -0,0 +1,40 @@
+import numpy as np
+from conftest import create_tabula_data
+
+from oemof.thermal_building_model.helpers.weather_registry import weather_registry
+from oemof.thermal_building_model.tabula.building_stock import BuildingStockSampler
+from oemof.thermal_building_model.tabula.tabula_catalog import TabulaCatalog
+
+
+def test_building_stock_sampler():
+    catalog = TabulaCatalog(data=create_tabula_data())
+    sampler = BuildingStockSampler(
+        building_types=["SFH"],
+        construction_years=(1900, 1959),
+        refurbishment_shares={"no_refurbishment": 1},
+        floor_area_scale=(0.8, 1.2),
+        tabula_catalog=catalog,
+        seed=3,
+    )
+    chunks = list(sampler.sample(number_of_buildings=250, chunk_size=100))
+    assert [len(chunk.configs) for chunk in chunks] == [100, 100, 50]
+
+    for chunk in chunks:
+        buildings = chunk.buildings
+        assert list(chunk.configs.labels) == list(buildings["Code_BuildingVariant"])
+        np.testing.assert_array_equal(chunk.configs.floor_area, buildings["floor_area"])
+        reference = catalog.get_buildings(buildings["Code_BuildingVariant"])
+        ratio = buildings["floor_area"].to_numpy() / reference["A_C_Ref"].to_numpy()
+        assert np.all((ratio >= 0.8) & (ratio <= 1.2))
+        decade = (buildings["construction_year"].to_numpy() - 1900) // 10
+        assert list(buildings["Code_BuildingVariant"].str[9:11].astype(int)) == list(
+            decade
+        )
+        assert set(buildings["weather_station"]) <= set(weather_registry.stations.index)
+
+
+def test_empty_catalog_is_not_replaced():
+    catalog = TabulaCatalog(data=create_tabula_data().iloc[:0])
+    assert len(catalog) == 0
+    sampler = BuildingStockSampler(tabula_catalog=catalog)
+    assert sampler.tabula_catalog is catalog
@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from oemof.thermal_building_model.helpers.path_helper import get_project_root
+from oemof.thermal_building_model.helpers.calculate_gain_by_sun import (
+    Location,
+    Window,
+    calc_orientation_factors,
+    calc_orientation_irradiance,
+    calc_sun_position_array,
+    compass_directions,
+)
+
+weather_file = os.path.join(
+    get_project_root(),
+    "thermal_building_model",
+    "input",
+    "weather_files",
+    "12_BW_Mannheim_TRY2035.csv",
+)
+
+
+def test_sun_position_array_equals_scalar():
+    location = Location(epwfile_path=weather_file)
+    hoy = np.arange(8784)
+    for latitude_deg, longitude_deg, year in [
+        (48.16, 46.38, 2015),
+        (52.5, 13.4, 2012),
+    ]:
+        scalar = np.array(
+            [
+                location.calc_sun_position(
+                    latitude_deg=latitude_deg,
+                    longitude_deg=longitude_deg,
+                    year=year,
+                    hoy=int(hour),
+                )
+                for hour in hoy
+            ]
+        )
+        altitude, azimuth = calc_sun_position_array(
+            latitude_deg=latitude_deg,
+            longitude_deg=longitude_deg,
+            year=year,
+            hoy=hoy,
+        )
+        np.testing.assert_allclose(altitude, scalar[:, 0], atol=1e-9)
+        np.testing.assert_allclose(azimuth, scalar[:, 1], atol=1e-9)
+
+        timeindex = pd.date_range(str(year), periods=len(hoy), freq="h")
+        altitude_ti, azimuth_ti = calc_sun_position_array(
+            latitude_deg=latitude_deg,
+            longitude_deg=longitude_deg,
+            timeindex=timeindex,
+        )
+        np.testing.assert_array_equal(altitude_ti, altitude)
+        np.testing.assert_array_equal(azimuth_ti, azimuth)
+
+
+def test_sun_positions_are_shared_per_location():
+    location = Location(epwfile_path=weather_file)
+    first = location.calc_sun_positions(
+        latitude_deg=48.16, longitude_deg=46.38, year=2015, hoy=range(8760)
+    )
+    second = location.calc_sun_positions(
+        latitude_deg=48.16, longitude_deg=46.38, year=2015, hoy=range(8760)
+    )
+    assert first[0] is second[0]
+    assert not first[0].flags.writeable
+
+
+def test_orientation_factors_equal_window():
+    altitude, azimuth = calc_sun_position_array(
+        latitude_deg=48.16, longitude_deg=46.38, year=2015, hoy=np.arange(8760)
+    )
+    direct_factors, diffuse_factors = calc_orientation_factors(
+        sun_altitude=altitude, sun_azimuth=azimuth
+    )
+    assert direct_factors.shape == (5, 8760)
+    for row, direction in enumerate(compass_directions.values()):
+        window = Window(
+            azimuth_tilt=direction["azimuth_tilt"],
+            alititude_tilt=direction["alititude_tilt"],
+        )
+        expected = [
+            window.calc_direct_solar_factor(sun_altitude=alt, sun_azimuth=azi)
+            for alt, azi in zip(altitude, azimuth)
+        ]
+        np.testing.assert_allclose(direct_factors[row], expected, atol=1e-12)
+        assert diffuse_factors[row, 0] == window.calc_diffuse_solar_factor()
+
+
+def test_resampled_location():
+    location = Location(epwfile_path=weather_file)
+    quarter_hourly = location.resample(timestep_hours=0.25)
+    assert quarter_hourly.timestep_hours == 0.25
+    assert len(quarter_hourly.weather_data) == 4 * 8760
+    irradiance = calc_orientation_irradiance(
+        object_location=quarter_hourly,
+        latitude_deg=48.16,
+        longitude_deg=46.38,
+        year=2015,
+        number_of_time_steps=4 * 8760,
+    )
+    hourly_irradiance = calc_orientation_irradiance(
+        object_location=location,
+        latitude_deg=48.16,
+        longitude_deg=46.38,
+        year=2015,
+        number_of_time_steps=8760,
+    )
+    # every fourth timestep has the sun position of the hourly timestep
+    np.testing.assert_allclose(irradiance[:, ::4], hourly_irradiance)
+
+    three_hourly = location.resample(timestep_hours=3)
+    assert len(three_hourly.weather_data) == 8760 / 3
+    np.testing.assert_allclose(
+        three_hourly.weather_data["drybulb_C"].mean(),
+        location.weather_data["drybulb_C"].mean(),
+    )
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+
+from oemof.thermal_building_model.helpers.path_helper import get_project_root
+from oemof.thermal_building_model.helpers.calculate_gain_by_sun import (
+    Location,
+    calc_orientation_irradiance,
+)
+from oemof.thermal_building_model.helpers.irradiance_cache import (
+    OrientationIrradianceCache,
+    irradiance_cache,
+)
+
+weather_file = os.path.join(
+    get_project_root(),
+    "thermal_building_model",
+    "input",
+    "weather_files",
+    "12_BW_Mannheim_TRY2035.csv",
+)
+
+
+def test_irradiance_cache(tmp_path):
+    location = Location(epwfile_path=weather_file)
+    kwargs = dict(
+        latitude_deg=48.16, longitude_deg=46.38, year=2015, number_of_time_steps=8760
+    )
+    expected = calc_orientation_irradiance(object_location=location, **kwargs)
+
+    cache = OrientationIrradianceCache(cache_dir=tmp_path, maxsize=1)
+    irradiance = cache.get_irradiance(object_location=location, **kwargs)
+    np.testing.assert_array_equal(irradiance, expected)
+    assert cache.get_irradiance(object_location=location, **kwargs) is irradiance
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+
+    # a new cache reads the profile from disk
+    other_cache = OrientationIrradianceCache(cache_dir=tmp_path)
+    np.testing.assert_array_equal(
+        other_cache.get_irradiance(object_location=location, **kwargs), expected
+    )
+
+    # least recently used profiles are dropped from memory
+    cache.get_irradiance(
+        object_location=location, **dict(kwargs, number_of_time_steps=24)
+    )
+    assert len(cache._profiles) == 1
+
+    cache.clear(disk=True)
+    assert len(list(tmp_path.glob("*.npz"))) == 0
+
+
+def test_default_irradiance_cache_stays_in_memory():
+    assert irradiance_cache.cache_dir is False
@@ -0,0 +1,320 @@
+import time
+
+import numpy as np
+import pytest
+from conftest import create_building_config
+from conftest import get_building_block
+from oemof import solph
+from pyomo.environ import Block
+from pyomo.environ import Constraint
+from pyomo.environ import Set
+from pyomo.environ import Var
+from pyomo.environ import value
+from pyomo.repn import generate_standard_repn
+
+from oemof.thermal_building_model.m_5RC import GenericBuildingBlock
+from oemof.thermal_building_model.m_5RC import M5RC
+from oemof.thermal_building_model.m_5RC import ReducedGenericBuildingBlock
+from oemof.thermal_building_model.m_5RC import load_reduced_results
+
+
+def test_heat_flows_of_gains():
+    number_of_time_steps = 48
+    solar_gains = list(
+        np.clip(800 * np.sin(np.arange(number_of_time_steps) / 24 * 2 * np.pi), 0, None)
+    )
+    internal_gains = [100.0 + x for x in range(number_of_time_steps)]
+    building = M5RC(
+        label="Building",
+        building_config=create_building_config(),
+        t_outside=[5.0] * number_of_time_steps,
+        solar_gains=solar_gains,
+        internal_gains=internal_gains,
+    )
+    assert building.h_tr_1 == 1.0 / (1.0 / 80.0 + 1.0 / 3105.0)
+    assert building.h_tr_2 == building.h_tr_1 + 60.0
+    assert building.h_tr_3 == 1.0 / (1.0 / building.h_tr_2 + 1.0 / 4550.0)
+    for i in range(number_of_time_steps):
+        gains = 0.5 * internal_gains[i] + solar_gains[i]
+        assert building.phi_ia[i] == 0.5 * internal_gains[i]
+        assert building.phi_st[i] == (
+            1 - (500.0 / 900.0) - (60.0 / (9.1 * 900.0))
+        ) * gains
+        assert building.phi_m[i] == (500.0 / 900.0) * gains
+    c_m_minus, c_m_plus = building.calc_t_m_coefficients(0.25)
+    assert c_m_minus == 33000000.0 / 900 - 0.5 * (building.h_tr_3 + 166.7)
+    assert c_m_plus == 33000000.0 / 900 + 0.5 * (building.h_tr_3 + 166.7)
+
+
+class ReferenceBuildingBlock(GenericBuildingBlock):
+    """GenericBuildingBlock with the former rule callbacks, for comparison"""
+
+    def _create(self, group=None):
+        m = self.parent_block()
+        if group is None:
+            return None
+        i = {n: [i for i in n.inputs][0] for n in group}
+        o = {n: [o for o in n.outputs][0] for n in group}
+        self.BUILDING = Set(initialize=[n for n in group])
+        self.t_air = Var(self.BUILDING, m.TIMEPOINTS)
+        self.t_m_ts = Var(self.BUILDING, m.TIMEPOINTS)
+        for n in group:
+            self.t_air[n, 0].fix(n.t_inital)
+            self.t_m_ts[n, 0].fix(n.t_inital)
+
+        def _storage_balance_rule_tm(block, n, p, t):
+            phi_hc_nd = m.flow[i[n], n, p, t] - m.flow[n, o[n], p, t]
+            phi_m_tot = (
+                n.phi_m[t]
+                + n.h_tr_em * n.t_e[t]
+                + (n.h_tr_3 / n.h_tr_2)
+                * (
+                    n.phi_st[t]
+                    + n.h_tr_w * n.t_e[t]
+                    + n.h_tr_1 * (((n.phi_ia[t] + phi_hc_nd) / n.h_ve) + n.t_e[t])
+                )
+            )
+            c_m_per_timestep = n.c_m / (3600 * m.timeincrement[t])
+            t_m_current_ts = (
+                block.t_m_ts[n, t]
+                * (c_m_per_timestep - 0.5 * (n.h_tr_3 + n.h_tr_em))
+                + phi_m_tot
+            ) / (c_m_per_timestep + 0.5 * (n.h_tr_3 + n.h_tr_em))
+            return block.t_m_ts[n, t + 1] == t_m_current_ts
+
+        self.balance_t_m_current_t_s = Constraint(
+            self.BUILDING, m.TIMEINDEX, rule=_storage_balance_rule_tm
+        )
+
+        def _storage_balance_rule_t_air(block, n, p, t):
+            phi_hc_nd = m.flow[i[n], n, p, t] - m.flow[n, o[n], p, t]
+            t_m = (block.t_m_ts[n, t] + block.t_m_ts[n, t + 1]) / 2
+            t_s = (
+                n.h_tr_ms * t_m
+                + n.phi_st[t]
+                + n.h_tr_w * n.t_e[t]
+                + n.h_tr_1 * (n.t_e[t] + (n.phi_ia[t] + phi_hc_nd) / n.h_ve)
+            ) / (n.h_tr_ms + n.h_tr_w + n.h_tr_1)
+            t_air = (n.h_tr_is * t_s + n.h_ve * n.t_e[t] + n.phi_ia[t] + phi_hc_nd) / (
+                n.h_tr_is + n.h_ve
+            )
+            return block.t_air[n, t + 1] == t_air
+
+        self.balance_t_air = Constraint(
+            self.BUILDING, m.TIMEINDEX, rule=_storage_balance_rule_t_air
+        )
+
+
+def create_energy_system(
+    number_of_time_steps, number_of_buildings, reduced_formulation=False
+):
+    energy_system = solph.EnergySystem(
+        timeindex=solph.create_time_index(2012, number=number_of_time_steps),
+        infer_last_interval=False,
+    )
+    b_heat = solph.buses.Bus(label="b_heat")
+    b_cool = solph.buses.Bus(label="b_cool")
+    energy_system.add(b_heat, b_cool)
+    energy_system.add(
+        solph.components.Source(
+            label="heater", outputs={b_heat: solph.flows.Flow(variable_costs=1)}
+        ),
+        solph.components.Sink(
+            label="cooler", inputs={b_cool: solph.flows.Flow(variable_costs=1)}
+        ),
+    )
+    hours = np.arange(number_of_time_steps)
+    for x in range(number_of_buildings):
+        energy_system.add(
+            M5RC(
+                label="Building_{0}".format(x),
+                inputs={b_heat: solph.flows.Flow()},
+                outputs={b_cool: solph.flows.Flow()},
+                building_config=create_building_config(),
+                t_outside=list(5 + 10 * np.sin(hours / 24 * 2 * np.pi) + x),
+                solar_gains=list(
+                    np.clip(800 * np.sin(hours / 24 * 2 * np.pi), 0, None)
+                ),
+                internal_gains=[100.0] * number_of_time_steps,
+                reduced_formulation=reduced_formulation,
+            )
+        )
+    return energy_system
+
+
+def get_linear_constraints(model):
+    constraints = {}
+    for block in model.component_objects(Block):
+        if not isinstance(block, GenericBuildingBlock):
+            continue
+        for name in ["balance_t_m_current_t_s", "balance_t_air"]:
+            for index, constraint in getattr(block, name).items():
+                repn = generate_standard_repn(constraint.body)
+                key = (name, str(index[0]), index[1:])
+                # the variables of the building block are named after its class
+                names = [
+                    var.name.replace(block.name, "Block")
+                    for var in repn.linear_vars
+                ]
+                constraints[key] = (
+                    dict(zip(names, repn.linear_coefs)),
+                    repn.constant,
+                )
+    return constraints
+
+
+def test_linear_constraints_equal_reference(monkeypatch):
+    """Compares the constraints with the former rules"""
+    number_of_time_steps = 1000
+    number_of_buildings = 5
+    model = solph.Model(create_energy_system(number_of_time_steps, number_of_buildings))
+    constraints = get_linear_constraints(model)
+
+    # the constraint groups are assigned when the nodes are added
+    monkeypatch.setattr(M5RC, "constraint_group", lambda self: ReferenceBuildingBlock)
+    reference_model = solph.Model(
+        create_energy_system(number_of_time_steps, number_of_buildings)
+    )
+    reference_constraints = get_linear_constraints(reference_model)
+
+    assert len(constraints) == 2 * number_of_time_steps * number_of_buildings
+    assert constraints.keys() == reference_constraints.keys()
+    for key, (coefficients, constant) in constraints.items():
+        reference_coefficients, reference_constant = reference_constraints[key]
+        # the reference has the variable on the left side with factor 1
+        scale = coefficients[next(iter(reference_coefficients))]
+        scale = scale / reference_coefficients[next(iter(reference_coefficients))]
+        assert coefficients.keys() == reference_coefficients.keys()
+        for name, value in coefficients.items():
+            assert value == pytest.approx(
+                scale * reference_coefficients[name], rel=1e-9, abs=1e-12
+            )
+        assert constant == pytest.approx(scale * reference_constant, rel=1e-9)
+
+
+def build_building_blocks(monkeypatch, block_type, number_of_time_steps):
+    """Time to build the building blocks of a model with 5 buildings"""
+    build_time = []
+    create = block_type._create
+
+    def timed_create(self, group=None):
+        start = time.perf_counter()
+        create(self, group)
+        build_time.append(time.perf_counter() - start)
+
+    monkeypatch.setattr(block_type, "_create", timed_create)
+    monkeypatch.setattr(M5RC, "constraint_group", lambda self: block_type)
+    solph.Model(create_energy_system(number_of_time_steps, 5))
+    return sum(build_time)
+
+
+@pytest.mark.benchmark
+def test_build_time_benchmark(monkeypatch):
+    """The building blocks are built at least twice as fast as before"""
+    number_of_time_steps = 8760
+    build_time = build_building_blocks(
+        monkeypatch, GenericBuildingBlock, number_of_time_steps
+    )
+    reference_build_time = build_building_blocks(
+        monkeypatch, ReferenceBuildingBlock, number_of_time_steps
+    )
+    print(
+        "building blocks built in {0:.2f} s, with the former rules "
+        "{1:.2f} s".format(build_time, reference_build_time)
+    )
+    assert reference_build_time / build_time > 2
+
+
+def get_used_variables(model):
+    variables = set()
+    for constraint in model.component_data_objects(Constraint, active=True):
+        repn = generate_standard_repn(constraint.body)
+        variables.update(id(var) for var in repn.linear_vars)
+    return variables
+
+
+def test_reduced_formulation_equals_full_formulation():
+    number_of_time_steps = 48
+    number_of_buildings = 3
+    model = solph.Model(create_energy_system(number_of_time_steps, number_of_buildings))
+    reduced_model = solph.Model(
+        create_energy_system(
+            number_of_time_steps, number_of_buildings, reduced_formulation=True
+        )
+    )
+    block = get_building_block(model, GenericBuildingBlock)
+    reduced_block = get_building_block(reduced_model, ReducedGenericBuildingBlock)
+    assert get_building_block(reduced_model, GenericBuildingBlock) is None
+    assert not hasattr(reduced_block, "phi_m_tot")
+
+    # state of the mass temperature for some heat flows
+    random = np.random.default_rng(1)
+    timeincrement = [model.timeincrement[t] for t in model.TIMESTEPS]
+    for n in reduced_block.BUILDING:
+        c = n.calc_linear_coefficients(timeincrement)
+        i = [i for i in n.inputs][0]
+        o = [o for o in n.outputs][0]
+        t_m = n.t_inital
+        for p, t in reduced_model.TIMEINDEX:
+            heat, cool = random.uniform(0, 2000, size=2)
+            reduced_model.flow[i, n, p, t].value = heat
+            reduced_model.flow[n, o, p, t].value = cool
+            t_m = c["t_m_t_m"][t] * t_m + c["t_m_phi"][t] * (heat - cool)
+            t_m += c["t_m_constant"][t]
+            reduced_block.t_m_ts[n, t + 1].value = t_m
+    load_reduced_results(reduced_model)
+
+    # the values of the reduced formulation fulfil the full formulation
+    reduced_nodes = {str(n.label): n for n in reduced_block.BUILDING}
+    for n in block.BUILDING:
+        reduced_node = reduced_nodes[str(n.label)]
+        i = [i for i in n.inputs][0]
+        o = [o for o in n.outputs][0]
+        reduced_i = [i for i in reduced_node.inputs][0]
+        reduced_o = [o for o in reduced_node.outputs][0]
+        for p, t in model.TIMEINDEX:
+            model.flow[i, n, p, t].value = reduced_model.flow[
+                reduced_i, reduced_node, p, t
+            ].value
+            model.flow[n, o, p, t].value = reduced_model.flow[
+                reduced_node, reduced_o, p, t
+            ].value
+        for t in model.TIMEPOINTS:
+            block.t_m_ts[n, t].value = reduced_block.t_m_ts[reduced_node, t].value
+            block.t_air[n, t].value = reduced_block.t_air[reduced_node, t].value
+    for name in ["balance_t_m_current_t_s", "balance_t_air"]:
+        for constraint in getattr(block, name).values():
+            assert value(constraint.body) == pytest.approx(0, abs=1e-9)
+    for index, constraint in reduced_block.comfort_t_air.items():
+        n, p, t = index
+        assert value(constraint.body) == reduced_block.t_air[n, t + 1].value
+        assert constraint.lower == n.t_set_heating
+        assert constraint.upper == n.t_set_cooling
+
+    # t_air is not passed to the solver
+    variables = get_used_variables(model)
+    reduced_variables = get_used_variables(reduced_model)
+    assert len(variables) - len(reduced_variables) == (
+        number_of_buildings * number_of_time_steps
+    )
+    assert not any(
+        id(var) in reduced_variables for var in reduced_block.t_air.values()
+    )
+    # the balances of t_air are replaced by the ranged comfort constraints
+    assert len(list(reduced_model.component_data_objects(Constraint))) == len(
+        list(model.component_data_objects(Constraint))
+    )
+
+
+def test_reduced_results_contain_t_air():
+    highs = pytest.importorskip("pyomo.contrib.appsi.solvers").Highs
+    if not highs().available():
+        pytest.skip("HiGHS is not available")
+    model = solph.Model(create_energy_system(24, 1, reduced_formulation=True))
+    highs().solve(model)
+    load_reduced_results(model)
+    results = solph.processing.results(model)
+    building = get_building_block(model, ReducedGenericBuildingBlock).BUILDING.first()
+    t_air = results[(building, None)]["sequences"]["t_air"]
+    assert len(t_air) == 25
+    assert not t_air.isna().any()
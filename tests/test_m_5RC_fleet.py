@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+from conftest import create_building_config
+from oemof import solph
+from pyomo.environ import value
+
+from oemof.thermal_building_model.m_5RC import M5RC
+from oemof.thermal_building_model.m_5RC_fleet import M5RCFleet
+from oemof.thermal_building_model.m_5RC_fleet import M5RCFleetBlock
+from oemof.thermal_building_model.tabula.tabula_batch import BuildingConfigBatch
+
+
+def create_building_configs(number_of_buildings):
+    building_configs = []
+    for x in range(number_of_buildings):
+        building_config = create_building_config()
+        building_config.c_m = building_config.c_m * (1 + 0.5 * x)
+        building_config.h_tr_em = building_config.h_tr_em * (1 + 0.1 * x)
+        building_configs.append(building_config)
+    return BuildingConfigBatch.from_building_configs(building_configs)
+
+
+def create_profiles(number_of_time_steps, number_of_buildings):
+    hours = np.arange(number_of_time_steps)
+    t_outside = np.array(
+        [
+            5 + 10 * np.sin(hours / 24 * 2 * np.pi) + x
+            for x in range(number_of_buildings)
+        ]
+    )
+    solar_gains = np.clip(800 * np.sin(hours / 24 * 2 * np.pi), 0, None)
+    internal_gains = np.full(number_of_time_steps, 100.0)
+    return t_outside, solar_gains, internal_gains
+
+
+def test_fleet_coefficients_equal_buildings():
+    number_of_time_steps = 48
+    number_of_buildings = 3
+    building_configs = create_building_configs(number_of_buildings)
+    t_outside, solar_gains, internal_gains = create_profiles(
+        number_of_time_steps, number_of_buildings
+    )
+    fleet = M5RCFleet(
+        label="fleet",
+        building_configs=building_configs,
+        t_outside=t_outside,
+        solar_gains=solar_gains,
+        internal_gains=internal_gains,
+    )
+    timeincrement = [0.25] * 24 + [1.0] * 24
+    coefficients = fleet.calc_linear_coefficients(timeincrement)
+    for x, building_config in enumerate(building_configs):
+        building = M5RC(
+            label="Building_{0}".format(x),
+            building_config=building_config,
+            t_outside=list(t_outside[x]),
+            solar_gains=list(solar_gains),
+            internal_gains=list(internal_gains),
+        )
+        for name, values in building.calc_linear_coefficients(
+            timeincrement
+        ).items():
+            np.testing.assert_allclose(
+                np.broadcast_to(coefficients[name], (3, 48))[x],
+                np.broadcast_to(values, (48,)),
+                rtol=1e-12,
+            )
+    # shared profiles are broadcast without copies
+    assert np.shares_memory(fleet.t_e, t_outside)
+
+    with pytest.raises(ValueError):
+        M5RCFleet(
+            label="fleet",
+            building_configs=building_configs,
+            t_outside=t_outside[:2],
+            solar_gains=solar_gains,
+            internal_gains=internal_gains,
+        )
+
+
+def test_fleet_constraints():
+    number_of_time_steps = 24
+    number_of_buildings = 3
+    t_outside, solar_gains, internal_gains = create_profiles(
+        number_of_time_steps, number_of_buildings
+    )
+    energy_system = solph.EnergySystem(
+        timeindex=solph.create_time_index(2012, number=number_of_time_steps),
+        infer_last_interval=False,
+    )
+    b_heat = solph.buses.Bus(label="b_heat")
+    b_cool = solph.buses.Bus(label="b_cool")
+    fleet = M5RCFleet(
+        label="fleet",
+        inputs={b_heat: solph.flows.Flow()},
+        outputs={b_cool: solph.flows.Flow()},
+        building_configs=create_building_configs(number_of_buildings),
+        t_outside=t_outside,
+        solar_gains=solar_gains,
+        internal_gains=internal_gains,
+        t_set_heating=[20, 19, 18],
+        t_inital=[20, 19, 18],
+    )
+    energy_system.add(b_heat, b_cool, fleet)
+    model = solph.Model(energy_system)
+    block = model.M5RCFleetBlock
+    assert isinstance(block, M5RCFleetBlock)
+    assert len(block.balance_t_m_current_t_s) == (
+        number_of_buildings * number_of_time_steps
+    )
+    assert block.t_air[fleet, 1, 0].fixed
+    assert block.t_air[fleet, 1, 0].value == 19
+    assert block.t_air[fleet, 2, 5].lb == 18
+    assert block.t_air[fleet, 2, 5].ub == 40
+
+    # state of the buildings for some heat flows
+    random = np.random.default_rng(1)
+    timeincrement = [model.timeincrement[t] for t in model.TIMESTEPS]
+    coefficients = {
+        name: np.broadcast_to(values, (number_of_buildings, number_of_time_steps))
+        for name, values in fleet.calc_linear_coefficients(timeincrement).items()
+    }
+    heat = random.uniform(0, 2000, size=(number_of_buildings, number_of_time_steps))
+    cool = random.uniform(0, 2000, size=(number_of_buildings, number_of_time_steps))
+    for b in range(number_of_buildings):
+        t_m = fleet.t_inital[b]
+        for p, t in model.TIMEINDEX:
+            block.phi_heat[fleet, b, t].value = heat[b, t]
+            block.phi_cool[fleet, b, t].value = cool[b, t]
+            t_m_next = (
+                coefficients["t_m_t_m"][b, t] * t_m
+                + coefficients["t_m_phi"][b, t] * (heat[b, t] - cool[b, t])
+                + coefficients["t_m_constant"][b, t]
+            )
+            block.t_m_ts[fleet, b, t + 1].value = t_m_next
+            block.t_air[fleet, b, t + 1].value = (
+                coefficients["t_air_t_m"][b, t] * (t_m + t_m_next)
+                + coefficients["t_air_phi"][b, t] * (heat[b, t] - cool[b, t])
+                + coefficients["t_air_constant"][b, t]
+            )
+            t_m = t_m_next
+    for p, t in model.TIMEINDEX:
+        model.flow[b_heat, fleet, p, t].value = heat[:, t].sum()
+        model.flow[fleet, b_cool, p, t].value = cool[:, t].sum()
+    for name in ["balance_t_m_current_t_s", "balance_t_air", "heat_sum", "cool_sum"]:
+        for constraint in getattr(block, name).values():
+            assert value(constraint.body) == pytest.approx(0, abs=1e-8)
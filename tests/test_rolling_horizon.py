@@ -0,0 +1,278 @@
+import numpy as np
+import pytest
+from conftest import create_building_config
+from conftest import get_building_block
+from oemof import solph
+from pyomo.environ import Constraint
+from pyomo.opt import SolverResults
+from pyomo.opt import TerminationCondition
+from pyomo.repn import generate_standard_repn
+
+from oemof.thermal_building_model.helpers.rolling_horizon import RollingHorizon
+from oemof.thermal_building_model.helpers.rolling_horizon import (
+    building_time_series,
+)
+from oemof.thermal_building_model.m_5RC import GenericBuildingBlock
+from oemof.thermal_building_model.m_5RC import M5RC
+from oemof.thermal_building_model.m_5RC import ReducedGenericBuildingBlock
+from oemof.thermal_building_model.m_5RC_fleet import M5RCFleet
+from oemof.thermal_building_model.tabula.tabula_batch import BuildingConfigBatch
+
+
+def create_energy_system(
+    window,
+    number_of_time_steps,
+    start=0,
+    reduced_formulation=False,
+    t_inital=20,
+    t_m_ts="t_inital",
+):
+    """Energy system of one window, the buildings have the whole horizon"""
+    energy_system = solph.EnergySystem(
+        timeindex=solph.create_time_index(2012, number=window),
+        infer_last_interval=False,
+    )
+    b_heat = solph.buses.Bus(label="b_heat")
+    b_cool = solph.buses.Bus(label="b_cool")
+    energy_system.add(
+        b_heat,
+        b_cool,
+        solph.components.Source(
+            label="heater", outputs={b_heat: solph.flows.Flow(variable_costs=1)}
+        ),
+        solph.components.Sink(
+            label="cooler", inputs={b_cool: solph.flows.Flow(variable_costs=1)}
+        ),
+    )
+    hours = np.arange(start, number_of_time_steps)
+    for x in range(2):
+        energy_system.add(
+            M5RC(
+                label="Building_{0}".format(x),
+                inputs={b_heat: solph.flows.Flow()},
+                outputs={b_cool: solph.flows.Flow()},
+                building_config=create_building_config(),
+                t_outside=5 + 10 * np.sin(hours / 24 * 2 * np.pi) - hours / 24 + x,
+                solar_gains=np.clip(800 * np.sin(hours / 24 * 2 * np.pi), 0, None),
+                internal_gains=np.full(len(hours), 100.0),
+                t_set_heating=20,
+                t_set_cooling=24,
+                t_inital=t_inital,
+                t_m_ts=t_m_ts,
+                reduced_formulation=reduced_formulation,
+            )
+        )
+    return energy_system
+
+
+def get_constraints(block):
+    constraints = {}
+    for constraint in block.component_data_objects(Constraint, active=True):
+        repn = generate_standard_repn(constraint.body)
+        coefficients = {
+            var.name: coef for var, coef in zip(repn.linear_vars, repn.linear_coefs)
+        }
+        constraints[constraint.name] = (
+            coefficients,
+            repn.constant,
+            constraint.lower,
+            constraint.upper,
+        )
+    return constraints
+
+
+@pytest.mark.parametrize("reduced_formulation", [False, True])
+def test_update_equals_new_model(reduced_formulation):
+    block_type = (
+        ReducedGenericBuildingBlock if reduced_formulation else GenericBuildingBlock
+    )
+    model = solph.Model(
+        create_energy_system(24, 72, reduced_formulation=reduced_formulation)
+    )
+    block = get_building_block(model, block_type)
+    # second window with other initial temperatures
+    for n in block.BUILDING:
+        for name in building_time_series:
+            setattr(n, name, getattr(n, name)[24:])
+        n.t_inital = 19
+        n.t_m_ts = 21
+    block.update()
+
+    new_model = solph.Model(
+        create_energy_system(
+            24,
+            72,
+            start=24,
+            reduced_formulation=reduced_formulation,
+            t_inital=19,
+            t_m_ts=21,
+        )
+    )
+    new_block = get_building_block(new_model, block_type)
+    for n in new_block.BUILDING:
+        assert new_block.t_air[n, 0].fixed and new_block.t_air[n, 0].value == 19
+        assert new_block.t_m_ts[n, 0].fixed and new_block.t_m_ts[n, 0].value == 21
+    constraints = get_constraints(block)
+    new_constraints = get_constraints(new_block)
+    assert constraints.keys() == new_constraints.keys()
+    for name, (coefficients, constant, lower, upper) in constraints.items():
+        new_coefficients, new_constant, new_lower, new_upper = new_constraints[name]
+        assert coefficients == pytest.approx(new_coefficients)
+        assert constant == pytest.approx(new_constant)
+        assert (lower, upper) == (new_lower, new_upper)
+
+
+def test_t_m_ts_defaults_to_t_inital():
+    model = solph.Model(create_energy_system(24, 24, t_inital=18))
+    block = get_building_block(model, GenericBuildingBlock)
+    for n in block.BUILDING:
+        assert block.t_m_ts[n, 0].fixed and block.t_m_ts[n, 0].value == 18
+
+
+@pytest.mark.parametrize("reduced_formulation", [False, True])
+def test_t_m_ts_none_leaves_initial_mass_temperature_free(reduced_formulation):
+    block_type = (
+        ReducedGenericBuildingBlock if reduced_formulation else GenericBuildingBlock
+    )
+    model = solph.Model(
+        create_energy_system(
+            24, 24, reduced_formulation=reduced_formulation, t_m_ts=None
+        )
+    )
+    block = get_building_block(model, block_type)
+    for n in block.BUILDING:
+        assert not block.t_m_ts[n, 0].fixed
+        n.t_m_ts = 21
+    block.update()
+    for n in block.BUILDING:
+        assert block.t_m_ts[n, 0].fixed and block.t_m_ts[n, 0].value == 21
+        n.t_m_ts = None
+    block.update()
+    for n in block.BUILDING:
+        assert not block.t_m_ts[n, 0].fixed
+
+
+def test_t_m_ts_must_be_number_or_t_inital():
+    with pytest.raises(ValueError):
+        create_energy_system(24, 24, t_m_ts="free")
+
+
+def solve_with_highs(model, solver=None, **kwargs):
+    """Solves with HiGHS and returns the results like model.solve"""
+    from pyomo.contrib.appsi.solvers import Highs
+
+    highs = Highs()
+    highs.config.load_solution = False
+    results = highs.solve(model)
+    solver_results = SolverResults()
+    solver_results.solver.termination_condition = getattr(
+        TerminationCondition, results.termination_condition.name
+    )
+    if solver_results.solver.termination_condition == TerminationCondition.optimal:
+        results.solution_loader.load_vars()
+    return solver_results
+
+
+def test_rolling_horizon(monkeypatch):
+    highs = pytest.importorskip("pyomo.contrib.appsi.solvers").Highs
+    if not highs().available():
+        pytest.skip("HiGHS is not available")
+    monkeypatch.setattr(solph.Model, "solve", solve_with_highs)
+
+    number_of_time_steps = 100
+    model = solph.Model(create_energy_system(48, number_of_time_steps))
+    block = get_building_block(model, GenericBuildingBlock)
+    starts = []
+    rolling_horizon = RollingHorizon(
+        model, commit=24, update=lambda model, start: starts.append(start)
+    )
+    assert rolling_horizon.number_of_time_steps == number_of_time_steps
+    results = rolling_horizon.run()
+    assert starts == [0, 24, 48, 72, 96]
+    assert results.shape == (number_of_time_steps, 6 + 4)
+    assert not results.isna().any().any()
+
+    # the temperatures follow the committed heat flows over all windows
+    for n in block.BUILDING:
+        assert n.t_e.shape == (number_of_time_steps,)
+        assert n.t_inital == 20 and n.t_m_ts == "t_inital"
+        c = n.calc_linear_coefficients(np.ones(number_of_time_steps))
+        c = {
+            name: np.broadcast_to(value, (number_of_time_steps,))
+            for name, value in c.items()
+        }
+        phi_hc_nd = (
+            results[(("b_heat", n.label), "flow")]
+            - results[((n.label, "b_cool"), "flow")]
+        ).to_numpy()
+        t_m = [20.0]
+        for t in range(number_of_time_steps):
+            t_m.append(
+                c["t_m_t_m"][t] * t_m[t]
+                + c["t_m_phi"][t] * phi_hc_nd[t]
+                + c["t_m_constant"][t]
+            )
+        t_m = np.array(t_m)
+        t_air = (
+            c["t_air_t_m"] * (t_m[:-1] + t_m[1:])
+            + c["t_air_phi"] * phi_hc_nd
+            + c["t_air_constant"]
+        )
+        np.testing.assert_allclose(results[((n.label, "None"), "t_m_ts")], t_m[1:])
+        np.testing.assert_allclose(results[((n.label, "None"), "t_air")], t_air)
+        assert (t_air > 20 - 1e-6).all() and (t_air < 24 + 1e-6).all()
+
+
+def test_rolling_horizon_needs_commit_in_window():
+    model = solph.Model(create_energy_system(24, 48))
+    with pytest.raises(ValueError):
+        RollingHorizon(model, commit=48)
+
+
+def test_rolling_horizon_rejects_fleets():
+    energy_system = create_energy_system(24, 48)
+    b_heat = energy_system.groups["b_heat"]
+    b_cool = energy_system.groups["b_cool"]
+    hours = np.arange(48)
+    energy_system.add(
+        M5RCFleet(
+            label="fleet",
+            inputs={b_heat: solph.flows.Flow()},
+            outputs={b_cool: solph.flows.Flow()},
+            building_configs=BuildingConfigBatch.from_building_configs(
+                [create_building_config()]
+            ),
+            t_outside=5 + 10 * np.sin(hours / 24 * 2 * np.pi),
+            solar_gains=np.zeros(48),
+            internal_gains=np.full(48, 100.0),
+        )
+    )
+    with pytest.raises(ValueError):
+        RollingHorizon(solph.Model(energy_system))
+
+
+def test_rolling_horizon_stops_at_infeasible_window(monkeypatch):
+    highs = pytest.importorskip("pyomo.contrib.appsi.solvers").Highs
+    if not highs().available():
+        pytest.skip("HiGHS is not available")
+    monkeypatch.setattr(solph.Model, "solve", solve_with_highs)
+
+    energy_system = create_energy_system(48, 100)
+    heater = energy_system.groups["heater"]
+    b_heat = energy_system.groups["b_heat"]
+    model = solph.Model(energy_system)
+
+    def update(model, start):
+        # no heat in the second window, the buildings get too cold
+        for p, t in model.TIMEINDEX:
+            if start == 24:
+                model.flow[heater, b_heat, p, t].fix(0)
+            else:
+                model.flow[heater, b_heat, p, t].unfix()
+
+    rolling_horizon = RollingHorizon(model, commit=24, update=update)
+    with pytest.raises(RuntimeError, match="starting at timestep 24"):
+        rolling_horizon.run()
+    # the buildings are reset to the start of the horizon
+    for n in rolling_horizon.buildings:
+        assert n.t_inital == 20 and len(n.t_e) == 100
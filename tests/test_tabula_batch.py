@@ -0,0 +1,139 @@
+from dataclasses import asdict
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import create_tabula_data
+
+from oemof.thermal_building_model.m_5RC import M5RC
+from oemof.thermal_building_model.tabula.tabula_batch import (
+    BuildingConfigBatch,
+    calc_building_configs,
+    calc_refurbishment_combinations,
+)
+from oemof.thermal_building_model.tabula.tabula_catalog import TabulaCatalog
+from oemof.thermal_building_model.tabula.tabula_reader import (
+    Building,
+    BuildingConfig5RC,
+)
+
+
+def test_building_configs_equal_building():
+    catalog = TabulaCatalog(data=create_tabula_data())
+    floor_area = np.array([np.nan, 120.0, np.nan, 250.0, 99.0, np.nan])
+    class_building = [
+        "average",
+        "heavy",
+        "light",
+        "very heavy",
+        "very light",
+        "average",
+    ]
+    configs = calc_building_configs(
+        data=catalog.data, floor_area=floor_area, class_building=class_building
+    )
+    for position, code in enumerate(catalog.data["Code_BuildingVariant"]):
+        building = Building(
+            tabula_building_code=code,
+            tabula_catalog=catalog,
+            class_building=class_building[position],
+            floor_area=None if np.isnan(floor_area[position]) else floor_area[position],
+            number_of_time_steps=1,
+        )
+        building.calculate_all_parameters()
+        assert asdict(building.building_config) == configs.loc[code].to_dict()
+
+
+def test_building_configs_of_subset():
+    data = create_tabula_data()
+    configs = calc_building_configs(data=data.iloc[2:4])
+    assert list(configs.index) == list(data["Code_BuildingVariant"].iloc[2:4])
+    assert np.array_equal(configs["floor_area"], data["A_C_Ref"].iloc[2:4])
+    with pytest.raises(ValueError):
+        calc_building_configs(data=data, class_building="medium")
+
+
+def test_building_config_batch():
+    configs = calc_building_configs(data=create_tabula_data())
+    batch = BuildingConfigBatch.from_frame(configs)
+    assert len(batch) == len(configs)
+    assert batch.c_m.flags.c_contiguous
+    view = batch[1]
+    assert not hasattr(view, "__dict__")
+    assert view.h_tr_em == configs["h_tr_em"].iloc[1]
+    assert view.to_building_config() == BuildingConfig5RC(**configs.iloc[1])
+    assert batch.get(configs.index[3]).c_m == configs["c_m"].iloc[3]
+    subset = batch[2:4]
+    assert list(subset.labels) == list(configs.index[2:4])
+    pd.testing.assert_frame_equal(
+        subset.to_frame(), configs.iloc[2:4], check_names=False
+    )
+
+    t_outside = [10.0, 5.0, 0.0]
+    building = M5RC(
+        label="Building",
+        building_config=view,
+        t_outside=t_outside,
+        solar_gains=[100.0, 0.0, 0.0],
+        internal_gains=[200.0, 200.0, 200.0],
+    )
+    reference = M5RC(
+        label="Reference",
+        building_config=view.to_building_config(),
+        t_outside=t_outside,
+        solar_gains=[100.0, 0.0, 0.0],
+        internal_gains=[200.0, 200.0, 200.0],
+    )
+    assert building.h_tr_3 == reference.h_tr_3
+    assert np.array_equal(building.phi_st, reference.phi_st)
+
+
+def create_refurbishment_data():
+    data = create_tabula_data(number_of_buildings=6)
+    # two buildings with three variants, the second without variant 3
+    codes = [
+        "DE.N.SFH.01.Gen.ReEx.001.001",
+        "DE.N.SFH.01.Gen.ReEx.001.002",
+        "DE.N.SFH.01.Gen.ReEx.001.003",
+        "DE.N.SFH.02.Gen.ReEx.001.001",
+        "DE.N.SFH.02.Gen.ReEx.001.002",
+        "DE.N.SFH.03.Gen.ReEx.001.001",
+    ]
+    data["Code_BuildingVariant"] = codes
+    data["Number_BuildingVariant"] = [int(code[-3:]) for code in codes]
+    area_columns = [column for column in data.columns if column.startswith("A_")]
+    for first, last in [(0, 3), (3, 5)]:
+        data.loc[first : last - 1, area_columns] = data.loc[first, area_columns].values
+    return data.drop(index=5).reset_index(drop=True)
+
+
+def test_refurbishment_combinations():
+    data = create_refurbishment_data()
+    combinations = calc_refurbishment_combinations(data=data)
+    counts = combinations["Code_BuildingVariant"].value_counts().sort_index()
+    assert list(counts) == [3**5, 2**5]
+
+    configs = calc_building_configs(data=data)
+    variant_columns = [
+        "variant_wall",
+        "variant_roof",
+        "variant_floor",
+        "variant_door",
+        "variant_window",
+    ]
+    for code, variant in zip(
+        data["Code_BuildingVariant"], data["Number_BuildingVariant"]
+    ):
+        base_code = code[:-3] + "001"
+        row = combinations[
+            (combinations["Code_BuildingVariant"] == base_code)
+            & (combinations[variant_columns] == variant).all(axis=1)
+        ]
+        assert len(row) == 1
+        np.testing.assert_allclose(row["h_tr_em"], configs.loc[code, "h_tr_em"])
+        np.testing.assert_allclose(row["h_tr_w"], configs.loc[code, "h_tr_w"])
+
+    with pytest.raises(KeyError):
+        calc_refurbishment_combinations(
+            data=data, tabula_building_codes=["DE.N.SFH.09.Gen.ReEx.001.001"]
+        )
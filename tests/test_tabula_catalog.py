@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from oemof.thermal_building_model.tabula import tabula_catalog
+from oemof.thermal_building_model.tabula.tabula_catalog import (
+    TabulaCatalog,
+    tabula_columns,
+)
+
+
+def create_catalog():
+    return TabulaCatalog(
+        data=pd.DataFrame(
+            {
+                "Code_BuildingVariant": [
+                    "DE.N.SFH.05.Gen.ReEx.001.001",
+                    "DE.N.SFH.05.Gen.ReEx.001.002",
+                    "DE.N.SFH.06.Gen.ReEx.001.001",
+                    "DE.N.SFH.06.Gen.ReEx.001.002",
+                ],
+                "Code_Country": ["DE", "DE", "DE", "DE"],
+                "Code_BuildingSizeClass": ["SFH", "SFH", "SFH", "SFH"],
+                "Code_DataType_Building": ["ReEx", "ReEx", "ReEx", "ReEx"],
+                "Year1_Building": ["1949", "1949", "1958", "1958"],
+                "Year2_Building": ["1957", "1957", "1968", "1968"],
+                "Number_BuildingVariant": [1, 2, 1, 2],
+                "A_C_Ref": [111.1, 111.1, 121.2, 121.2],
+            }
+        )
+    )
+
+
+def test_find_building_code():
+    catalog = create_catalog()
+    assert (
+        catalog.find_building_code(
+            country="DE",
+            construction_year=1960,
+            building_type="SFH",
+            refurbishment_status="usual_refurbishment",
+        )
+        == "DE.N.SFH.06.Gen.ReEx.001.002"
+    )
+    with pytest.raises(ValueError):
+        catalog.find_building_code(
+            country="DE",
+            construction_year=1990,
+            building_type="SFH",
+            refurbishment_status="no_refurbishment",
+        )
+
+
+def test_get_building_does_not_modify_catalog(tmp_path):
+    catalog = create_catalog()
+    row = catalog.get_building("DE.N.SFH.05.Gen.ReEx.001.002")
+    assert len(row) == 1
+    assert row["A_C_Ref"].iloc[0] == 111.1
+    assert len(catalog) == 4
+    assert "DE.N.SFH.06.Gen.ReEx.001.001" in catalog
+    with pytest.raises(KeyError):
+        catalog.get_building("DE.N.MFH.01.Gen.ReEx.001.001")
+
+    file_path = tmp_path / "tabula.npz"
+    catalog.to_binary(file_path)
+    pd.testing.assert_frame_equal(
+        TabulaCatalog.from_binary(file_path).data, catalog.data
+    )
+    data = catalog.data.copy()
+    data.loc[1, "Year1_Building"] = np.nan
+    TabulaCatalog(data=data).to_binary(file_path)
+    pd.testing.assert_frame_equal(TabulaCatalog.from_binary(file_path).data, data)
+
+
+def test_find_building_codes():
+    catalog = create_catalog()
+    codes = catalog.find_building_codes(
+        country="DE",
+        construction_year=[1950, 1960, 1968, 1990, 1940],
+        building_type="SFH",
+        refurbishment_status=[
+            "no_refurbishment",
+            "usual_refurbishment",
+            "no_refurbishment",
+            "no_refurbishment",
+            "usual_refurbishment",
+        ],
+    )
+    assert list(codes) == [
+        "DE.N.SFH.05.Gen.ReEx.001.001",
+        "DE.N.SFH.06.Gen.ReEx.001.002",
+        "DE.N.SFH.06.Gen.ReEx.001.001",
+        None,
+        None,
+    ]
+    for year, status, code in zip(
+        [1950, 1960, 1968],
+        ["no_refurbishment", "usual_refurbishment", "no_refurbishment"],
+        codes,
+    ):
+        assert (
+            catalog.find_building_code(
+                country="DE",
+                construction_year=year,
+                building_type="SFH",
+                refurbishment_status=status,
+            )
+            == code
+        )
+
+
+def test_typed_columns(tmp_path):
+    data = pd.DataFrame(
+        {column: [0.5, 1.0] for column in tabula_columns}
+    ).astype(object)
+    data["Code_BuildingVariant"] = [
+        "DE.N.SFH.05.Gen.ReEx.001.001",
+        "DE.N.SFH.05.Gen.ReEx.001.002",
+    ]
+    data["Code_Country"] = "DE"
+    data["Code_BuildingSizeClass"] = "SFH"
+    data["Code_DataType_Building"] = "ReEx"
+    data["Year1_Building"] = "...1859"
+    data["Year2_Building"] = "1957"
+    data["Number_BuildingVariant"] = [1, 2]
+    data["h_room"] = ["2.5", "-"]
+    data["Unused_Column"] = "text"
+    csv_path = tmp_path / "tabula.csv"
+    data.to_csv(csv_path, index=False)
+
+    catalog = TabulaCatalog(csv_path=csv_path)
+    assert list(catalog.data.columns) == list(tabula_columns)
+    # the parsed table is stored as npz file with its dtypes
+    cache_dir = tmp_path / "cache"
+    TabulaCatalog(csv_path=csv_path, use_cache=True, cache_dir=cache_dir).data
+    assert len(list(cache_dir.glob("*.npz"))) == 1
+    pd.testing.assert_frame_equal(
+        TabulaCatalog(csv_path=csv_path, use_cache=True, cache_dir=cache_dir).data,
+        catalog.data,
+    )
+    assert catalog.data["Code_Country"].dtype == "category"
+    assert catalog.data["A_C_Ref"].dtype == "float64"
+    assert catalog.data["h_room"].iloc[0] == 2.5
+    assert np.isnan(catalog.data["h_room"].iloc[1])
+    assert (
+        catalog.find_building_code(
+            country="DE",
+            construction_year=1900,
+            building_type="SFH",
+            refurbishment_status="usual_refurbishment",
+        )
+        == "DE.N.SFH.05.Gen.ReEx.001.002"
+    )
+
+
+def test_shared_catalog_is_not_persisted(monkeypatch):
+    arguments = []
+
+    def create_shared_catalog(**kwargs):
+        arguments.append(kwargs)
+        return create_catalog()
+
+    monkeypatch.setattr(tabula_catalog, "_tabula_catalog", None)
+    monkeypatch.setattr(tabula_catalog, "TabulaCatalog", create_shared_catalog)
+    catalog = tabula_catalog.get_tabula_catalog()
+    assert tabula_catalog.get_tabula_catalog() is catalog
+    assert arguments == [{"use_cache": False}]
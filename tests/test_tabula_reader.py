@@ -1,4 +1,18 @@
-from oemof.thermal_building_model.tabula.tabula_reader import Building
+import os
+
+import numpy as np
+import pytest
+from conftest import create_building_parameters
+
+from oemof.thermal_building_model.helpers.path_helper import get_project_root
+from oemof.thermal_building_model.helpers.calculate_gain_by_sun import Location
+from oemof.thermal_building_model.tabula.tabula_reader import (
+    Building,
+    BuildingEnvelope,
+    BuildingParameters,
+    calc_solar_gains_of_buildings,
+)
+
 
 def test_tabula_reader():
     number_of_time_steps = 100
@@ -26,3 +40,132 @@ def test_tabula_reader():
     assert specific_building_example.h_tr_em == 166.73835342102404
     assert generic_building_example.h_transmission == 337.832305942905
     assert specific_building_example.h_transmission == 204.67835342102404
+
+
+weather_file = os.path.join(
+    get_project_root(),
+    "thermal_building_model",
+    "input",
+    "weather_files",
+    "12_BW_Mannheim_TRY2035.csv",
+)
+
+
+def test_solar_gains_array_equals_loop():
+    location = Location(epwfile_path=weather_file)
+    building = Building(
+        number_of_time_steps=2000,
+        building_parameters=create_building_parameters(),
+    )
+    building.initialize_from_building_parameters()
+
+    solar_gains = building.calc_solar_gaings_through_windows(
+        object_location_of_building=location
+    )
+    # the loop uses fixed coordinates
+    solar_gains_array = building.calc_solar_gains_array(
+        object_location_of_building=location,
+        latitude_deg=48.16,
+        longitude_deg=46.38,
+        cache=None,
+    )
+    assert isinstance(solar_gains_array, np.ndarray)
+    np.testing.assert_allclose(solar_gains_array, solar_gains, rtol=1e-10)
+
+    # by default the coordinates of the weather file are used
+    np.testing.assert_allclose(
+        building.calc_solar_gains_array(
+            object_location_of_building=location, cache=None
+        ),
+        building.calc_solar_gains_array(
+            object_location_of_building=location,
+            latitude_deg=location.latitude_deg,
+            longitude_deg=location.longitude_deg,
+            cache=None,
+        ),
+    )
+    location.latitude_deg = None
+    with pytest.raises(ValueError):
+        building.calc_solar_gains_array(
+            object_location_of_building=location, cache=None
+        )
+
+
+def test_solar_gains_of_buildings():
+    location = Location(epwfile_path=weather_file)
+    buildings = []
+    for floor_area, g_value in [(150, 0.6), (300, 0.5)]:
+        building_parameters = create_building_parameters()
+        building_parameters.floor_area = floor_area
+        building_parameters.g_gl_n_window["g_gl_n_window_1"] = g_value
+        building = Building(
+            number_of_time_steps=500,
+            building_parameters=building_parameters,
+        )
+        building.initialize_from_building_parameters()
+        buildings.append(building)
+
+    solar_gains = calc_solar_gains_of_buildings(
+        buildings=buildings, object_location_of_building=location, cache=None
+    )
+    assert solar_gains.shape == (2, 500)
+    for row, building in enumerate(buildings):
+        np.testing.assert_allclose(
+            solar_gains[row],
+            building.calc_solar_gains_array(
+                object_location_of_building=location, cache=None
+            ),
+        )
+
+
+def test_building_envelope_equals_dicts():
+    building_parameters = create_building_parameters()
+    envelope = building_parameters.get_envelope()
+    assert np.array_equal(envelope.u_wall, [0.5, 1.0, 0.0])
+    assert envelope.delta_u_thermal_bridging == 0.05
+
+    building_from_dicts = Building(
+        number_of_time_steps=10, building_parameters=building_parameters
+    )
+    building_from_dicts.calculate_all_parameters()
+    building_from_arrays = Building(
+        number_of_time_steps=10,
+        building_parameters=BuildingParameters(
+            floor_area=150,
+            heat_transfer_coefficient_ventilation=0.5,
+            total_air_change_rate=0.6,
+            room_height=2.5,
+            envelope=BuildingEnvelope(
+                a_wall=[140.0, 10.0, 0.0],
+                u_wall=[0.5, 1.0, 0.0],
+                b_wall=[1.0, 1.0, 1.0],
+                a_roof=[90.0, 0.0],
+                u_roof=[0.3, 0.0],
+                b_roof=[1.0, 1.0],
+                a_floor=[80.0, 0.0],
+                u_floor=[0.4, 0.0],
+                b_floor=[0.5, 0.5],
+                a_door=[2.0],
+                u_door=[3.0],
+                a_window=[25.0, 5.0],
+                u_window=[1.3, 2.8],
+                g_gl_n_window=[0.6, 0.75],
+                a_window_specific=[6.0, 6.0, 12.0, 6.0, 0.0],
+                delta_u_thermal_bridging=0.05,
+            ),
+        ),
+    )
+    building_from_arrays.calculate_all_parameters()
+    assert building_from_arrays.building_config == building_from_dicts.building_config
+    assert building_from_dicts.h_tr_em == (
+        140 * 0.5 + 10 * 1.0 + 90 * 0.3 + 80 * 0.4 * 0.5 + 2 * 3.0 + 0.05 * 322
+    )
+    assert building_from_dicts.h_tr_w == 25 * 1.3 + 5 * 2.8
+
+    with pytest.raises(ValueError):
+        BuildingEnvelope(
+            **{
+                **vars(envelope),
+                "u_wall": [0.5, 1.0],
+            }
+        )
@@ -0,0 +1,67 @@
+import gc
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import create_building_config
+
+from oemof.thermal_building_model.helpers.time_series_store import TimeSeriesStore
+from oemof.thermal_building_model.m_5RC import M5RC
+
+
+def test_time_series_store_deduplicates():
+    store = TimeSeriesStore()
+    series = store.get([1.0, 2.0, 3.0])
+    assert store.get(np.array([1.0, 2.0, 3.0])) is series
+    assert store.get(pd.Series([1, 2, 3])) is series
+    other_series = store.get([1.0, 2.0, 4.0])
+    assert other_series is not series
+    assert len(store) == 2
+    with pytest.raises(ValueError):
+        series[0] = 5.0
+
+
+def test_time_series_store_copies_input():
+    store = TimeSeriesStore()
+    values = np.linspace(0, 1, 100)
+    series = store.get(values)
+    assert not np.shares_memory(series, values)
+    profile = pd.Series(np.linspace(1, 2, 100))
+    assert not np.shares_memory(store.get(profile), profile.to_numpy())
+    # the input array stays writeable, changes do not reach the store
+    values[0] = 1.0
+    assert series[0] == 0.0
+    assert store.get(np.linspace(0, 1, 100)) is series
+
+
+def test_time_series_store_drops_unused_series():
+    store = TimeSeriesStore()
+    series = store.get(np.arange(10.0))
+    assert len(store) == 1
+    del series
+    gc.collect()
+    assert len(store) == 0
+
+
+def test_buildings_share_time_series():
+    store = TimeSeriesStore()
+    number_of_time_steps = 24
+    t_outside = pd.Series(np.linspace(-5, 5, number_of_time_steps))
+    buildings = [
+        M5RC(
+            label="Building_{0}".format(x),
+            building_config=create_building_config(),
+            t_outside=t_outside,
+            solar_gains=[100.0] * number_of_time_steps,
+            internal_gains=np.full(number_of_time_steps, 50.0),
+            time_series_store=store,
+        )
+        for x in range(3)
+    ]
+    assert not np.shares_memory(buildings[0].t_e, t_outside.to_numpy())
+    for building in buildings[1:]:
+        assert building.t_e is buildings[0].t_e
+        assert building.solar_gains is buildings[0].solar_gains
+        assert building.phi_st is buildings[0].phi_st
+    # t_e, solar and internal gains, phi_ia, phi_st and phi_m
+    assert len(store) == 6
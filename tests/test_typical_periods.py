@@ -0,0 +1,191 @@
+import numpy as np
+import pytest
+from conftest import create_building_config
+from conftest import get_building_block
+from oemof import solph
+from pyomo.environ import Constraint
+from pyomo.environ import value
+
+from oemof.thermal_building_model.helpers.typical_periods import (
+    TypicalPeriods,
+    cluster_periods,
+)
+from oemof.thermal_building_model.m_5RC import GenericBuildingBlock
+from oemof.thermal_building_model.m_5RC import M5RC
+from oemof.thermal_building_model.m_5RC import ReducedGenericBuildingBlock
+
+
+def test_typical_periods():
+    typical_periods = TypicalPeriods([0, 1, 0, 2], period_length=2)
+    assert typical_periods.number_of_typical_periods == 3
+    assert typical_periods.number_of_periods == 4
+    assert typical_periods.number_of_time_steps == 6
+    assert list(typical_periods.occurrences) == [2, 1, 1]
+    aggregated = typical_periods.aggregate(np.arange(9.0))
+    assert list(aggregated) == [0, 1, 2, 3, 6, 7]
+    disaggregated = typical_periods.disaggregate(aggregated)
+    assert list(disaggregated) == [0, 1, 2, 3, 0, 1, 6, 7]
+    assert typical_periods.aggregate(np.ones((3, 8))).shape == (3, 6)
+    assert typical_periods.objective_weighting() == [2, 2, 1, 1, 1, 1]
+    assert sum(typical_periods.objective_weighting(0.5)) == 4
+
+    typical_periods = TypicalPeriods([0, 1, 0, 2], 2, representatives=[2, 1, 3])
+    assert list(typical_periods.aggregate(np.arange(8.0))) == [4, 5, 2, 3, 6, 7]
+
+
+def test_cluster_periods():
+    hours = np.arange(24)
+    days = {
+        "cold": -5 + 3 * np.sin(hours / 24 * 2 * np.pi),
+        "mild": 10 + 5 * np.sin(hours / 24 * 2 * np.pi),
+        "warm": 25 + 2 * np.sin(hours / 24 * 2 * np.pi),
+    }
+    pattern = ["mild", "cold", "cold", "warm", "mild", "cold", "warm", "warm"]
+    t_outside = np.concatenate([days[day] for day in pattern])
+    typical_periods = cluster_periods(t_outside, number_of_typical_periods=3)
+    # numbered by first occurrence
+    assert list(typical_periods.order) == [0, 1, 1, 2, 0, 1, 2, 2]
+    aggregated = typical_periods.aggregate(t_outside)
+    np.testing.assert_allclose(aggregated[:24], days["mild"])
+    np.testing.assert_allclose(typical_periods.disaggregate(aggregated), t_outside)
+    # empty clusters are dropped
+    assert cluster_periods(t_outside, 24, 5).number_of_typical_periods <= 5
+
+    with pytest.raises(ValueError):
+        cluster_periods(t_outside, 24, 9)
+
+
+def create_energy_system(typical_periods, reduced_formulation=False):
+    number_of_time_steps = typical_periods.number_of_time_steps
+    hours = np.arange(typical_periods.number_of_periods * 24)
+    energy_system = solph.EnergySystem(
+        timeindex=solph.create_time_index(2012, number=number_of_time_steps),
+        infer_last_interval=False,
+    )
+    b_heat = solph.buses.Bus(label="b_heat")
+    b_cool = solph.buses.Bus(label="b_cool")
+    building = M5RC(
+        label="Building",
+        inputs={b_heat: solph.flows.Flow()},
+        outputs={b_cool: solph.flows.Flow()},
+        building_config=create_building_config(),
+        t_outside=typical_periods.aggregate(
+            5 + 10 * np.sin(hours / 24 * 2 * np.pi) + hours / 24
+        ),
+        solar_gains=typical_periods.aggregate(
+            np.clip(800 * np.sin(hours / 24 * 2 * np.pi), 0, None)
+        ),
+        internal_gains=[100.0] * number_of_time_steps,
+        reduced_formulation=reduced_formulation,
+        typical_periods=typical_periods,
+    )
+    energy_system.add(b_heat, b_cool, building)
+    return energy_system, building
+
+
+@pytest.mark.parametrize("reduced_formulation", [False, True])
+def test_typical_periods_follow_mean_trajectory(reduced_formulation):
+    typical_periods = TypicalPeriods([0, 1, 0, 0, 1], period_length=24)
+    energy_system, building = create_energy_system(
+        typical_periods, reduced_formulation
+    )
+    model = solph.Model(energy_system)
+    block_type = (
+        ReducedGenericBuildingBlock if reduced_formulation else GenericBuildingBlock
+    )
+    block = get_building_block(model, block_type)
+    assert len(block.period_linkage_t_m) == 2
+    # no balance of t_m at the end of the typical periods
+    assert len(block.balance_t_m_current_t_s) == 46
+
+    # trajectory of the original periods for some heat flows
+    random = np.random.default_rng(1)
+    heat = random.uniform(0, 2000, size=48)
+    cool = random.uniform(0, 2000, size=48)
+    c = building.calc_linear_coefficients(np.ones(48))
+    c = {
+        name: typical_periods.disaggregate(np.broadcast_to(value, (48,)))
+        for name, value in c.items()
+    }
+    phi_hc_nd = typical_periods.disaggregate(heat - cool)
+    t_m = [building.t_inital]
+    for t in range(len(phi_hc_nd)):
+        t_m.append(
+            c["t_m_t_m"][t] * t_m[t]
+            + c["t_m_phi"][t] * phi_hc_nd[t]
+            + c["t_m_constant"][t]
+        )
+    t_m = np.array(t_m)
+    t_air = (
+        c["t_air_t_m"] * (t_m[:-1] + t_m[1:])
+        + c["t_air_phi"] * phi_hc_nd
+        + c["t_air_constant"]
+    )
+
+    # the typical periods follow the mean of the periods they represent
+    def mean_of_periods(values):
+        periods = values.reshape(5, 24)
+        return np.concatenate(
+            [periods[typical_periods.order == k].mean(axis=0) for k in range(2)]
+        )
+
+    mean_t_m = mean_of_periods(t_m[:-1])
+    mean_t_air = mean_of_periods(t_air)
+
+    i = [i for i in building.inputs][0]
+    o = [o for o in building.outputs][0]
+    for p, t in model.TIMEINDEX:
+        model.flow[i, building, p, t].value = heat[t]
+        model.flow[building, o, p, t].value = cool[t]
+        block.t_m_ts[building, t].value = mean_t_m[t]
+    # t_m after the last timestep is not used by the typical periods
+    block.t_m_ts[building, 48].value = 0.0
+    for t in range(48):
+        block.t_air[building, t + 1].value = mean_t_air[t]
+
+    for constraint in block.component_data_objects(Constraint, active=True):
+        if constraint.equality:
+            assert value(constraint.body) == pytest.approx(
+                value(constraint.upper), abs=1e-6
+            )
+    if reduced_formulation:
+        block.load_t_air()
+        for t in range(48):
+            assert block.t_air[building, t + 1].value == pytest.approx(
+                mean_t_air[t]
+            )
+
+
+def test_typical_periods_need_model_length():
+    typical_periods = TypicalPeriods([0, 1, 0], period_length=24)
+    energy_system, building = create_energy_system(typical_periods)
+    building.typical_periods = TypicalPeriods([0, 1, 2, 0], period_length=24)
+    with pytest.raises(ValueError):
+        solph.Model(energy_system)
+
+
+def test_time_series_of_original_periods_are_aggregated():
+    typical_periods = TypicalPeriods([0, 1, 0, 2], period_length=24)
+    hours = np.arange(typical_periods.number_of_periods * 24)
+    t_outside = 5 + 10 * np.sin(hours / 24 * 2 * np.pi) + hours / 24
+    building = M5RC(
+        label="Building",
+        building_config=create_building_config(),
+        t_outside=t_outside,
+        solar_gains=typical_periods.aggregate(np.full(len(hours), 100.0)),
+        internal_gains=100.0 * np.ones(len(hours)),
+        typical_periods=typical_periods,
+    )
+    np.testing.assert_array_equal(building.t_e, typical_periods.aggregate(t_outside))
+    assert len(building.solar_gains) == typical_periods.number_of_time_steps
+    assert len(building.phi_m) == typical_periods.number_of_time_steps
+
+    with pytest.raises(ValueError):
+        M5RC(
+            label="Building",
+            building_config=create_building_config(),
+            t_outside=t_outside[:50],
+            solar_gains=np.full(len(hours), 100.0),
+            internal_gains=np.full(len(hours), 100.0),
+            typical_periods=typical_periods,
+        )
@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from oemof.thermal_building_model.helpers.path_helper import get_project_root
+from oemof.thermal_building_model.helpers.weather_reader import (
+    _resample_chunk,
+    epw_labels,
+    iter_resampled_weather,
+    model_columns,
+    read_weather_file,
+)
+
+weather_file = os.path.join(
+    get_project_root(),
+    "thermal_building_model",
+    "input",
+    "weather_files",
+    "12_BW_Mannheim_TRY2035.csv",
+)
+
+
+def test_read_weather_file(tmp_path):
+    expected = pd.read_csv(
+        weather_file,
+        skiprows=8,
+        header=None,
+        names=epw_labels,
+        encoding="ISO-8859-1",
+        engine="python",
+    ).drop("datasource", axis=1)
+
+    weather_data = read_weather_file(weather_file, use_cache=True, cache_dir=tmp_path)
+    assert list(weather_data.columns) == list(expected.columns)
+    np.testing.assert_allclose(
+        weather_data.to_numpy(dtype=float), expected.to_numpy(dtype=float)
+    )
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+
+    cached_weather_data = read_weather_file(
+        weather_file, use_cache=True, cache_dir=tmp_path
+    )
+    pd.testing.assert_frame_equal(cached_weather_data, weather_data)
+
+
+def test_read_weather_file_without_cache(cache_dir):
+    read_weather_file(weather_file, columns=model_columns)
+    assert not cache_dir.exists()
+
+
+def test_read_weather_file_columns(tmp_path):
+    weather_data = read_weather_file(
+        weather_file, columns=model_columns, cache_dir=tmp_path
+    )
+    assert list(weather_data.columns) == model_columns
+    assert weather_data["drybulb_C"].dtype == np.float64
+    assert weather_data["hour"].dtype == np.int64
+    assert len(weather_data) == 8760
+
+
+def test_resample_weather(tmp_path):
+    weather_data = read_weather_file(
+        weather_file, columns=model_columns, cache_dir=tmp_path
+    )
+    chunks = list(
+        iter_resampled_weather(weather_data, timestep_hours=0.25, chunk_size=100)
+    )
+    assert all(isinstance(chunk["drybulb_C"], np.ndarray) for chunk in chunks)
+    resampled = {
+        column: np.concatenate([chunk[column] for chunk in chunks])
+        for column in model_columns
+    }
+    assert len(resampled["drybulb_C"]) == 4 * 8760
+    # irradiance keeps the energy, temperatures are interpolated
+    np.testing.assert_allclose(
+        resampled["dirnorrad_Whm2"].sum() * 0.25, weather_data["dirnorrad_Whm2"].sum()
+    )
+    np.testing.assert_array_equal(
+        resampled["drybulb_C"][::4], weather_data["drybulb_C"]
+    )
+    np.testing.assert_allclose(
+        resampled["drybulb_C"][2],
+        weather_data["drybulb_C"][:2].mean(),
+    )
+    assert list(resampled["minute"][:4]) == [0, 15, 30, 45]
+
+    aggregated = list(
+        iter_resampled_weather(
+            pd.DataFrame(resampled), timestep_hours=1, source_timestep_hours=0.25
+        )
+    )
+    np.testing.assert_allclose(
+        np.concatenate([chunk["dirnorrad_Whm2"] for chunk in aggregated]),
+        weather_data["dirnorrad_Whm2"],
+    )
+
+
+def test_resample_chunk_interpolates_state_values():
+    values = np.array([0.0, 2.0])
+    np.testing.assert_allclose(
+        _resample_chunk(values, "drybulb_C", 2, True, 0.5), [0, 1, 2, 2]
+    )
+    np.testing.assert_allclose(
+        _resample_chunk(values, "drybulb_C", 2, True, 0.5, next_value=4.0),
+        [0, 1, 2, 3],
+    )
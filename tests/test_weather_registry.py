@@ -0,0 +1,44 @@
+import numpy as np
+
+from oemof.thermal_building_model.helpers.weather_registry import (
+    WeatherFileRegistry,
+)
+
+
+def test_weather_registry_index():
+    registry = WeatherFileRegistry(maxsize=2)
+    assert len(registry.stations) == 15
+    assert registry.find(region="BW") == [
+        "12_BW_Mannheim_TRY2035",
+        "14_BW_Stotten-Geislingen an der Steige_TRY2035",
+    ]
+    mannheim = registry.stations.loc["12_BW_Mannheim_TRY2035"]
+    assert mannheim["try_region"] == 12
+    assert mannheim["latitude_deg"] == 49.52
+    assert mannheim["longitude_deg"] == 8.55
+
+
+def test_weather_registry_shared_locations():
+    registry = WeatherFileRegistry(maxsize=2)
+    location = registry.get_location(12)
+    assert registry.get_location("Mannheim") is location
+    assert location.latitude_deg == 49.52
+    registry.get_location(1)
+    registry.get_location(2)
+    assert len(registry._locations) == 2
+    assert registry.get_location(12) is not location
+
+
+def test_weather_registry_nearest():
+    registry = WeatherFileRegistry()
+    assert registry.find_nearest(49.49, 8.47) == "12_BW_Mannheim_TRY2035"
+    nearest = registry.find_nearest(
+        latitude_deg=np.array([53.55, 47.5, 49.49]),
+        longitude_deg=np.array([10.0, 11.1, 8.47]),
+        chunk_size=2,
+    )
+    assert list(nearest) == [
+        "03_HH_Hamburg-Fuhlsbuttel_TRY2035",
+        "15_BY_Garmisch-Partenkirchen_TRY2035",
+        "12_BW_Mannheim_TRY2035",
+    ]
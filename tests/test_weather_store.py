@@ -0,0 +1,38 @@
+import numpy as np
+
+from oemof.thermal_building_model.helpers.calculate_gain_by_sun import (
+    calc_orientation_irradiance,
+)
+from oemof.thermal_building_model.helpers.weather_reader import model_columns
+from oemof.thermal_building_model.helpers.weather_registry import weather_registry
+from oemof.thermal_building_model.helpers.weather_store import (
+    WeatherStore,
+    pack_weather_store,
+)
+
+
+def test_weather_store(tmp_path):
+    epwfile_paths = weather_registry.stations["file_path"].iloc[:3].to_dict()
+    store = pack_weather_store(
+        store_path=tmp_path / "stations", epwfile_paths=epwfile_paths
+    )
+    assert store.data.shape == (3, len(model_columns), 8760)
+
+    store = WeatherStore(tmp_path / "stations")
+    name = store.stations[1]
+    location = store.get_location(name)
+    reference = weather_registry.get_location(name)
+    assert location.latitude_deg == reference.latitude_deg
+    assert location.weather_file_hash == reference.weather_file_hash
+    np.testing.assert_array_equal(
+        location.weather_data["drybulb_C"], reference.weather_data["drybulb_C"]
+    )
+    assert np.shares_memory(location.weather_data["drybulb_C"].to_numpy(), store.data)
+
+    kwargs = dict(
+        latitude_deg=48.16, longitude_deg=46.38, year=2015, number_of_time_steps=8760
+    )
+    np.testing.assert_allclose(
+        calc_orientation_irradiance(object_location=location, **kwargs),
+        calc_orientation_irradiance(object_location=reference, **kwargs),
+    )